@@ -7,8 +7,46 @@ SLACK_BOT_ACCESS_TOKEN = 'SLACK_BOT_ACCESS_TOKEN'
 SLACK_VERIFICATION_TOKEN = 'SLACK_VERIFICATION_TOKEN'
 LOGS_PATH = 'logs/log'
 REPORT_PATH = 'reports'
+# reports with at least this number of time entries are streamed to the file row by row
+REPORT_XLSX_WRITE_ONLY_MIN_ENTRIES = 5000
+# reports are generated in background by this number of threads
+REPORT_WORKERS = 2
+# job interrupted by process crash so many times is not retried anymore
+REPORT_JOB_MAX_ATTEMPTS = 3
+# running job not confirmed by its process for so long is taken over by other process
+REPORT_JOB_LEASE_SECONDS = 5 * 60
+# generated reports are kept under REPORT_PATH/cache and served again while data is unchanged
+REPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+REPORT_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
 USERS_TIME_ZONE = 'Europe/Warsaw'
 ELASTIC_HOST = ''
+# log records waiting for Elasticsearch, the ones which don't fit are dropped or appended to LOG_SPILL_FILE
+LOG_QUEUE_SIZE = 10000
+LOG_SPILL_FILE = ''
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_SECONDS = 1.0
+# bearer token required to scrape /metrics, the endpoint is disabled while it is empty
+METRICS_TOKEN = ''
+# reminders missed by resident scheduler within this time, e.g. during restart, are still sent
+REMINDER_CATCH_UP_MINUTES = 30
+# reminder job run by cron looks for reminders set within the window, delivery log keeps overlapping runs from
+# sending reminders twice
+REMINDER_JOB_WINDOW_MINUTES = 15
+REMINDER_SCHEDULE_RELOAD_MINUTES = 5
+SLACK_DELIVERY_WORKERS = 4
+SLACK_API_URL = 'https://slack.com/api/'
+# keep-alive connections to Slack kept by the process
+SLACK_POOL_SIZE = 10
+SLACK_TIMEOUT_SECONDS = 30
+SLACK_MAX_RETRIES = 3
+# Slack Web API calls allowed per minute, see https://api.slack.com/docs/rate-limits
+SLACK_METHOD_RATE_LIMITS = {'im.open': 50, 'chat.postMessage': 60}
+SLACK_DEFAULT_RATE_LIMIT = 100
+# slash commands acknowledged at once and run in background, the result is posted to response_url
+SLACK_DEFERRED_COMMANDS = ['food', 'order', 'pay', 'debt']
+SLACK_DEFERRED_WORKERS = 4
+SLACK_DEFERRED_MAX_PENDING = 100
+SLACK_DEFERRED_ACK_TEXT = 'Working on it :hourglass_flowing_sand:'
 GOOGLE_API_CLIENT_ID = 'GOOGLE_API_CLIENT_ID used in oauth2'
 GOOGLE_API_CLIENT_SECRET = 'GOOGLE_API_CLIENT_SECRET in oauth2'
 GOOGLE_VACATION_CALENDAR_ID = ''
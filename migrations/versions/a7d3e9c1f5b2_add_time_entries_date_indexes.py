@@ -0,0 +1,32 @@
+"""add_time_entries_date_indexes
+
+Revision ID: a7d3e9c1f5b2
+Revises: f2c6d8a3b1e7
+Create Date: 2020-02-24 09:12:41.205317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9c1f5b2'
+down_revision = 'f2c6d8a3b1e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_time_entries_user_id_report_date', 'time_entries', ['user_id', 'report_date'], unique=False)
+    op.create_index('ix_time_entries_project_id_report_date', 'time_entries', ['project_id', 'report_date'],
+                    unique=False)
+    # both are prefixes of the composite indexes
+    op.drop_index('ix_time_entries_user_id', table_name='time_entries')
+    op.drop_index('ix_time_entries_project_id', table_name='time_entries')
+
+
+def downgrade():
+    op.create_index('ix_time_entries_project_id', 'time_entries', ['project_id'], unique=False)
+    op.create_index('ix_time_entries_user_id', 'time_entries', ['user_id'], unique=False)
+    op.drop_index('ix_time_entries_project_id_report_date', table_name='time_entries')
+    op.drop_index('ix_time_entries_user_id_report_date', table_name='time_entries')
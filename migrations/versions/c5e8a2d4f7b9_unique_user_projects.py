@@ -0,0 +1,27 @@
+"""unique_user_projects
+
+Revision ID: c5e8a2d4f7b9
+Revises: b9f4c7e2a6d1
+Create Date: 2020-02-17 14:05:42.190337
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a2d4f7b9'
+down_revision = 'b9f4c7e2a6d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # assignments repeated for the same user and project are removed, the first one is kept
+    op.execute('DELETE FROM user_projects WHERE user_project_id NOT IN '
+               '(SELECT kept_id FROM (SELECT MIN(user_project_id) AS kept_id FROM user_projects '
+               'GROUP BY user_id, project_id) AS kept)')
+    op.create_unique_constraint('uq_user_projects_user_id_project_id', 'user_projects', ['user_id', 'project_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_user_projects_user_id_project_id', 'user_projects', type_='unique')
@@ -1,4 +1,5 @@
 import os
+import click
 from flask import Flask
 from flask_restful import Api
 from flask_sqlalchemy import SQLAlchemy
@@ -10,7 +11,8 @@ import nisse.services
 import nisse.routes
 from nisse.utils.configs import load_config
 from nisse.utils.logging import init_logging
-from nisse.services import UserService, TokenService
+from nisse.utils.metrics import init_request_metrics, instrument_engine
+from nisse.services import UserService, TokenService, GoogleCalendarService, OAuthStore, BusinessCalendarService
 from __version__ import __version__
 
 application = Flask(__name__, instance_relative_config=True)
@@ -23,6 +25,8 @@ api = Api(application)
 
 nisse.routes.configure_api(api)
 nisse.routes.configure_oauth(application)
+nisse.routes.configure_url_rules(application)
+init_request_metrics(application)
 
 # IoC config
 flask_injector = FlaskInjector(
@@ -31,8 +35,21 @@ flask_injector = FlaskInjector(
 # initial create
 db = flask_injector.injector.get(SQLAlchemy)
 migrate = Migrate(application, db)
+instrument_engine(db.get_engine(application))
 
 application.logger.info('Version: ' + __version__)
 
 # create report path
-os.makedirs(os.path.join(application.instance_path, application.config["REPORT_PATH"]), exist_ok=True)
\ No newline at end of file
+os.makedirs(os.path.join(application.instance_path, application.config["REPORT_PATH"]), exist_ok=True)
+
+
+@application.cli.command('sync-days-off')
+@click.argument('year', type=int)
+def sync_days_off(year):
+    """ Imports days off of the year from Google holidays calendar """
+    if not application.config['GOOGLE_HOLIDAYS_CALENDAR_ID']:
+        raise click.ClickException('GOOGLE_HOLIDAYS_CALENDAR_ID is not configured')
+
+    calendar_service = GoogleCalendarService(application.config, flask_injector.injector.get(OAuthStore))
+    imported = BusinessCalendarService(db.session).sync_days_off(year, calendar_service.get_holidays(year))
+    application.logger.info('Imported {0} days off of {1}'.format(imported, year))
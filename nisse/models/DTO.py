@@ -1,5 +1,5 @@
 import datetime
-from typing import NamedTuple
+from typing import NamedTuple, List, Dict, Iterable, Set
 
 
 class PrintParametersDto(object):
@@ -10,6 +10,27 @@ class PrintParametersDto(object):
         self.date_to = None
 
 
+class ReportEntryDto(NamedTuple):
+    user_id: int
+    report_date: datetime.date
+    duration: float
+    project: str
+    comment: str
+
+
+class ReportDataDto(object):
+    """
+    Everything needed to render report, users and vacations are loaded upfront,
+    time entries may be streamed from database ordered by user
+    """
+    def __init__(self, time_entries: Iterable[ReportEntryDto], users: Dict, vacations: Dict,
+                 non_working_days: Set[datetime.date] = None):
+        self.time_entries = time_entries
+        self.users = users
+        self.vacations = vacations
+        self.non_working_days = non_working_days
+
+
 class TimeRecordDto(NamedTuple):
     day: str
     hours: int
@@ -17,6 +38,10 @@ class TimeRecordDto(NamedTuple):
     comment: str
     project: str
     user_id: str
+    day_to: str = None
 
     def get_parsed_date(self):
         return datetime.datetime.strptime(self.day, '%Y-%m-%d').date()
+
+    def get_parsed_date_to(self):
+        return datetime.datetime.strptime(self.day_to, '%Y-%m-%d').date() if self.day_to else None
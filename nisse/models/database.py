@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, ForeignKey, Date, Time, Boolean
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DECIMAL, ForeignKey, Date, Time, Boolean, DateTime, Index, \
+    UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -11,11 +14,19 @@ class TimeEntry(Base):
     time_entry_id = Column(Integer, primary_key=True)
     duration = Column(DECIMAL(precision=18, scale=2))
     comment = Column(String(length=255))
-    user_id = Column(Integer, ForeignKey('users.user_id'), index=True)
-    project_id = Column(Integer, ForeignKey('projects.project_id'), index=True)
-    user = relationship('User', back_populates='user_time_entries', lazy='joined')
+    user_id = Column(Integer, ForeignKey('users.user_id'))
+    project_id = Column(Integer, ForeignKey('projects.project_id'))
+    user = relationship('User', back_populates='user_time_entries')
     project = relationship('Project', back_populates='project_time_entries')
     report_date = Column(Date)
+    # report cache is keyed on last change of every table the report reads
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # entries are looked up by user or project within date range
+    __table_args__ = (
+        Index('ix_time_entries_user_id_report_date', 'user_id', 'report_date'),
+        Index('ix_time_entries_project_id_report_date', 'project_id', 'report_date'),
+    )
 
 
 class Project(Base):
@@ -25,6 +36,7 @@ class Project(Base):
     name = Column(String(length=100))
     project_users = relationship('UserProject', back_populates='project')
     project_time_entries = relationship('TimeEntry', back_populates='project')
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class User(Base):
@@ -49,6 +61,8 @@ class User(Base):
     remind_time_saturday = Column(Time, nullable=True)
     remind_time_sunday = Column(Time, nullable=True)
     phone = Column(String(length=15))
+    im_channel_id = Column(String(length=100), nullable=True)
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return "User(id={},name={})".format(self.user_id, self.username)
@@ -62,6 +76,26 @@ class UserRole(Base):
         "User", order_by=User.user_id, back_populates='role')
 
 
+class ReminderSchedule(Base):
+    __tablename__ = "reminder_schedules"
+
+    # primary key columns order makes the index serve lookups by weekday and time range
+    weekday = Column(Integer, primary_key=True, autoincrement=False)
+    utc_minute = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True, autoincrement=False, index=True)
+
+
+class ReminderDelivery(Base):
+    __tablename__ = "reminder_deliveries"
+
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True, autoincrement=False)
+    remind_date = Column(Date, primary_key=True)
+    run_id = Column(String(length=32), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    # set once the message is delivered, deliveries not sent in time are claimed again by next run
+    sent_at = Column(DateTime, nullable=True)
+
+
 class UserProject(Base):
     __tablename__ = "user_projects"
 
@@ -71,6 +105,8 @@ class UserProject(Base):
     user = relationship('User', back_populates='user_projects')
     project = relationship('Project', back_populates='project_users')
 
+    __table_args__ = (UniqueConstraint('user_id', 'project_id', name='uq_user_projects_user_id_project_id'),)
+
     
 class Token(Base):
     """ Access or refresh token
@@ -98,6 +134,7 @@ class Vacation(Base):
     event_id = Column(String(255), nullable=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     user = relationship('User', back_populates='vacations')
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class FoodOrder(Base):
@@ -123,4 +160,32 @@ class FoodOrderItem(Base):
     surrender = Column(Boolean, nullable=False)
 
 
+class CompanyDayOff(Base):
+    __tablename__ = "company_days_off"
 
+    company_day_off_id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False, unique=True)
+    description = Column(String(length=255))
+    source = Column(String(length=16), nullable=False)
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    report_job_id = Column(Integer, primary_key=True)
+    slack_user_id = Column(String(length=100), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=True)
+    project_id = Column(Integer, ForeignKey('projects.project_id'), nullable=True)
+    date_from = Column(Date, nullable=False)
+    date_to = Column(Date, nullable=False)
+    report_format = Column(String(length=8), nullable=False, default='xlsx', server_default='xlsx')
+    status = Column(String(length=16), nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String(length=255), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # process running the job, it renews heartbeat_at while the job is running
+    owner = Column(String(length=64), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
@@ -8,6 +8,8 @@ from nisse.utils.string_helper import get_full_class_name
 from nisse.utils.validation_helper import is_number, validate_date, validate_price
 
 DAILY_HOUR_LIMIT = 24
+# the longest range of days which could be submitted with single dialog
+BULK_SUBMIT_DAYS_LIMIT = 31
 
 
 def check_duration_hours(duration):
@@ -31,6 +33,11 @@ def check_date(day):
         raise ValidationError(
             'Provide date in format year-month-day e.g. {}'.format(date.today().isoformat()), ["day"])
 
+def check_date_to(day):
+    if not validate_date(day):
+        raise ValidationError(
+            'Provide date in format year-month-day e.g. {}'.format(date.today().isoformat()), ["day_to"])
+
 def check_valid_price(price):
     if not validate_price(price):
         raise ValidationError("Provided price is invalid. Expected value bigger than zero")
@@ -73,17 +80,19 @@ class TimeReportingForm(object):
         hours = fields.String(validate=check_duration_hours)
         minutes = fields.String(validate=check_duration_minutes)
         comment = fields.String()
+        day_to = fields.String(allow_none=True, validate=check_date_to)
 
         @post_load
         def make_obj(self, data):
             return TimeReportingForm(**data)
 
-    def __init__(self, project, day, hours, minutes, comment):
+    def __init__(self, project, day, hours, minutes, comment, day_to=None):
         self.project = project
         self.day = day
         self.hours = hours
         self.minutes = minutes
         self.comment = comment
+        self.day_to = day_to
 
 
 class ReportGenerateForm(object):
@@ -94,15 +103,17 @@ class ReportGenerateForm(object):
         day_from = fields.String(validate=check_date)
         day_to = fields.String(validate=check_date_not_from_future)
         user = fields.String(allow_none=True)
+        format = fields.String(allow_none=True)
 
         @post_load
         def make_obj(self, data):
             return ReportGenerateForm(**data)
 
-    def __init__(self, project, day_from, day_to, user: SlackUser = None):
+    def __init__(self, project, day_from, day_to, user: SlackUser = None, format=None):
         self.project = project
         self.day_from = day_from
         self.day_to = day_to
+        self.format = format
         if user:
             self.user = user
 
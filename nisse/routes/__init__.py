@@ -6,6 +6,7 @@ from nisse.routes.time_entry import TimeEntryApi
 from nisse.routes.slack.slack_command import SlackCommand
 from nisse.routes.slack.slack_interactive_message import SlackDialogSubmission
 from nisse.routes.google_auth import google_authorize, google_nisseoauthcallback, google_revoke
+from nisse.utils.metrics import metrics_endpoint
 
 
 def configure_oauth(app: Flask):
@@ -14,7 +15,7 @@ def configure_oauth(app: Flask):
     app.add_url_rule('/google/revoke', 'revoke', google_revoke)
 
 def configure_url_rules(app: Flask):
-    pass
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint(app))
 
 
 def configure_api(api: Api):
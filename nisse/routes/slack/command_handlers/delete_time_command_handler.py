@@ -3,7 +3,6 @@ from typing import List
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
 
 from nisse.models import TimeEntry
 from nisse.models.slack.common import ActionType
@@ -13,16 +12,16 @@ from nisse.models.slack.payload import DeleteTimeEntryPayload
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 from nisse.utils import string_helper
-from nisse.utils.validation_helper import list_find
 
 
 class DeleteTimeCommandHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
+                 slack_client: SlackGateway, project_service: ProjectService,
                  reminder_service: ReminderService):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
 
@@ -36,8 +35,7 @@ class DeleteTimeCommandHandler(SlackCommandHandler):
             # project selected
             project_id_selected = action.selected_options[0].value
 
-            projects = self.project_service.get_projects()
-            selected_project = list_find(lambda p: str(p.project_id) == project_id_selected, projects)
+            selected_project = self.project_service.get_cached_project(project_id_selected)
 
             last_time_entries: List[TimeEntry] = self.user_service.get_last_ten_time_entries(user.user_id,
                                                                                              selected_project.project_id)
@@ -3,7 +3,6 @@ from datetime import datetime
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
 
 from nisse.models.slack.dialog import Element, Dialog
 from nisse.models.slack.payload import Payload, FoodOrderFormPayload
@@ -11,6 +10,7 @@ from nisse.routes.slack.command_handlers.slack_command_handler import SlackComma
 from nisse.services.food_order_service import FoodOrderService
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 from nisse.utils import string_helper
 
@@ -19,7 +19,7 @@ class FoodItemHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
+                 slack_client: SlackGateway, project_service: ProjectService,
                  reminder_service: ReminderService,
                  food_order_service: FoodOrderService):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
@@ -2,7 +2,6 @@ from logging import Logger
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
 
 from nisse.models.slack.common import ActionType
 from nisse.models.slack.message import Action, Attachment, Message, TextSelectOption
@@ -10,6 +9,7 @@ from nisse.models.slack.payload import ListCommandPayload
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService, User
 from nisse.utils import string_helper
 from nisse.utils.date_helper import get_start_end_date, TimeRanges
@@ -18,7 +18,7 @@ from nisse.utils.date_helper import get_start_end_date, TimeRanges
 class ListCommandHandler(SlackCommandHandler):
     @inject
     def __init__(self, config: Config, logger: Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
+                 slack_client: SlackGateway, project_service: ProjectService,
                  reminder_service: ReminderService):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
         self.time_ranges = {
@@ -3,7 +3,6 @@ from typing import List
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
 
 from nisse.models.slack.common import ActionType
 from nisse.models.slack.dialog import Dialog, Element
@@ -13,6 +12,7 @@ from nisse.models.slack.payload import ProjectAddPayload
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 from nisse.utils import string_helper
 
@@ -21,7 +21,7 @@ class ProjectCommandHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
+                 slack_client: SlackGateway, project_service: ProjectService,
                  reminder_service: ReminderService):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
 
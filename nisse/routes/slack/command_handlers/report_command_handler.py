@@ -1,15 +1,9 @@
 import logging
-import os
-import uuid
 from typing import List
 
-from flask import current_app
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
-from werkzeug.utils import secure_filename
 
-from nisse.models.DTO import PrintParametersDto
 from nisse.models.slack.common import ActionType
 from nisse.models.slack.common import LabelSelectOption
 from nisse.models.slack.dialog import Element, Dialog
@@ -18,90 +12,51 @@ from nisse.models.slack.payload import ReportGenerateFormPayload
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
-from nisse.services.report_service import ReportService
+from nisse.services.report_job_queue import ReportJobQueue
+from nisse.services.report_job_service import ReportJobService
+from nisse.services.report_renderer import REPORT_FORMAT_XLSX, REPORT_FORMAT_CSV, REPORT_FORMAT_JSONL
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
-from nisse.services.xlsx_document_service import XlsxDocumentService
 from nisse.utils import string_helper
 from nisse.utils.date_helper import TimeRanges
-from nisse.utils.date_helper import get_start_end_date
-from nisse.utils.validation_helper import list_find
+from nisse.utils.date_helper import get_start_end_date, parse_formatted_date
 
 
 class ReportCommandHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
-                 reminder_service: ReminderService, report_service: ReportService, sheet_generator: XlsxDocumentService):
+                 slack_client: SlackGateway, project_service: ProjectService,
+                 reminder_service: ReminderService, report_job_service: ReportJobService,
+                 report_job_queue: ReportJobQueue):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
-        self.report_service = report_service
-        self.sheet_generator = sheet_generator
+        self.report_job_service = report_job_service
+        self.report_job_queue = report_job_queue
 
     def handle(self, payload: ReportGenerateFormPayload):
 
         if payload.submission:
-            date_to = payload.submission.day_to
-            date_from = payload.submission.day_from
-
             selected_user_id = None
-            if hasattr(payload.submission, 'user'):
-                selected_user_id = payload.submission.user
-
-            project_id = payload.submission.project
+            if hasattr(payload.submission, 'user') and payload.submission.user:
+                selected_user_id = int(payload.submission.user)
 
-            print_param = PrintParametersDto()
-            print_param.date_to = date_to
-            print_param.date_from = date_from
-            print_param.project_id = project_id
-
-            # todo cache projects globally e.g. Flask-Cache
-            projects = self.project_service.get_projects()
-            selected_project = list_find(lambda p: str(p.project_id) == print_param.project_id, projects)
+            project_id = int(payload.submission.project) if payload.submission.project else None
 
             user = self.get_user_by_slack_user_id(payload.user.id)
 
-            selected_user = None
+            report_user_id = None
             if user.role.role != 'admin':
-                print_param.user_id = user.user_id
+                report_user_id = user.user_id
             # if admin select proper user
             elif selected_user_id is not None:
-                print_param.user_id = selected_user_id
-                selected_user = self.user_service.get_user_by_id(selected_user_id)
-
-            # generate report
-            path_for_report = os.path.join(current_app.instance_path, current_app.config["REPORT_PATH"],
-                                           secure_filename(str(uuid.uuid4())) + ".xlsx")
-            load_data = self.report_service.load_report_data(print_param)
-            self.sheet_generator.save_report(path_for_report, print_param.date_from, print_param.date_to, load_data)
-
-            im_channel = self.slack_client.api_call("im.open", user=payload.user.id)
-
-            if not im_channel["ok"]:
-                self.logger.error("Can't open im channel for: " + str(selected_user_id) + '. ' + im_channel["error"])
-
-            selected_project_name = "all projects"
-            if selected_project is not None:
-                selected_project_name = selected_project.name
-
-            resp = self.slack_client.api_call(
-                "files.upload",
-                channels=im_channel['channel']['id'],
-                file=open(path_for_report, 'rb'),
-                title=string_helper.generate_xlsx_title(selected_user, selected_project_name, print_param.date_from,
-                                                        print_param.date_to),
-                filetype="xlsx",
-                filename=string_helper.generate_xlsx_file_name(selected_user, selected_project_name,
-                                                               print_param.date_from,
-                                                               print_param.date_to)
-            )
+                report_user_id = selected_user_id
 
-            try:
-                os.remove(path_for_report)
-            except OSError as err:
-                self.logger.error("Cannot delete report file {0}".format(err))
-
-            if not resp["ok"]:
-                self.logger.error("Can't send report: " + resp.get("error"))
+            # report is generated in background, Slack expects the dialog to be acknowledged within 3 seconds
+            job = self.report_job_service.create_job(payload.user.id, report_user_id, project_id,
+                                                     parse_formatted_date(payload.submission.day_from),
+                                                     parse_formatted_date(payload.submission.day_to),
+                                                     payload.submission.format or REPORT_FORMAT_XLSX)
+            self.report_job_queue.submit(job.report_job_id)
 
         else:
             self.show_dialog({'trigger_id': payload.trigger_id}, None, next(iter(payload.actions.values())))
@@ -114,8 +69,7 @@ class ReportCommandHandler(SlackCommandHandler):
 
         start_end = get_start_end_date(selected_period)
 
-        # todo cache it globally e.g. Flask-Cache
-        projects = self.project_service.get_projects()
+        projects = self.project_service.get_cached_projects()
         project_options_list: List[LabelSelectOption] = [LabelSelectOption(label=p.name, value=p.project_id) for p in
                                                          projects]
 
@@ -126,7 +80,12 @@ class ReportCommandHandler(SlackCommandHandler):
             Element(label="Date from", type="text", name='day_from', placeholder="Specify date", value=start_end[0]),
             Element(label="Date to", type="text", name='day_to', placeholder="Specify date", value=start_end[1]),
             Element(label="Project", type="select", name='project', optional='true', placeholder="Select a project",
-                    options=project_options_list)
+                    options=project_options_list),
+            Element(label="Format", type="select", name='format', value=REPORT_FORMAT_XLSX,
+                    placeholder="Select file format",
+                    options=[LabelSelectOption(label="Excel workbook", value=REPORT_FORMAT_XLSX),
+                             LabelSelectOption(label="CSV", value=REPORT_FORMAT_CSV),
+                             LabelSelectOption(label="JSON lines", value=REPORT_FORMAT_JSONL)])
         ]
 
         dialog: Dialog = Dialog(title="Generate report", submit_label="Generate",
@@ -148,6 +107,9 @@ class ReportCommandHandler(SlackCommandHandler):
 
     def report_pre_dialog(self, command_body, arguments, action):
 
+        if len(arguments) and arguments[0] == 'status':
+            return self.report_status(command_body['user_id'])
+
         message_text = "I'm going to generate report..."
         inner_user_id = None
 
@@ -183,3 +145,18 @@ class ReportCommandHandler(SlackCommandHandler):
             mrkdwn=True,
             attachments=attachments
         ).dump()
+
+    def report_status(self, slack_user_id):
+        jobs = self.report_job_service.get_user_jobs(slack_user_id)
+        if not jobs:
+            message_text = "You haven't requested any reports yet"
+        else:
+            message_text = "Your recent reports:\n" + "\n".join(
+                "`{0}` - `{1}` {2}: *{3}*".format(job.date_from, job.date_to, job.report_format, job.status)
+                for job in jobs)
+
+        return Message(
+            text=message_text,
+            response_type="ephemeral",
+            mrkdwn=True
+        ).dump()
@@ -2,7 +2,6 @@ from logging import Logger
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
 
 from nisse.models.database import User
 from nisse.models.slack.dialog import Dialog
@@ -11,13 +10,14 @@ from nisse.models.slack.payload import Payload
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 
 
 class ShowHelpCommandHandler(SlackCommandHandler):
     @inject
     def __init__(self, config: Config, logger: Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
+                 slack_client: SlackGateway, project_service: ProjectService,
                  reminder_service: ReminderService):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
 
@@ -50,6 +50,11 @@ class ShowHelpCommandHandler(SlackCommandHandler):
                 attachment_type="default",
                 mrkdwn_in=["text"]
             ),
+            Attachment(
+                text="*{0} report status*: See status of requested reports".format(command_name),
+                attachment_type="default",
+                mrkdwn_in=["text"]
+            ),
             Attachment(
                 text='*{0} vacation*: Submit free time within range'.format(command_name),
                 attachment_type="default",
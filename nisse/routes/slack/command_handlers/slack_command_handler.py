@@ -4,15 +4,16 @@ from datetime import datetime
 from typing import List
 
 from flask.config import Config
-from slackclient import SlackClient
 
 from nisse.models.slack.common import LabelSelectOption
 from nisse.models.slack.dialog import Dialog
 from nisse.models.slack.message import TextSelectOption
 from nisse.models.slack.payload import Payload
 from nisse.services.exception import SlackUserException
+from nisse.services.im_channel_service import ImChannelService
 from nisse.services.project_service import Project, ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 
 USER_ROLE_USER = 'user'
@@ -21,7 +22,7 @@ DEFAULT_REMIND_TIME_FOR_NEWLY_ADDED_USER = "16:00"
 
 
 class SlackCommandHandler(ABC):
-    def __init__(self, config: Config, logger: logging.Logger, user_service: UserService, slack_client: SlackClient,
+    def __init__(self, config: Config, logger: logging.Logger, user_service: UserService, slack_client: SlackGateway,
                  project_service: ProjectService, reminder_service: ReminderService):
         self.config = config
         self.user_service = user_service
@@ -29,6 +30,7 @@ class SlackCommandHandler(ABC):
         self.slack_client = slack_client
         self.project_service = project_service
         self.reminder_service = reminder_service
+        self.im_channel_service = ImChannelService(user_service, slack_client, logger)
 
     def get_user_by_slack_user_id(self, slack_user_id):
 
@@ -87,28 +89,24 @@ class SlackCommandHandler(ABC):
         return datetime.now()
 
     def send_message_to_client(self, slack_user_id, message: str):
-        im_channel = self.slack_client.api_call("im.open", user=slack_user_id)
-
-        if not im_channel["ok"]:
-            self.logger.error("Can't open im channel for: " + str(slack_user_id) + '. ' + im_channel["error"])
-            return
-
-        self.slack_client.api_call("chat.postMessage", channel=im_channel['channel']['id'], text=message, as_user=True)
+        self.im_channel_service.api_call("chat.postMessage", slack_user_id, text=message, as_user=True)
 
     def get_default_project_id(self, first_id: str, user) -> str:
         if user is not None:
             user_last_time_entry = self.user_service.get_user_last_time_entry(user.user_id)
             if user_last_time_entry is not None:
-                return user_last_time_entry.project.project_id
+                return user_last_time_entry.project_id
 
         return first_id
 
     def get_projects_option_list_as_text(self, user_id=None) -> List[TextSelectOption]:
-        projects = self.project_service.get_projects_by_user(user_id) if user_id else self.project_service.get_projects()
+        projects = self.project_service.get_cached_projects_by_user(user_id) if user_id \
+            else self.project_service.get_cached_projects()
         return [TextSelectOption(p.name, p.project_id) for p in projects]
 
     def get_projects_option_list_as_label(self, user_id=None) -> List[LabelSelectOption]:
-        projects = self.project_service.get_projects_by_user(user_id) if user_id else self.project_service.get_projects()
+        projects = self.project_service.get_cached_projects_by_user(user_id) if user_id \
+            else self.project_service.get_cached_projects()
         return [LabelSelectOption(p.name, p.project_id) for p in projects]
 
     def extract_slack_user_id(self, user):
@@ -2,7 +2,6 @@ import logging
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
 
 from nisse.models.slack.dialog import Dialog
 from nisse.models.slack.payload import RemindTimeReportBtnPayload
@@ -10,6 +9,7 @@ from nisse.routes.slack.command_handlers.slack_command_handler import SlackComma
 from nisse.routes.slack.command_handlers.submit_time_command_handler import SubmitTimeCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 
 
@@ -17,7 +17,7 @@ class SubmitTimeButtonHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
+                 slack_client: SlackGateway, project_service: ProjectService,
                  reminder_service: ReminderService, submit_time_command_handler: SubmitTimeCommandHandler):
         super().__init__(config, logger, user_service, slack_client, project_service, reminder_service)
         self.submit_time_command_handler = submit_time_command_handler
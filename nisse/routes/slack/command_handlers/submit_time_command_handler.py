@@ -5,30 +5,32 @@ from typing import List
 
 from flask.config import Config
 from flask_injector import inject
-from slackclient import SlackClient
+from marshmallow import ValidationError
 
 from nisse.models.DTO import TimeRecordDto
 from nisse.models.slack.common import LabelSelectOption
 from nisse.models.slack.dialog import Element, Dialog
 from nisse.models.slack.message import Attachment
-from nisse.models.slack.payload import TimeReportingFormPayload, DAILY_HOUR_LIMIT
+from nisse.models.slack.payload import TimeReportingFormPayload, DAILY_HOUR_LIMIT, BULK_SUBMIT_DAYS_LIMIT
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
+from nisse.services.time_entry_service import TimeEntryService
 from nisse.services.user_service import UserService
 from nisse.utils import string_helper
 from nisse.utils.date_helper import get_float_duration
-from nisse.utils.validation_helper import list_find
 
 
 class SubmitTimeCommandHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-                 slack_client: SlackClient, project_service: ProjectService,
-                 reminder_service: ReminderService):
+                 slack_client: SlackGateway, project_service: ProjectService,
+                 reminder_service: ReminderService, time_entry_service: TimeEntryService):
         super().__init__(config, logger, user_service,
                          slack_client, project_service, reminder_service)
+        self.time_entry_service = time_entry_service
 
     def handle(self, payload: TimeReportingFormPayload):
 
@@ -38,11 +40,24 @@ class SubmitTimeCommandHandler(SlackCommandHandler):
             minutes=int(payload.submission.minutes),
             comment=payload.submission.comment,
             project=payload.submission.project,
-            user_id=payload.user.id
+            user_id=payload.user.id,
+            day_to=payload.submission.day_to
         )
 
+        if time_record.day_to:
+            self.validate_date_range(time_record.get_parsed_date(), time_record.get_parsed_date_to())
+
         self.save_submitted_time_task(time_record)
 
+    @staticmethod
+    def validate_date_range(date_from: date, date_to: date):
+        if date_to < date_from:
+            raise ValidationError('End day must not be lower than day', ['day_to'])
+
+        if (date_to - date_from).days >= BULK_SUBMIT_DAYS_LIMIT:
+            raise ValidationError('You can submit at most {0} days at once'.format(BULK_SUBMIT_DAYS_LIMIT),
+                                  ['day_to'])
+
     def create_dialog(self, command_body, argument, action) -> Dialog:
         slack_user_id = command_body['user_id']
         report_date = self.current_date().strftime("%Y-%m-%d") if(isinstance(action, str) or action is None) else action.value
@@ -59,6 +74,8 @@ class SubmitTimeCommandHandler(SlackCommandHandler):
             Element("Project", "select", "project", "Select a project", user_default_project_id, None, None,
                     project_options_list),
             Element("Day", "text", "day", "Specify date", report_date),
+            Element("End day", "text", "day_to", "Specify date", None, None,
+                    "Fill to submit the same time for every working day until this day", None, 'true'),
             Element("Duration hours", "select", "hours", None, "8", None,
                     None, SubmitTimeCommandHandler.get_duration_hours()),
             Element("Duration minutes", "select", "minutes", None, "0",
@@ -80,57 +97,86 @@ class SubmitTimeCommandHandler(SlackCommandHandler):
 
         user = self.get_user_by_slack_user_id(time_record.user_id)
 
-        im_channel = self.slack_client.api_call(
-            "im.open", user=time_record.user_id)
-
-        if not im_channel["ok"]:
-            self.logger.error("Can't open im channel for: " +
-                              str(time_record.user_id) + '. ' + im_channel["error"])
-            return
-
-        # todo cache projects globally e.g. Flask-Cache
-        projects = self.project_service.get_projects()
-        selected_project = list_find(lambda p: str(
-            p.project_id) == time_record.project, projects)
+        selected_project = self.project_service.get_cached_project(time_record.project)
 
         if selected_project is None:
             self.logger.error("Project doesn't exist: " + time_record.project)
             return
 
-        if list_find(lambda p: str(p.project_id) == time_record.project, user.user_projects) is None:
+        if not self.project_service.is_user_assigned(user.user_id, selected_project.project_id):
             self.project_service.assign_user_to_project(
                 project=selected_project, user=user)
 
-            # check if submitted hours doesn't exceed the limit
-        submitted_time_entries = self.user_service.get_user_time_entries(user.user_id, time_record.get_parsed_date(),
-                                                                         time_record.get_parsed_date())
         duration_float: float = get_float_duration(
             time_record.hours, time_record.minutes)
-        if sum([te.duration for te in submitted_time_entries]) + Decimal(duration_float) > DAILY_HOUR_LIMIT:
-            self.slack_client.api_call(
+
+        if time_record.day_to and time_record.get_parsed_date_to() != time_record.get_parsed_date():
+            self.save_submitted_time_range(time_record, selected_project, user, duration_float)
+            return
+
+        # entry is added only if submitted hours don't exceed the limit
+        time_entry = self.time_entry_service.add_time_entry(user.user_id, selected_project.project_id, duration_float,
+                                                            time_record.comment, time_record.get_parsed_date(),
+                                                            DAILY_HOUR_LIMIT)
+        if time_entry is None:
+            self.im_channel_service.api_call(
                 "chat.postMessage",
-                channel=im_channel['channel']['id'],
+                time_record.user_id,
                 text="Sorry, but You can't submit more than " +
                 str(DAILY_HOUR_LIMIT) + " hours for one day.",
                 as_user=True
             )
             return
 
-        self.project_service.report_user_time(selected_project, user, duration_float, time_record.comment,
-                                              time_record.get_parsed_date())
+        self.post_submitted_message(
+            time_record.user_id,
+            'Submitted ' + string_helper.format_duration_decimal(Decimal(duration_float)) + ' hour(s) for ' +
+            ('Today' if time_record.day == date.today().isoformat() else time_record.day) + ' in ' +
+            selected_project.name + " :clap:",
+            "_" + time_record.comment + "_")
+
+    def save_submitted_time_range(self, time_record: TimeRecordDto, selected_project, user, duration_float: float):
+        """ Submits the same time for every working day of the range which is not user vacation
+        """
+        days = self.time_entry_service.get_days_to_report(user.user_id, time_record.get_parsed_date(),
+                                                          time_record.get_parsed_date_to())
+        result = self.time_entry_service.add_time_entries(user.user_id, selected_project.project_id, duration_float,
+                                                          time_record.comment, days, DAILY_HOUR_LIMIT)
+
+        if not result.added_days:
+            self.im_channel_service.api_call(
+                "chat.postMessage",
+                time_record.user_id,
+                text="Nothing submitted, between " + time_record.day + " and " + time_record.day_to +
+                " there is no working day out of vacation with less than " + str(DAILY_HOUR_LIMIT) +
+                " hours reported.",
+                as_user=True
+            )
+            return
+
+        text = "_" + time_record.comment + "_"
+        if result.over_limit_days:
+            text += "\nSkipped days exceeding " + str(DAILY_HOUR_LIMIT) + " hours: " + \
+                    ", ".join(day.isoformat() for day in result.over_limit_days)
+
+        self.post_submitted_message(
+            time_record.user_id,
+            'Submitted ' + string_helper.format_duration_decimal(Decimal(duration_float)) + ' hour(s) for ' +
+            str(len(result.added_days)) + ' day(s) from ' + result.added_days[0].isoformat() + ' to ' +
+            result.added_days[-1].isoformat() + ' in ' + selected_project.name + " :clap:",
+            text)
 
+    def post_submitted_message(self, slack_user_id: str, title: str, text: str):
         attachments = [Attachment(
-            title='Submitted ' + string_helper.format_duration_decimal(Decimal(duration_float)) + ' hour(s) for ' +
-                  (
-                      'Today' if time_record.day == date.today().isoformat() else time_record.day) + ' in ' + selected_project.name + " :clap:",
-            text="_" + time_record.comment + "_",
+            title=title,
+            text=text,
             mrkdwn_in=["text", "footer"],
             footer=self.config['MESSAGE_SUBMIT_TIME_TIP']
         ).dump()]
 
-        resp = self.slack_client.api_call(
+        resp = self.im_channel_service.api_call(
             "chat.postMessage",
-            channel=im_channel['channel']['id'],
+            slack_user_id,
             attachments=attachments,
             as_user=True
         )
@@ -5,7 +5,6 @@ from typing import List
 from flask.config import Config
 from flask_injector import inject
 from marshmallow import ValidationError
-from slackclient import SlackClient
 
 from nisse.models.database import Vacation
 from nisse.models.slack.common import ActionType
@@ -16,6 +15,7 @@ from nisse.routes.slack.command_handlers.slack_command_handler import SlackComma
 from nisse.services import GoogleCalendarService
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
 from nisse.services.user_service import UserService
 from nisse.services.vacation_service import VacationService
 from nisse.utils import string_helper
@@ -26,7 +26,7 @@ class VacationCommandHandler(SlackCommandHandler):
 
     @inject
     def __init__(self, config: Config, logger: logging.Logger, user_service: UserService,
-        slack_client: SlackClient, project_service: ProjectService, 
+        slack_client: SlackGateway, project_service: ProjectService, 
         reminder_service: ReminderService, vacation_service: VacationService,
         calendar_service: GoogleCalendarService
         ):
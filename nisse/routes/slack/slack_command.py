@@ -17,7 +17,9 @@ from nisse.routes.slack.command_handlers.show_help_command_handler import ShowHe
 from nisse.routes.slack.command_handlers.submit_time_command_handler import SubmitTimeCommandHandler
 from nisse.routes.slack.command_handlers.vacation_command_handler import VacationCommandHandler
 from nisse.scheduled.scheduled_tasks import ScheduledTasks
+from nisse.services.deferred_command_executor import DeferredCommandExecutor
 from nisse.services.exception import DataException, SlackUserException
+from nisse.utils.metrics import set_action
 
 
 class SlackCommand(Resource):
@@ -33,8 +35,10 @@ class SlackCommand(Resource):
                  delete_time_command_handler: DeleteTimeCommandHandler,
                  project_command_handler: ProjectCommandHandler,
                  food_command_handler: FoodCommandHandler,
-                 scheduled_tasks: ScheduledTasks):
+                 scheduled_tasks: ScheduledTasks,
+                 command_executor: DeferredCommandExecutor):
         self.app = app
+        self.command_executor = command_executor
         self.set_reminder_handler = set_reminder_handler
         self.error_schema = Error.Schema()
         self.dispatcher = {
@@ -67,10 +71,15 @@ class SlackCommand(Resource):
         params = command_body["text"].split(" ") or []
         action = params[0]
         arguments = params[1:]
+        set_action(action if action in self.dispatcher else 'other')
 
         try:
             callback = self.dispatcher.get(action, self.handle_other)
-            result = callback(command_body, arguments, action)
+            if self.command_executor.is_deferred(action):
+                ack = self.command_executor.submit(action, callback, command_body, arguments)
+                if ack:
+                    return ack, 200
+            result = self.command_executor.run(action, callback, command_body, arguments)
             return (result, 200) if result else (None, 204)
 
         except DataException as e:
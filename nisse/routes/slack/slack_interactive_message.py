@@ -12,6 +12,7 @@ from marshmallow import ValidationError, UnmarshalResult
 from nisse.models.slack.errors import Error
 from nisse.models.slack.payload import Payload, GenericPayloadSchema
 from nisse.routes.slack.command_handlers.slack_command_handler import SlackCommandHandler
+from nisse.utils.metrics import set_action
 
 
 class SlackDialogSubmission(Resource):
@@ -39,6 +40,7 @@ class SlackDialogSubmission(Resource):
 
         else:
             payload: Payload = result.data
+            set_action(type(payload).__name__)
 
             try:
                 if payload.handler_type() is not None:
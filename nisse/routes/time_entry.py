@@ -1,7 +1,6 @@
 from flask_restful import Resource, request
 from flask_injector import inject
 from nisse.services import ProjectApiService
-from nisse.utils.date_helper import get_float_duration
 import datetime
 
 
@@ -19,8 +18,8 @@ class TimeEntryApi(Resource):
         project_id = rq_json['project_id']
 
         created_time_entry = self.project_service.report_user_time(
-            project_id, user_id, get_float_duration(hours, minutes), comment, datetime.date.now())
-        return created_time_entry, 201, {'x-created-id': created_time_entry.time_entry_id}
+            project_id, user_id, (hours * 60 + minutes) * 60, datetime.datetime.now(), comment)
+        return created_time_entry, 201, {'x-created-id': created_time_entry['time_entry_id']}
 
     def get(self, project_id: int, user_id: int):
         return None, 200
\ No newline at end of file
@@ -5,15 +5,21 @@ from flask.config import Config
 from flask_injector import Binder
 from flask_injector import request, singleton
 from flask_sqlalchemy import SQLAlchemy
-from slackclient import SlackClient
 from sqlalchemy.orm import Session
 
 from nisse.models import Base
+from nisse.services.business_calendar_service import BusinessCalendarService
+from nisse.services.deferred_command_executor import DeferredCommandExecutor
 from nisse.services.google_calendar_service import GoogleCalendarService
 from nisse.services.oauth_store import OAuthStore
 from nisse.services.project_api_service import ProjectApiService, _get_workday_date_n_days_ago
 from nisse.services.project_service import ProjectService
 from nisse.services.reminder_service import ReminderService
+from nisse.services.report_file_cache import ReportFileCache
+from nisse.services.report_job_queue import ReportJobQueue
+from nisse.services.report_job_service import ReportJobService
+from nisse.services.slack_gateway import SlackGateway
+from nisse.services.time_entry_service import TimeEntryService
 from nisse.services.token_service import TokenService
 from nisse.services.user_service import UserService
 from nisse.services.vacation_service import VacationService
@@ -35,10 +41,15 @@ def configure_container(binder: Binder):
 
     binder.bind(UserService, scope=request)
 
+    binder.bind(TimeEntryService, scope=request)
+
     binder.bind(VacationService, scope=request)
 
-    binder.bind(SlackClient, to=SlackClient(
-        binder.injector.get(Flask).config['SLACK_BOT_ACCESS_TOKEN']))
+    binder.bind(BusinessCalendarService, scope=request)
+
+    binder.bind(SlackGateway, to=SlackGateway.from_config(binder.injector.get(Flask).config,
+                                                          binder.injector.get(logging.Logger)),
+                scope=singleton)
 
     binder.bind(ReminderService, to=ReminderService(binder.injector.get(UserService),
                                                     binder.injector.get(
@@ -47,6 +58,25 @@ def configure_container(binder: Binder):
 
     binder.bind(GoogleCalendarService, scope=request)
 
+    binder.bind(ReportJobService, scope=request)
+
+    binder.bind(ReportJobQueue, to=ReportJobQueue(binder.injector.get(Flask),
+                                                  binder.injector.get(SQLAlchemy),
+                                                  binder.injector.get(SlackGateway),
+                                                  binder.injector.get(logging.Logger),
+                                                  binder.injector.get(Flask).config['REPORT_WORKERS'],
+                                                  binder.injector.get(Flask).config['REPORT_JOB_MAX_ATTEMPTS'],
+                                                  ReportFileCache.from_config(binder.injector.get(Flask).instance_path,
+                                                                              binder.injector.get(Flask).config),
+                                                  binder.injector.get(Flask).config['REPORT_JOB_LEASE_SECONDS']),
+                scope=singleton)
+
+    binder.bind(DeferredCommandExecutor, to=DeferredCommandExecutor.from_config(binder.injector.get(SQLAlchemy),
+                                                                                binder.injector.get(SlackGateway),
+                                                                                binder.injector.get(logging.Logger),
+                                                                                binder.injector.get(Flask).config),
+                scope=singleton)
+
     binder.bind(Config, to=binder.injector.get(Flask).config, scope=singleton)
 
     binder.bind(OAuthStore, scope=singleton)
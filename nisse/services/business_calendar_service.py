@@ -0,0 +1,137 @@
+import time
+from datetime import date, timedelta
+from typing import NamedTuple, List, Set, Iterable, Tuple
+
+from flask_injector import inject
+from sqlalchemy.orm import Session
+
+from nisse.models.database import CompanyDayOff
+from nisse.utils.cache import LruCache
+from nisse.utils.date_helper import get_holidays_poland
+
+DAY_OFF_SOURCE_MANUAL = 'manual'
+DAY_OFF_SOURCE_CALENDAR = 'calendar'
+
+# days off added by other processes are picked up after this time
+CALENDAR_CACHE_TTL_SECONDS = 15 * 60
+
+# year -> YearCalendar, shared by all requests of the process
+business_calendar_cache = LruCache(maxsize=32)
+
+
+class YearCalendar(NamedTuple):
+    year: int
+    first_ordinal: int
+    # bit n is set when n-th day of the year is a public holiday or company day off
+    days_off: int
+    loaded_at: float
+
+    def is_day_off(self, day: date) -> bool:
+        return bool(self.days_off >> (day.toordinal() - self.first_ordinal) & 1)
+
+
+class BusinessCalendarService(object):
+    """
+    Working days calendar made of built in public holidays and company days off stored in database,
+    every year is loaded once and kept as a bitset
+    """
+    @inject
+    def __init__(self, session: Session):
+        self.db = session
+        self.clock = time.monotonic
+
+    def get_year(self, year: int) -> YearCalendar:
+        calendar = business_calendar_cache.get(year)
+        if calendar is None or self.clock() - calendar.loaded_at > CALENDAR_CACHE_TTL_SECONDS:
+            calendar = self.load_year(year)
+            business_calendar_cache.put(year, calendar)
+        return calendar
+
+    def load_year(self, year: int) -> YearCalendar:
+        first_ordinal = date(year, 1, 1).toordinal()
+        days_off = 0
+        for day in get_holidays_poland(year):
+            days_off |= 1 << (day.toordinal() - first_ordinal)
+
+        for (day,) in self.db.query(CompanyDayOff.day) \
+                .filter(CompanyDayOff.day >= date(year, 1, 1), CompanyDayOff.day <= date(year, 12, 31)):
+            days_off |= 1 << (day.toordinal() - first_ordinal)
+
+        return YearCalendar(year, first_ordinal, days_off, self.clock())
+
+    def is_day_off(self, day: date) -> bool:
+        """ Returns true for public holidays and company days off, weekends are not taken into account
+        """
+        return self.get_year(day.year).is_day_off(day)
+
+    def is_working_day(self, day: date) -> bool:
+        return day.weekday() < 5 and not self.is_day_off(day)
+
+    def working_days_between(self, date_from: date, date_to: date) -> List[date]:
+        """ Returns working days within given range, both ends included
+        """
+        working_days = []
+        for year in range(date_from.year, date_to.year + 1):
+            calendar = self.get_year(year)
+            start = max(date_from, date(year, 1, 1)).toordinal()
+            end = min(date_to, date(year, 12, 31)).toordinal()
+            # ordinal 1 is Monday, 0001-01-01
+            working_days.extend(date.fromordinal(ordinal) for ordinal in range(start, end + 1)
+                                if (ordinal - 1) % 7 < 5
+                                and not calendar.days_off >> (ordinal - calendar.first_ordinal) & 1)
+        return working_days
+
+    def get_non_working_days(self, date_from: date, date_to: date) -> Set[date]:
+        """ Returns weekends, holidays and company days off within given range, both ends included
+        """
+        all_days = {date_from + timedelta(days=n) for n in range((date_to - date_from).days + 1)}
+        return all_days.difference(self.working_days_between(date_from, date_to))
+
+    def get_workday_n_days_ago(self, days_ago: int, day: date) -> date:
+        days_subtracted = 0
+        while days_subtracted < days_ago:
+            day = day - timedelta(days=1)
+            if self.is_working_day(day):
+                days_subtracted += 1
+        return day
+
+    def get_days_off(self, year: int) -> List[CompanyDayOff]:
+        return self.db.query(CompanyDayOff) \
+            .filter(CompanyDayOff.day >= date(year, 1, 1), CompanyDayOff.day <= date(year, 12, 31)) \
+            .order_by(CompanyDayOff.day) \
+            .all()
+
+    def add_day_off(self, day: date, description: str, source: str = DAY_OFF_SOURCE_MANUAL) -> CompanyDayOff:
+        day_off = CompanyDayOff(day=day, description=description, source=source)
+        self.db.add(day_off)
+        self.db.commit()
+        business_calendar_cache.pop(day.year)
+        return day_off
+
+    def remove_day_off(self, day: date):
+        self.db.query(CompanyDayOff).filter(CompanyDayOff.day == day).delete(synchronize_session=False)
+        self.db.commit()
+        business_calendar_cache.pop(day.year)
+
+    def sync_days_off(self, year: int, days_off: Iterable[Tuple[date, str]]) -> int:
+        """
+        Replaces days off of the year imported from external calendar, days added manually are kept
+        :return: number of imported days
+        """
+        self.db.query(CompanyDayOff) \
+            .filter(CompanyDayOff.source == DAY_OFF_SOURCE_CALENDAR,
+                    CompanyDayOff.day >= date(year, 1, 1), CompanyDayOff.day <= date(year, 12, 31)) \
+            .delete(synchronize_session=False)
+
+        existing = {day_off.day for day_off in self.get_days_off(year)}
+        imported = 0
+        for day, description in days_off:
+            if day.year != year or day in existing:
+                continue
+            self.db.add(CompanyDayOff(day=day, description=description, source=DAY_OFF_SOURCE_CALENDAR))
+            existing.add(day)
+            imported += 1
+
+        self.db.commit()
+        business_calendar_cache.pop(year)
+        return imported
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import copy_current_request_context
+from flask_sqlalchemy import SQLAlchemy
+
+from nisse.models.slack.message import Message
+from nisse.services.exception import DataException, SlackUserException
+from nisse.services.slack_gateway import SlackGateway, MethodMetrics
+from nisse.utils.metrics import metrics_registry
+
+# Slack drops slash command responses which come later
+SLACK_COMMAND_DEADLINE_SECONDS = 3
+
+
+class DeferredCommandExecutor(object):
+    """
+    Runs slash commands opted in by configuration on bounded pool of worker threads, so the request is
+    acknowledged at once and the result is posted to the response_url of the command. Keeps timings of
+    all commands, deferred ones are measured both in queue and while running
+    """
+    def __init__(self, db: SQLAlchemy, slack_gateway: SlackGateway, logger: logging.Logger, commands,
+                 workers: int, max_pending: int, ack_text: str, clock=time.monotonic):
+        self.db = db
+        self.slack_gateway = slack_gateway
+        self.logger = logger
+        self.commands = set(commands or [])
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.ack_text = ack_text
+        self.clock = clock
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def from_config(db: SQLAlchemy, slack_gateway: SlackGateway, logger: logging.Logger, config):
+        return DeferredCommandExecutor(db, slack_gateway, logger,
+                                       commands=config['SLACK_DEFERRED_COMMANDS'],
+                                       workers=config['SLACK_DEFERRED_WORKERS'],
+                                       max_pending=config['SLACK_DEFERRED_MAX_PENDING'],
+                                       ack_text=config['SLACK_DEFERRED_ACK_TEXT'])
+
+    def is_deferred(self, action) -> bool:
+        return action in self.commands
+
+    def run(self, action, callback, command_body, arguments):
+        """ Runs command in request thread
+        """
+        started = self.clock()
+        error = True
+        try:
+            result = callback(command_body, arguments, action)
+            error = False
+            return result
+        finally:
+            self.record(action, self.clock() - started, error)
+
+    def submit(self, action, callback, command_body, arguments):
+        """
+        Queues command for background run
+        :return: acknowledgement to respond with, None when there are too many pending commands
+        """
+        if not command_body.get('response_url') or not self.pending.acquire(blocking=False):
+            return None
+
+        command_body = dict(command_body)
+        queued = self.clock()
+
+        @copy_current_request_context
+        def deferred():
+            try:
+                self.record(action, self.clock() - queued, False, wait=True)
+                self.respond(command_body['response_url'], self.run_deferred(action, callback, command_body,
+                                                                             arguments))
+            except Exception:
+                self.logger.exception('Deferred command {0} failed'.format(action))
+            finally:
+                self.db.session.remove()
+                self.pending.release()
+
+        try:
+            self.executor.submit(deferred)
+        except Exception:
+            self.pending.release()
+            raise
+        return Message(text=self.ack_text, response_type="ephemeral").dump()
+
+    def run_deferred(self, action, callback, command_body, arguments):
+        try:
+            return self.run(action, callback, command_body, arguments)
+        except (DataException, SlackUserException) as e:
+            return Message(text=e.message, response_type="ephemeral").dump()
+        except Exception:
+            self.logger.exception('Command {0} failed'.format(action))
+            return Message(text="Sorry, something went wrong :disappointed:", response_type="ephemeral").dump()
+
+    def respond(self, response_url: str, result):
+        if not result:
+            return
+        if isinstance(result, str):
+            result = Message(text=result, response_type="ephemeral").dump()
+        resp = self.slack_gateway.post_response(response_url, result)
+        if not resp["ok"]:
+            self.logger.error("Can't post command response: " + str(resp.get("error")))
+
+    def record(self, action, seconds: float, error: bool, wait: bool = False):
+        if seconds > SLACK_COMMAND_DEADLINE_SECONDS and not wait:
+            self.logger.warning('Command {0} took {1:.2f}s'.format(action, seconds))
+        name = action + '.wait' if wait else action
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = MethodMetrics()
+            self.metrics[name].add(seconds, error)
+        metrics_registry.observe('nisse_command_seconds', 'Slash command run and queue time', seconds,
+                                 command=action, phase='wait' if wait else 'run')
+
+    def get_metrics(self) -> dict:
+        """ Returns command -> timing statistics, time spent in queue by deferred commands is kept as command.wait
+        """
+        with self.lock:
+            return {action: metrics.to_dict() for action, metrics in self.metrics.items()}
@@ -6,6 +6,7 @@ from flask_injector import inject
 from googleapiclient.discovery import build
 
 from nisse.services.oauth_store import OAuthStore
+from nisse.utils.date_helper import parse_formatted_date, date_range
 
 
 class GoogleCalendarService(object):
@@ -31,6 +32,24 @@ class GoogleCalendarService(object):
             .execute()
         return free_days_result.get('items', [])
 
+    def get_holidays(self, year: int):
+        """ Returns (day, summary) for every day of all day events in holidays calendar within the year
+        """
+        holidays_result = self.service.events() \
+            .list(calendarId=self.google_holiday_calendar_id, singleEvents=True, maxResults=2500,
+                  timeMin='{0}-01-01T00:00:00Z'.format(year), timeMax='{0}-01-01T00:00:00Z'.format(year + 1)) \
+            .execute()
+
+        holidays = []
+        for event in holidays_result.get('items', []):
+            if 'date' not in event.get('start', {}):
+                continue
+            start = parse_formatted_date(event['start']['date'])
+            end = parse_formatted_date(event['end']['date']) if 'date' in event.get('end', {}) \
+                else start + timedelta(days=1)
+            holidays.extend((day, event.get('summary')) for day in date_range(start, end))
+        return holidays
+
     def report_free_day(self, slack_user_name:str, user_email: str, from_date: date, to_date: date):
         body = {
             'summary': self.calendar_title_format.format(slack_user_name),
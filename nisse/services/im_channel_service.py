@@ -0,0 +1,60 @@
+import logging
+
+from nisse.services.slack_gateway import SlackGateway
+from nisse.services.user_service import UserService
+from nisse.utils.cache import LruCache
+
+CHANNEL_NOT_FOUND_ERROR = 'channel_not_found'
+
+# slack_user_id -> direct message channel id, shared by all requests of the process
+im_channel_cache = LruCache(maxsize=2048)
+
+
+class ImChannelService(object):
+    """
+    Resolves direct message channel of Slack user, opens it only when it is not known yet
+    """
+    def __init__(self, user_service: UserService, slack_client: SlackGateway, logger: logging.Logger):
+        self.user_service = user_service
+        self.slack_client = slack_client
+        self.logger = logger
+
+    def get_channel_id(self, slack_user_id: str):
+        channel_id = im_channel_cache.get(slack_user_id)
+        if channel_id:
+            return channel_id
+
+        channel_id = self.user_service.get_im_channel_id(slack_user_id)
+        if not channel_id:
+            im_channel = self.slack_client.api_call("im.open", user=slack_user_id)
+            if not im_channel["ok"]:
+                self.logger.error("Can't open im channel for: " + str(slack_user_id) + '. ' + im_channel["error"])
+                return None
+            channel_id = im_channel['channel']['id']
+            self.user_service.set_im_channel_id(slack_user_id, channel_id)
+
+        im_channel_cache.put(slack_user_id, channel_id)
+        return channel_id
+
+    def invalidate(self, slack_user_id: str):
+        im_channel_cache.pop(slack_user_id)
+        self.user_service.set_im_channel_id(slack_user_id, None)
+
+    def api_call(self, method: str, slack_user_id: str, channel_arg: str = 'channel', **kwargs):
+        """
+        Calls Slack method passing direct message channel of the user as channel_arg,
+        reopens the channel once when Slack does not recognize the cached one
+        """
+        for attempt in range(2):
+            channel_id = self.get_channel_id(slack_user_id)
+            if channel_id is None:
+                return {"ok": False, "error": "im_channel_not_available"}
+
+            kwargs[channel_arg] = channel_id
+            resp = self.slack_client.api_call(method, **kwargs)
+            if resp["ok"] or resp.get("error") != CHANNEL_NOT_FOUND_ERROR:
+                return resp
+
+            self.logger.warning("Cached im channel {0} of {1} not found".format(channel_id, slack_user_id))
+            self.invalidate(slack_user_id)
+        return resp
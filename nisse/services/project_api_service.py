@@ -1,16 +1,25 @@
 from werkzeug.exceptions import BadRequest
+from nisse.services.business_calendar_service import BusinessCalendarService
 from nisse.services.project_service import ProjectService
+from nisse.services.time_entry_service import TimeEntryService
 from nisse.services.user_service import UserService
-from nisse.models import Project, TimeEntry, UserProject, User
+from nisse.models import Project, TimeEntry, UserProject
 from datetime import datetime, timedelta
+from decimal import Decimal
 from flask_injector import inject
 
+# Maximum hours which could be reported per user per day
+MAX_HOURS_TO_REPORT = timedelta(hours=8)
+
 
 class ProjectApiService(object):
     @inject
-    def __init__(self, project_service: ProjectService, user_service: UserService):
+    def __init__(self, project_service: ProjectService, user_service: UserService,
+                 business_calendar_service: BusinessCalendarService, time_entry_service: TimeEntryService):
         self.project_service = project_service
         self.user_service = user_service
+        self.business_calendar_service = business_calendar_service
+        self.time_entry_service = time_entry_service
 
     def get_project_by_id(self, project_id: int):
         project = self.project_service.get_project_by_id(project_id)
@@ -69,66 +78,66 @@ class ProjectApiService(object):
         if project is None:
             _raise_project_not_exist()
 
-        user_project = project.project_users.filter(
-            user_id == UserProject.user_id).first()
+        user = self.user_service.get_user_by_id(user_id)
 
-        if user_project is None:
-            user_project = UserProject(project_id=project.project_id, user_id=user_id)
+        if user is None:
+            _raise_user_not_exist()
 
         report_date = date.date()
-        user = user_project.user
         duration_timedelta = timedelta(seconds=duration)
 
-        _validate_reported_amount_of_time(
-            user, duration_timedelta, report_date)
-        _validate_report_date(report_date)
+        _validate_report_date(report_date, self.business_calendar_service)
+
+        if not self.project_service.is_user_assigned(user.user_id, project.project_id):
+            self.project_service.assign_user_to_project(project, user)
 
-        time_entry = self.project_service.report_user_time(
-            project, user, duration, comment)
+        # time entries keep duration in hours
+        time_entry = self.time_entry_service.add_time_entry(
+            user.user_id, project.project_id, duration / 3600, comment, report_date,
+            MAX_HOURS_TO_REPORT.total_seconds() / 3600)
+
+        if time_entry is None:
+            _raise_reported_amount_of_time_exceeded(
+                duration_timedelta, self.time_entry_service.sum_duration(user.user_id, report_date))
 
         return _create_time_entry_json(time_entry)
 
 
-def _validate_report_date(report_date: datetime):
+def _validate_report_date(report_date: datetime, business_calendar: BusinessCalendarService = None):
     # Maximum days behind which could be reported or modified.
     MAX_DAYS_IN_PAST = 2
 
     past_work_day_day = _get_workday_date_n_days_ago(
         MAX_DAYS_IN_PAST,
-        datetime.now().date())
+        datetime.now(),
+        business_calendar)
 
     if (report_date < past_work_day_day):
         raise BadRequest('The time can be reported only 2 days back.')
 
 
-def _validate_reported_amount_of_time(user: User, duration: timedelta, report_date: datetime):
-    # Get total time amount reported by user for date
-    user_reported_time = user.user_time_entries \
-        .filter(report_date == TimeEntry.report_date) \
-        .sum(TimeEntry.duration)
-
-    total_user_time = timedelta(minutes=user_reported_time)
+def _raise_reported_amount_of_time_exceeded(duration: timedelta, user_reported_hours: Decimal):
+    total_user_time = timedelta(hours=float(user_reported_hours))
 
     total_user_time_including_duration = total_user_time + duration
 
-    # Maximum hours which could be reported per user per day
-    MAX_HOURS_TO_REPORT = timedelta(hours=8)
-
     exceeded_by = total_user_time_including_duration - MAX_HOURS_TO_REPORT
 
-    if (total_user_time_including_duration > MAX_HOURS_TO_REPORT):
-        msg = 'Could not perfom time report due to exceeded maximum limit of reported time. Reported time: ' + str(
-            duration) + '. ' + \
-              'Currently reported total time: ' + str(total_user_time) + '. ' + \
-              'Maximum time amount to report: ' + str(MAX_HOURS_TO_REPORT) + ', limit exceeded by: ' + str(
-            exceeded_by) + '.'
-        raise BadRequest(msg)
+    msg = 'Could not perfom time report due to exceeded maximum limit of reported time. Reported time: ' + str(
+        duration) + '. ' + \
+          'Currently reported total time: ' + str(total_user_time) + '. ' + \
+          'Maximum time amount to report: ' + str(MAX_HOURS_TO_REPORT) + ', limit exceeded by: ' + str(
+        exceeded_by) + '.'
+    raise BadRequest(msg)
 
 
-def _get_workday_date_n_days_ago(days_ago: int, date: datetime):
+def _get_workday_date_n_days_ago(days_ago: int, date: datetime, business_calendar: BusinessCalendarService = None):
     if (days_ago <= 0 or days_ago > 100):
         raise Exception('days_ago must be between 1 and 100')
 
+    if business_calendar is not None:
+        return business_calendar.get_workday_n_days_ago(days_ago, date.date())
+
     days_subtracted = 0
     new_date = date
     while days_subtracted < days_ago:
@@ -164,7 +173,8 @@ def _create_time_entry_json(time_entry: TimeEntry):
     return {
         'project_id': time_entry.project.project_id,
         'project_name': time_entry.project.name,
-        'user_name': time_entry.user.name,
+        'time_entry_id': time_entry.time_entry_id,
+        'user_name': time_entry.user.username,
         'user_id': time_entry.user.user_id,
         'duration': time_entry.duration,
         'comment': time_entry.comment
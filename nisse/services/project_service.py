@@ -1,9 +1,32 @@
-import datetime
+import time
+from typing import Dict, List, NamedTuple
 
 from flask_injector import inject
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
 
-from nisse.models.database import Project, User, UserProject, TimeEntry
+from nisse.models.database import Project, User, UserProject
+from nisse.utils.cache import LruCache
+
+# projects changed by other processes are picked up after this time
+PROJECT_CATALOGUE_TTL_SECONDS = 5 * 60
+
+PROJECT_CATALOGUE_KEY = 'projects'
+
+# the only entry is ProjectCatalogue of all projects, shared by all requests of the process
+project_catalogue_cache = LruCache(maxsize=1)
+
+
+class ProjectEntry(NamedTuple):
+    project_id: int
+    name: str
+
+
+class ProjectCatalogue(NamedTuple):
+    projects: Dict[int, ProjectEntry]
+    # user_id -> projects assigned to the user
+    user_projects: Dict[int, List[ProjectEntry]]
+    loaded_at: float
 
 
 class ProjectService(object):
@@ -12,6 +35,7 @@ class ProjectService(object):
     @inject
     def __init__(self, db: SQLAlchemy):
         self.db = db
+        self.clock = time.monotonic
 
     def get_projects(self):
         return self.db.session.query(Project) \
@@ -23,10 +47,63 @@ class ProjectService(object):
             .filter(UserProject.user_id == user_id) \
             .all()
 
+    def get_catalogue(self) -> ProjectCatalogue:
+        """ Returns all projects with their assignments, loaded once and kept by the process
+        """
+        catalogue = project_catalogue_cache.get(PROJECT_CATALOGUE_KEY)
+        if catalogue is None or self.clock() - catalogue.loaded_at > PROJECT_CATALOGUE_TTL_SECONDS:
+            catalogue = self.load_catalogue()
+            project_catalogue_cache.put(PROJECT_CATALOGUE_KEY, catalogue)
+        return catalogue
+
+    def load_catalogue(self) -> ProjectCatalogue:
+        projects = {project_id: ProjectEntry(project_id, name) for project_id, name in
+                    self.db.session.query(Project.project_id, Project.name).order_by(Project.project_id)}
+
+        user_projects = {}
+        for user_id, project_id in self.db.session.query(UserProject.user_id, UserProject.project_id) \
+                .order_by(UserProject.project_id):
+            if project_id in projects:
+                user_projects.setdefault(user_id, []).append(projects[project_id])
+
+        return ProjectCatalogue(projects, user_projects, self.clock())
+
+    def get_cached_projects(self) -> List[ProjectEntry]:
+        return list(self.get_catalogue().projects.values())
+
+    def get_cached_projects_by_user(self, user_id: int) -> List[ProjectEntry]:
+        """ Users missing in the catalogue may have been assigned by other process, their projects are read from db
+        """
+        catalogue = self.get_catalogue()
+        user_projects = catalogue.user_projects.get(user_id)
+        if user_projects is None:
+            user_projects = [ProjectEntry(project_id, name) for project_id, name in
+                             self.db.session.query(Project.project_id, Project.name)
+                                 .join(UserProject.project)
+                                 .filter(UserProject.user_id == user_id)
+                                 .order_by(Project.project_id)]
+            # users without projects are kept as well, so they don't query on every dialog
+            catalogue.user_projects[user_id] = user_projects
+        return list(user_projects)
+
+    def get_cached_project(self, project_id) -> ProjectEntry:
+        """ Accepts project id as sent in Slack payloads, returns None for unknown project
+        """
+        try:
+            return self.get_catalogue().projects.get(int(project_id))
+        except (TypeError, ValueError):
+            return None
+
+    def is_user_assigned(self, user_id: int, project_id: int) -> bool:
+        """ Answered from catalogue, assignment missed because of stale catalogue is a no-op
+        """
+        return any(p.project_id == project_id for p in self.get_cached_projects_by_user(user_id))
+
     def create_project(self, project_name):
         new_project = Project(name=project_name)
         self.db.session.add(new_project)
         self.db.session.commit()
+        project_catalogue_cache.clear()
         return new_project
 
     def get_project_by_id(self, project_id: int):
@@ -36,16 +113,23 @@ class ProjectService(object):
 
     def update_project(self, project: Project):
         self.db.session.commit()
+        project_catalogue_cache.clear()
 
     def delete_project(self, project: Project):
         self.db.session.delete(project)
         self.db.session.commit()
+        project_catalogue_cache.clear()
 
     def assign_user_to_project(self, project: Project, user: User):
         user_project = UserProject(
             project_id=project.project_id, user_id=user.user_id)
-        self.db.session.add(user_project)
-        self.db.session.commit()
+        try:
+            self.db.session.add(user_project)
+            self.db.session.commit()
+        except IntegrityError:
+            # user was assigned concurrently
+            self.db.session.rollback()
+        project_catalogue_cache.clear()
 
     def unassign_user_from_project(self, project: Project, user: User):
         user_project: UserProject = self.db.session.query(UserProject)\
@@ -54,14 +138,4 @@ class ProjectService(object):
             .first()
         self.db.session.delete(user_project)
         self.db.session.commit()
-
-    def report_user_time(self, project: Project, user: User, duration: float, comment: str, report_date: datetime):
-        time_entry = TimeEntry(user_id=user.user_id,
-                               project_id=project.project_id,
-                               duration=duration,
-                               comment=comment,
-                               report_date=report_date
-                               )
-        self.db.session.add(time_entry)
-        self.db.session.commit()
-        return time_entry
+        project_catalogue_cache.clear()
@@ -0,0 +1,94 @@
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Set
+
+from flask_injector import inject
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.orm import Session
+
+from nisse.models.database import ReminderDelivery
+
+# delivery claimed but not marked as sent within this time is left by crashed run, so it is claimed again
+DELIVERY_CLAIM_EXPIRY = timedelta(minutes=10)
+
+
+def is_delivered_or_claimed(now: datetime = None):
+    """ Criterion matching deliveries which are sent or still being sent
+    """
+    now = now or datetime.utcnow()
+    return or_(ReminderDelivery.sent_at.isnot(None), ReminderDelivery.created_at >= now - DELIVERY_CLAIM_EXPIRY)
+
+
+class ReminderDeliveryService(object):
+    """
+    Log of reminders sent to users, every user gets at most one reminder a day
+    even when reminder runs overlap. Claims of runs which crashed before sending expire
+    """
+    @inject
+    def __init__(self, session: Session):
+        self.db = session
+
+    def claim(self, user_ids: List[int], remind_date: date) -> Set[int]:
+        """
+        Writes deliveries of the day in single batch, rows already written by other runs are left untouched
+        unless their claim expired
+        :return: ids of users this run should remind
+        """
+        if not user_ids:
+            return set()
+
+        run_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        self.db.query(ReminderDelivery) \
+            .filter(ReminderDelivery.remind_date == remind_date, ReminderDelivery.user_id.in_(user_ids),
+                    ~is_delivered_or_claimed(now)) \
+            .delete(synchronize_session=False)
+        rows = [dict(user_id=user_id, remind_date=remind_date, run_id=run_id, created_at=now) for user_id in user_ids]
+
+        dialect_name = self.db.get_bind().dialect.name
+        if dialect_name not in ('postgresql', 'mysql', 'sqlite'):
+            # other databases have no insert skipping duplicates, rows claimed before are left out
+            claimed = {user_id for (user_id,) in self.db.query(ReminderDelivery.user_id)
+                       .filter(ReminderDelivery.remind_date == remind_date, ReminderDelivery.user_id.in_(user_ids))}
+            rows = [row for row in rows if row['user_id'] not in claimed]
+        if rows:
+            self.db.execute(self.create_insert(dialect_name), rows)
+        self.db.commit()
+
+        return {user_id for (user_id,) in self.db.query(ReminderDelivery.user_id)
+                .filter(ReminderDelivery.remind_date == remind_date, ReminderDelivery.run_id == run_id)}
+
+    @staticmethod
+    def create_insert(dialect_name: str):
+        """ Insert of deliveries which skips rows already written by other runs
+        """
+        if dialect_name == 'postgresql':
+            return postgresql.insert(ReminderDelivery.__table__).on_conflict_do_nothing()
+        if dialect_name == 'mysql':
+            return mysql.insert(ReminderDelivery.__table__).prefix_with('IGNORE')
+        if dialect_name == 'sqlite':
+            return ReminderDelivery.__table__.insert().prefix_with('OR IGNORE')
+        return ReminderDelivery.__table__.insert()
+
+    def mark_sent(self, user_ids: List[int], remind_date: date):
+        """ Confirms deliveries, so their claims don't expire
+        """
+        if not user_ids:
+            return
+
+        self.db.query(ReminderDelivery) \
+            .filter(ReminderDelivery.remind_date == remind_date, ReminderDelivery.user_id.in_(user_ids)) \
+            .update({ReminderDelivery.sent_at: datetime.utcnow()}, synchronize_session=False)
+        self.db.commit()
+
+    def release(self, user_ids: List[int], remind_date: date):
+        """ Removes deliveries which failed so the users are reminded again by next run
+        """
+        if not user_ids:
+            return
+
+        self.db.query(ReminderDelivery) \
+            .filter(ReminderDelivery.remind_date == remind_date, ReminderDelivery.user_id.in_(user_ids)) \
+            .delete(synchronize_session=False)
+        self.db.commit()
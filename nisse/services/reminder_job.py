@@ -1,52 +1,142 @@
+from collections import defaultdict
+
 from flask_bcrypt import Bcrypt
-from slackclient import SlackClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from nisse.models.slack.payload import RemindTimeReportBtnPayload
 from nisse.services import UserService
 from nisse.services import VacationService
+from nisse.services.business_calendar_service import BusinessCalendarService
+from nisse.services.reminder_delivery_service import ReminderDeliveryService
+from nisse.services.slack_delivery_service import SlackDeliveryService, DirectMessage, DeliveryReport
+from nisse.services.slack_gateway import SlackGateway
 from nisse.utils.date_helper import *
 from nisse.utils.string_helper import get_full_class_name
 
 
-def get_users_to_notify(logger, config, date_from: date, date_to: date):
-    engine = create_engine(config['SQLALCHEMY_DATABASE_URI'])
-    session_maker = sessionmaker(bind=engine)
+def create_session_maker(config):
+    return sessionmaker(bind=create_engine(config['SQLALCHEMY_DATABASE_URI'],
+                                           pool_recycle=config['SQLALCHEMY_POOL_RECYCLE'],
+                                           pool_pre_ping=True))
+
+
+def get_users_to_notify(logger, session_maker, date_from: date, date_to: date, find_users):
+    """
+    Users are returned only once a day, the ones returned are claimed in reminder delivery log
+    :param find_users: function returning users to check, called with UserService
+    """
     session = None
     try:
         session = session_maker()
         user_service = UserService(session, Bcrypt())
         vacation_service = VacationService(session)
+        business_calendar = BusinessCalendarService(session)
 
-        result = []
-        users = user_service.get_users_to_notify_last_period(minutes=5)
-        for user in users:
-            time_entries = user_service.get_time_entry_date_range(user.user_id, date_from, date_to)
-            reported_days = set(map(lambda te: te.report_date, time_entries))
-            vacations = vacation_service.get_vacations_by_dates(user.user_id, date_from, date_to)
+        users = find_users(user_service)
+        users = get_dates_to_remind(user_service, vacation_service, users, date_from, date_to, business_calendar)
 
-            all_days = set(filter(lambda day: not is_holiday_poland(day) and not is_weekend(day),
-                                  date_range(date_from, date_to + timedelta(days=1))))
+        # overlapping runs could find the same users, only the run which logged the delivery first sends it
+        claimed = ReminderDeliveryService(session).claim([user.user_id for (user, dates) in users], date_to)
+        return [[user, dates] for (user, dates) in users if user.user_id in claimed]
 
-            for vac in vacations:
-                all_days -= set(date_range(vac.start_date, vac.end_date + timedelta(days=1)))
+    except Exception as e:
+        logger.error(e)
+        raise
+    finally:
+        if session:
+            session.close()
 
-            dates_to_remind = sorted(all_days - reported_days)
 
-            if len(dates_to_remind) > 0:
-                result.append([user, dates_to_remind])
+def save_im_channel_ids(logger, session_maker, im_channel_id_by_user_id: dict):
+    if not im_channel_id_by_user_id:
+        return
 
-        return result
+    session = None
+    try:
+        session = session_maker()
+        UserService(session, Bcrypt()).set_im_channel_ids(im_channel_id_by_user_id)
+    except Exception as e:
+        logger.error(e)
+    finally:
+        if session:
+            session.close()
+
+
+def mark_deliveries_sent(logger, session_maker, user_ids, remind_date: date):
+    """ Confirms sent reminders in the log, claims of the others expire so the users are reminded by next run
+    """
+    if not user_ids:
+        return
 
+    session = None
+    try:
+        session = session_maker()
+        ReminderDeliveryService(session).mark_sent(user_ids, remind_date)
+    except Exception as e:
+        logger.error(e)
+    finally:
+        if session:
+            session.close()
+
+
+def release_deliveries(logger, session_maker, user_ids, remind_date: date):
+    """ Removes failed deliveries from the log so the users are reminded by next run
+    """
+    if not user_ids:
+        return
+
+    session = None
+    try:
+        session = session_maker()
+        ReminderDeliveryService(session).release(user_ids, remind_date)
     except Exception as e:
         logger.error(e)
-        raise
     finally:
         if session:
             session.close()
 
 
+def get_dates_to_remind(user_service: UserService, vacation_service: VacationService, users,
+                        date_from: date, date_to: date, business_calendar: BusinessCalendarService = None):
+    """
+    Computes not reported working days for all given users at once
+    :param user_service: user service
+    :param vacation_service: vacation service
+    :param users: users to check
+    :param date_from: start date of checked period
+    :param date_to: end date of checked period
+    :param business_calendar: calendar with company days off, only public holidays are skipped without it
+    :return: list of [user, dates_to_remind] for users having at least one day to remind
+    """
+    if not users:
+        return []
+
+    user_ids = [user.user_id for user in users]
+
+    # calendar is the same for everybody so it is computed only once
+    if business_calendar:
+        working_days = set(business_calendar.working_days_between(date_from, date_to))
+    else:
+        working_days = set(working_days_between(date_from, date_to))
+
+    days_excluded = defaultdict(set)
+    for user_id, report_date in user_service.get_reported_days(user_ids, date_from, date_to):
+        days_excluded[user_id].add(report_date)
+
+    for user_id, start_date, end_date in vacation_service.get_vacations_overlapping_dates(user_ids, date_from,
+                                                                                         date_to):
+        days_excluded[user_id].update(date_range(start_date, end_date + timedelta(days=1)))
+
+    result = []
+    for user in users:
+        dates_to_remind = sorted(working_days - days_excluded[user.user_id])
+        if len(dates_to_remind) > 0:
+            result.append([user, dates_to_remind])
+
+    return result
+
+
 def get_everyday_slack_message(config, remind_date):
 
     return "It looks like you didn't report work time for `{0}`".format(remind_date.strftime("%A, %d %B")), [
@@ -106,45 +196,45 @@ def get_friday_slack_message(config, remind_dates):
 
 def remind(logger, config):
     logger.info('Reminder job started: ' + str(datetime.utcnow().time()))
+    today = datetime.utcnow().date()
+
+    report = send_reminders(logger, config, SlackGateway.from_config(config, logger),
+                            create_session_maker(config), today,
+                            lambda user_service: user_service.get_users_to_notify_last_period(
+                                minutes=config['REMINDER_JOB_WINDOW_MINUTES'], not_reminded_on=today))
+
+    logger.info('Reminder job finished: ' + str(datetime.utcnow().time()) + '. ' + str(report))
 
-    remind_date = datetime.utcnow().date()
-    if is_holiday_poland(remind_date):
-        return
 
-    slack_client = SlackClient(config['SLACK_BOT_ACCESS_TOKEN'])
-    is_friday = date.today().weekday() == 4
+def send_reminders(logger, config, slack_gateway: SlackGateway, session_maker, remind_date: date, find_users) -> DeliveryReport:
+    """
+    Sends reminders about not reported days to users returned by find_users
+    :param find_users: function returning users to remind, called with UserService
+    """
+    is_friday = remind_date.weekday() == 4
 
     remind_from = remind_date - timedelta(days=6) if is_friday else remind_date
 
-    users = get_users_to_notify(logger, config, remind_from, remind_date)
+    users = get_users_to_notify(logger, session_maker, remind_from, remind_date, find_users)
 
+    messages = []
     for (user, dates) in users:
         logger.info('Sending notification for user: ' + user.username)
 
-        im_channel = slack_client.api_call(
-            "im.open",
-            user=user.slack_user_id)
-
-        if not im_channel["ok"]:
-            logger.error("Can't open im channel for: " +
-                         str(user.user_id) + '. ' + im_channel["error"])
-
         if is_friday and len(dates) > 1:
             message = get_friday_slack_message(config, dates)
         else:
-            message = get_everyday_slack_message(config, remind_date)
-
-        resp = slack_client.api_call(
-            "chat.postMessage",
-            channel=im_channel['channel']['id'],
-            text=message[0],
-            attachments=message[1],
-            mrkdwn=True,
-            as_user=True
-        )
-
-        if not resp["ok"]:
-            logger.error("Can't send reminder message to user id: " +
-                         str(user.user_id) + '. ' + resp["error"])
-
-    logger.info('Reminder job finished: ' + str(datetime.utcnow().time()))
+            message = get_everyday_slack_message(config, dates[0])
+
+        messages.append(DirectMessage(user.user_id, user.slack_user_id, message[0], message[1], user.im_channel_id))
+
+    report = SlackDeliveryService.from_config(slack_gateway, logger, config).deliver(messages)
+    mark_deliveries_sent(logger, session_maker, [r.user_id for r in report.succeeded], remind_date)
+    save_im_channel_ids(logger, session_maker, SlackDeliveryService.get_opened_im_channels(messages, report))
+
+    if report.failed:
+        release_deliveries(logger, session_maker, [r.user_id for r in report.failed], remind_date)
+        logger.error('Reminder not delivered to user ids: ' +
+                     ', '.join('{0} ({1})'.format(r.user_id, r.error) for r in report.failed))
+
+    return report
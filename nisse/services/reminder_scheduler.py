@@ -0,0 +1,112 @@
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, time
+from typing import List, Tuple
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from pytz import utc
+
+from nisse.models.database import ReminderSchedule
+from nisse.services.reminder_job import send_reminders
+from nisse.services.slack_gateway import SlackGateway
+
+
+def get_next_due(after: datetime, weekday: int, utc_minute: int) -> datetime:
+    """ Returns first time after given one matching weekday and minute of day
+    """
+    due = datetime.combine(after.date(), time()) + timedelta(days=(weekday - after.weekday()) % 7,
+                                                             minutes=utc_minute)
+    return due if due > after else due + timedelta(days=7)
+
+
+class ReminderScheduler(object):
+    """
+    Resident reminder process, keeps next due time of every reminder schedule in a heap and
+    sends reminders in the minute they are due. Reminders missed within catch up period,
+    e.g. during restart, are sent late, every reminder is sent at most once by the process
+    """
+    def __init__(self, config, logger: logging.Logger, session_maker, slack_gateway: SlackGateway,
+                 clock=datetime.utcnow):
+        self.config = config
+        self.logger = logger
+        self.session_maker = session_maker
+        self.slack_gateway = slack_gateway
+        self.clock = clock
+        self.catch_up = timedelta(minutes=config['REMINDER_CATCH_UP_MINUTES'])
+        self.heap: List[Tuple[datetime, int]] = []
+        self.loaded_at = None
+        # (user_id, due) of reminders already sent
+        self.sent = set()
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.load_schedules(self.clock().replace(second=0, microsecond=0) - self.catch_up)
+
+        scheduler = BlockingScheduler(timezone=utc)
+        scheduler.add_job(self.tick, 'cron', second=0, coalesce=True, max_instances=1, misfire_grace_time=60)
+        scheduler.add_job(self.reload, 'interval', minutes=self.config['REMINDER_SCHEDULE_RELOAD_MINUTES'],
+                          coalesce=True, max_instances=1)
+        self.logger.info('Reminder scheduler started with {0} schedules'.format(len(self.heap)))
+        scheduler.start()
+
+    def load_schedules(self, since: datetime):
+        """ Builds the heap of reminders due after given time
+        """
+        session = self.session_maker()
+        try:
+            schedules = session.query(ReminderSchedule.weekday, ReminderSchedule.utc_minute,
+                                      ReminderSchedule.user_id).all()
+        finally:
+            session.close()
+
+        heap = [(get_next_due(since, weekday, utc_minute), user_id) for weekday, utc_minute, user_id in schedules]
+        heapq.heapify(heap)
+        with self.lock:
+            self.heap = heap
+            self.loaded_at = since
+
+    def reload(self):
+        """ Picks up changed schedules, reminders due since previous load which were
+        not sent yet are sent with the next tick
+        """
+        with self.lock:
+            since = self.loaded_at
+        loaded_at = self.clock().replace(second=0, microsecond=0)
+        self.load_schedules(max(since, loaded_at - self.catch_up))
+        with self.lock:
+            self.loaded_at = loaded_at
+
+    def tick(self, now: datetime = None) -> List[int]:
+        """ Sends all reminders due until now
+        :return: ids of users the reminders were sent to
+        """
+        now = (now or self.clock()).replace(second=0, microsecond=0)
+        due_by_date = defaultdict(set)
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                due, user_id = heapq.heappop(self.heap)
+                heapq.heappush(self.heap, (due + timedelta(days=7), user_id))
+                if now - due > self.catch_up:
+                    self.logger.warning('Reminder of user {0} due at {1} skipped'.format(user_id, due))
+                    continue
+                if (user_id, due) in self.sent:
+                    continue
+                self.sent.add((user_id, due))
+                due_by_date[due.date()].add(user_id)
+
+            # reminders which may still be loaded again by reload are remembered
+            oldest = min(self.loaded_at, now - self.catch_up)
+            self.sent = {(user_id, due) for user_id, due in self.sent if due >= oldest}
+
+        reminded = []
+        for remind_date, user_ids in sorted(due_by_date.items()):
+            try:
+                send_reminders(self.logger, self.config, self.slack_gateway, self.session_maker, remind_date,
+                               lambda user_service: user_service.get_users_by_ids(list(user_ids),
+                                                                                    not_reminded_on=remind_date))
+                reminded.extend(sorted(user_ids))
+            except Exception:
+                self.logger.exception('Sending reminders for {0} failed'.format(remind_date))
+        return reminded
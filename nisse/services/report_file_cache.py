@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import BinaryIO
+
+from nisse.models.DTO import PrintParametersDto
+
+REPORT_CACHE_DIRECTORY = 'cache'
+REPORT_CACHE_EXTENSION = '.report'
+
+
+class ReportFileCache(object):
+    """
+    Keeps generated report files under content addressed names, least recently used files
+    are removed when cache grows over max_bytes or when they were not used for max_age_seconds
+    """
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: int, clock=time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def from_config(instance_path: str, config):
+        return ReportFileCache(os.path.join(instance_path, config['REPORT_PATH'], REPORT_CACHE_DIRECTORY),
+                               config['REPORT_CACHE_MAX_BYTES'],
+                               config['REPORT_CACHE_MAX_AGE_SECONDS'])
+
+    @staticmethod
+    def key(print_parameters: PrintParametersDto, data_version, report_format: str = 'xlsx') -> str:
+        content = json.dumps([print_parameters.user_id, print_parameters.project_id, print_parameters.date_from,
+                              print_parameters.date_to, data_version, report_format], default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def open(self, key: str) -> BinaryIO:
+        """ Opens cached report file for reading, returns None when the report is not cached.
+        File opened before eviction stays readable until it is closed
+        """
+        path = self.path(key)
+        try:
+            with self.lock:
+                if self.clock() - os.path.getmtime(path) > self.max_age_seconds:
+                    os.remove(path)
+                    return None
+                # modification time is used as last access time by eviction
+                os.utime(path)
+                return open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, file_path: str):
+        """ Moves generated report file into the cache
+        """
+        with self.lock:
+            os.replace(file_path, self.path(key))
+            self.evict()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + REPORT_CACHE_EXTENSION)
+
+    def evict(self):
+        now = self.clock()
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(REPORT_CACHE_EXTENSION):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(entry.path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for (_, size, _) in files)
+        for (_, size, path) in sorted(files):
+            if total_size <= self.max_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,168 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO
+
+from flask import Flask
+from flask_bcrypt import Bcrypt
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.utils import secure_filename
+
+from nisse.models.database import ReportJob
+from nisse.services.im_channel_service import ImChannelService
+from nisse.services.project_service import ProjectService
+from nisse.services.report_file_cache import ReportFileCache
+from nisse.services.report_job_service import ReportJobService
+from nisse.services.report_renderer import create_report_renderers, ReportRenderer
+from nisse.services.report_service import ReportService
+from nisse.services.slack_gateway import SlackGateway
+from nisse.services.user_service import UserService
+from nisse.utils import string_helper
+
+
+class ReportJobQueue(object):
+    """
+    Generates reports on bounded pool of worker threads, jobs are kept in database
+    so the ones interrupted by process restart are picked up again. Running jobs are leased by the queue
+    and the lease is renewed by heartbeat, jobs with expired lease and jobs left queued are taken over
+    by any live queue. Nothing runs until the queue is started
+    """
+    def __init__(self, app: Flask, db: SQLAlchemy, slack_gateway: SlackGateway, logger: logging.Logger,
+                 workers: int, max_attempts: int, report_cache: ReportFileCache, lease_seconds: int = 5 * 60):
+        self.app = app
+        self.db = db
+        self.report_cache = report_cache
+        self.renderers = create_report_renderers(app.config)
+        self.slack_gateway = slack_gateway
+        self.logger = logger
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = '{0}:{1}:{2}'.format(socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])[-64:]
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # ids of jobs waiting in the executor, so polling doesn't submit them again
+        self.submitted = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.heartbeat = threading.Thread(target=self.keep_leases, name='report-job-heartbeat', daemon=True)
+
+    def start(self):
+        """ Resumes jobs left by stopped processes and starts renewing leases of own jobs and polling
+        for jobs left queued
+        """
+        self.executor.submit(self.run, self.recover)
+        self.heartbeat.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.executor.shutdown()
+
+    def submit(self, report_job_id: int):
+        with self.lock:
+            self.submitted.add(report_job_id)
+        return self.executor.submit(self.run, self.process, report_job_id)
+
+    def recover(self):
+        job_service = ReportJobService(self.db)
+        job_service.requeue_interrupted_jobs(self.max_attempts, self.lease_seconds)
+        for report_job_id in job_service.get_queued_job_ids():
+            with self.lock:
+                if report_job_id in self.submitted:
+                    continue
+            self.logger.info('Resuming report job {0}'.format(report_job_id))
+            self.submit(report_job_id)
+
+    def keep_leases(self):
+        while not self.stopped.wait(self.lease_seconds / 3):
+            self.run(self.renew_leases)
+
+    def renew_leases(self):
+        ReportJobService(self.db).renew_leases(self.owner)
+        self.recover()
+
+    def run(self, func, *args):
+        with self.app.app_context():
+            try:
+                func(*args)
+            except Exception:
+                self.logger.exception('Report worker failed')
+            finally:
+                self.db.session.remove()
+
+    def process(self, report_job_id: int):
+        with self.lock:
+            self.submitted.discard(report_job_id)
+        job_service = ReportJobService(self.db)
+        job = job_service.start_job(report_job_id, self.owner)
+        if job is None:
+            return
+
+        im_channel_service = ImChannelService(UserService(self.db.session, Bcrypt()), self.slack_gateway, self.logger)
+        try:
+            self.generate_report(job, im_channel_service)
+            job_service.finish_job(job)
+        except Exception as e:
+            self.logger.exception('Report job {0} failed'.format(report_job_id))
+            job_service.fail_job(job, str(e))
+            im_channel_service.api_call("chat.postMessage", job.slack_user_id, as_user=True,
+                                        text="Sorry, I couldn't generate report from `{0}` to `{1}` :disappointed:"
+                                        .format(job.date_from, job.date_to))
+
+    def generate_report(self, job: ReportJob, im_channel_service: ImChannelService):
+        print_param = ReportJobService.get_print_parameters(job)
+
+        selected_project_name = "all projects"
+        if job.project_id is not None:
+            selected_project_name = ProjectService(self.db).get_project_by_id(job.project_id).name
+
+        selected_user = None
+        if job.user_id is not None:
+            selected_user = UserService(self.db.session, Bcrypt()).get_user_by_id(job.user_id)
+
+        renderer = self.renderers[job.report_format]
+        report_service = ReportService(self.db)
+        cache_key = ReportFileCache.key(print_param, report_service.get_data_version(print_param), job.report_format)
+        report_file = self.report_cache.open(cache_key)
+        if report_file is None:
+            report_file = self.save_report(renderer, report_service, print_param, cache_key)
+
+        # file is passed to the upload as it is, so the report is not copied into memory
+        with report_file:
+            resp = im_channel_service.api_call(
+                "files.upload",
+                job.slack_user_id,
+                channel_arg="channels",
+                file=report_file,
+                title=string_helper.generate_report_title(selected_user, selected_project_name, print_param.date_from,
+                                                          print_param.date_to),
+                filetype=renderer.filetype,
+                filename=string_helper.generate_report_file_name(selected_user, selected_project_name,
+                                                                 print_param.date_from,
+                                                                 print_param.date_to,
+                                                                 renderer.extension)
+            )
+
+        if not resp["ok"]:
+            raise RuntimeError("Can't send report: " + str(resp.get("error")))
+
+    def save_report(self, renderer: ReportRenderer, report_service: ReportService, print_param,
+                    cache_key: str) -> BinaryIO:
+        """ Renders report into the cache, returns the rendered file opened for reading
+        """
+        path_for_report = os.path.join(self.app.instance_path, self.app.config["REPORT_PATH"],
+                                       secure_filename(str(uuid.uuid4())) + "." + renderer.extension)
+        renderer.render(report_service, print_param, path_for_report)
+
+        try:
+            # opened before it is moved into the cache, so it can be read even if the cache evicts it
+            report_file = open(path_for_report, 'rb')
+            self.report_cache.put(cache_key, path_for_report)
+        finally:
+            try:
+                if os.path.exists(path_for_report):
+                    os.remove(path_for_report)
+            except OSError as err:
+                self.logger.error("Cannot delete report file {0}".format(err))
+        return report_file
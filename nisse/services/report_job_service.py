@@ -0,0 +1,122 @@
+from datetime import datetime, date, timedelta
+from typing import List
+
+from flask_injector import inject
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func
+
+from nisse.models.DTO import PrintParametersDto
+from nisse.models.database import ReportJob
+
+REPORT_JOB_QUEUED = 'queued'
+REPORT_JOB_RUNNING = 'running'
+REPORT_JOB_DONE = 'done'
+REPORT_JOB_FAILED = 'failed'
+
+
+class ReportJobService(object):
+    """
+    Persists report requests processed in background
+    """
+    @inject
+    def __init__(self, db: SQLAlchemy):
+        self.db = db
+
+    def create_job(self, slack_user_id: str, user_id, project_id, date_from: date, date_to: date,
+                   report_format: str = 'xlsx') -> ReportJob:
+        job = ReportJob(slack_user_id=slack_user_id,
+                        user_id=user_id,
+                        project_id=project_id,
+                        date_from=date_from,
+                        date_to=date_to,
+                        report_format=report_format,
+                        status=REPORT_JOB_QUEUED,
+                        attempts=0,
+                        created_at=datetime.utcnow())
+        self.db.session.add(job)
+        self.db.session.commit()
+        return job
+
+    def get_job(self, report_job_id: int) -> ReportJob:
+        return self.db.session.query(ReportJob) \
+            .filter(ReportJob.report_job_id == report_job_id) \
+            .first()
+
+    def get_user_jobs(self, slack_user_id: str, limit: int = 5) -> List[ReportJob]:
+        return self.db.session.query(ReportJob) \
+            .filter(ReportJob.slack_user_id == slack_user_id) \
+            .order_by(ReportJob.report_job_id.desc()) \
+            .limit(limit) \
+            .all()
+
+    def start_job(self, report_job_id: int, owner: str = None) -> ReportJob:
+        """ Marks queued job as running by owner, returns None when the job was already taken by other worker
+        """
+        now = datetime.utcnow()
+        claimed = self.db.session.query(ReportJob) \
+            .filter(ReportJob.report_job_id == report_job_id, ReportJob.status == REPORT_JOB_QUEUED) \
+            .update({ReportJob.status: REPORT_JOB_RUNNING,
+                     ReportJob.started_at: now,
+                     ReportJob.owner: owner,
+                     ReportJob.heartbeat_at: now,
+                     ReportJob.attempts: ReportJob.attempts + 1}, synchronize_session=False)
+        self.db.session.commit()
+        return self.get_job(report_job_id) if claimed else None
+
+    def renew_leases(self, owner: str):
+        """ Confirms jobs run by owner are still alive
+        """
+        self.db.session.query(ReportJob) \
+            .filter(ReportJob.status == REPORT_JOB_RUNNING, ReportJob.owner == owner) \
+            .update({ReportJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        self.db.session.commit()
+
+    def finish_job(self, job: ReportJob):
+        job.status = REPORT_JOB_DONE
+        job.finished_at = datetime.utcnow()
+        self.db.session.commit()
+
+    def fail_job(self, job: ReportJob, error: str):
+        job.status = REPORT_JOB_FAILED
+        job.error = error[:255] if error else None
+        job.finished_at = datetime.utcnow()
+        self.db.session.commit()
+
+    def requeue_interrupted_jobs(self, max_attempts: int, lease_seconds: int) -> List[int]:
+        """
+        Puts back to queue running jobs whose owner did not renew the lease for lease_seconds, as its process
+        is gone. Jobs which already crashed the process max_attempts times are failed
+        :return: ids of requeued jobs
+        """
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=lease_seconds)
+        requeued = []
+        for job in self.db.session.query(ReportJob) \
+                .filter(ReportJob.status == REPORT_JOB_RUNNING,
+                        func.coalesce(ReportJob.heartbeat_at, ReportJob.started_at) < expired) \
+                .all():
+            job.owner = None
+            if job.attempts >= max_attempts:
+                job.status = REPORT_JOB_FAILED
+                job.error = 'Interrupted {0} times'.format(job.attempts)
+                job.finished_at = now
+            else:
+                job.status = REPORT_JOB_QUEUED
+                requeued.append(job.report_job_id)
+        self.db.session.commit()
+        return requeued
+
+    def get_queued_job_ids(self) -> List[int]:
+        return [job_id for (job_id,) in self.db.session.query(ReportJob.report_job_id)
+                .filter(ReportJob.status == REPORT_JOB_QUEUED)
+                .order_by(ReportJob.report_job_id)
+                .all()]
+
+    @staticmethod
+    def get_print_parameters(job: ReportJob) -> PrintParametersDto:
+        print_param = PrintParametersDto()
+        print_param.user_id = job.user_id
+        print_param.project_id = job.project_id
+        print_param.date_from = job.date_from.isoformat()
+        print_param.date_to = job.date_to.isoformat()
+        return print_param
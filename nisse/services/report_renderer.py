@@ -0,0 +1,87 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+
+from nisse.models.DTO import PrintParametersDto, ReportEntryDto
+from nisse.models.database import User
+from nisse.services.report_service import ReportService
+from nisse.services.xlsx_document_service import XlsxDocumentService
+from nisse.utils.string_helper import get_user_name
+
+REPORT_FORMAT_XLSX = 'xlsx'
+REPORT_FORMAT_CSV = 'csv'
+REPORT_FORMAT_JSONL = 'jsonl'
+
+REPORT_COLUMNS = ['date', 'user', 'email', 'project', 'duration', 'comment']
+
+
+class ReportRenderer(ABC):
+    """
+    Writes report for given parameters into file
+    """
+    extension = None
+    filetype = None
+
+    @abstractmethod
+    def render(self, report_service: ReportService, print_parameters: PrintParametersDto, file_path: str):
+        pass
+
+
+class XlsxReportRenderer(ReportRenderer):
+    """
+    Formatted workbook with sheet per user, whole report data is loaded before rendering
+    """
+    extension = 'xlsx'
+    filetype = 'xlsx'
+
+    def __init__(self, write_only_min_entries: int):
+        self.write_only_min_entries = write_only_min_entries
+
+    def render(self, report_service: ReportService, print_parameters: PrintParametersDto, file_path: str):
+        write_only = report_service.count_time_entries(print_parameters) >= self.write_only_min_entries
+        XlsxDocumentService().save_report(file_path, print_parameters.date_from, print_parameters.date_to,
+                                          report_service.load_report_data(print_parameters), write_only)
+
+
+class CsvReportRenderer(ReportRenderer):
+    """
+    Plain time entry rows written as they are streamed from database, memory usage does not depend on report size
+    """
+    extension = 'csv'
+    filetype = 'csv'
+
+    def render(self, report_service: ReportService, print_parameters: PrintParametersDto, file_path: str):
+        report_data = report_service.load_report_data(print_parameters)
+        with open(file_path, 'w', newline='', encoding='utf-8') as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(REPORT_COLUMNS)
+            writer.writerows(get_report_row(te, report_data.users[te.user_id]) for te in report_data.time_entries)
+
+
+class JsonLinesReportRenderer(ReportRenderer):
+    """
+    Time entry per line as json object, streamed from database cursor the same way as csv
+    """
+    extension = 'jsonl'
+    filetype = 'text'
+
+    def render(self, report_service: ReportService, print_parameters: PrintParametersDto, file_path: str):
+        report_data = report_service.load_report_data(print_parameters)
+        with open(file_path, 'w', encoding='utf-8') as report_file:
+            for te in report_data.time_entries:
+                row = get_report_row(te, report_data.users[te.user_id])
+                report_file.write(json.dumps(dict(zip(REPORT_COLUMNS, row)), ensure_ascii=False))
+                report_file.write('\n')
+
+
+def get_report_row(time_entry: ReportEntryDto, user: User) -> list:
+    return [time_entry.report_date.isoformat(), get_user_name(user), user.username, time_entry.project,
+            float(time_entry.duration), time_entry.comment]
+
+
+def create_report_renderers(config) -> dict:
+    return {
+        REPORT_FORMAT_XLSX: XlsxReportRenderer(config['REPORT_XLSX_WRITE_ONLY_MIN_ENTRIES']),
+        REPORT_FORMAT_CSV: CsvReportRenderer(),
+        REPORT_FORMAT_JSONL: JsonLinesReportRenderer()
+    }
@@ -1,8 +1,15 @@
+from collections import defaultdict
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_injector import inject
+from sqlalchemy import func, select
+
+from nisse.models.DTO import PrintParametersDto, ReportDataDto, ReportEntryDto
+from nisse.models.database import TimeEntry, Vacation, User, Project, CompanyDayOff
+from nisse.services.business_calendar_service import BusinessCalendarService
+from nisse.utils.date_helper import parse_formatted_date
 
-from nisse.models.DTO import PrintParametersDto
-from nisse.models.database import TimeEntry
+REPORT_STREAM_BATCH_SIZE = 1000
 
 
 class ReportService(object):
@@ -13,10 +20,79 @@ class ReportService(object):
     def __init__(self, db: SQLAlchemy):
         self.db = db
 
-    def load_report_data(self, print_parameters: PrintParametersDto):
-        query = self.db.session.query(TimeEntry)
-        query = self.apply_parameters(query, print_parameters)
-        return query.all()
+    def load_report_data(self, print_parameters: PrintParametersDto) -> ReportDataDto:
+        """ Loads users and vacations of the report, time entries are returned as lazy stream
+        of ReportEntryDto ordered by user name and date, fetched from server side cursor in batches
+        """
+        user_ids = self.apply_parameters(self.db.session.query(TimeEntry.user_id), print_parameters) \
+            .distinct() \
+            .subquery()
+        users = {user.user_id: user for user in self.db.session.query(User).filter(User.user_id.in_(user_ids))}
+
+        query = self.db.session.query(TimeEntry.user_id, TimeEntry.report_date, TimeEntry.duration,
+                                      Project.name, TimeEntry.comment) \
+            .join(User, User.user_id == TimeEntry.user_id) \
+            .join(Project, Project.project_id == TimeEntry.project_id)
+        query = self.apply_parameters(query, print_parameters) \
+            .order_by(User.first_name, User.last_name, TimeEntry.user_id, TimeEntry.report_date,
+                      TimeEntry.time_entry_id) \
+            .execution_options(stream_results=True) \
+            .yield_per(REPORT_STREAM_BATCH_SIZE)
+        time_entries = (ReportEntryDto(*row) for row in query)
+
+        return ReportDataDto(time_entries, users, self.load_vacations(list(users.keys()), print_parameters),
+                             self.load_non_working_days(print_parameters))
+
+    def load_non_working_days(self, print_parameters: PrintParametersDto):
+        if print_parameters.date_from is None or print_parameters.date_to is None:
+            return None
+        return BusinessCalendarService(self.db.session) \
+            .get_non_working_days(parse_formatted_date(print_parameters.date_from),
+                                  parse_formatted_date(print_parameters.date_to))
+
+    def count_time_entries(self, print_parameters: PrintParametersDto) -> int:
+        return self.apply_parameters(self.db.session.query(func.count(TimeEntry.time_entry_id)), print_parameters) \
+            .scalar()
+
+    def get_data_version(self, print_parameters: PrintParametersDto) -> tuple:
+        """ Returns stamp of data the report is generated from, it changes whenever time entries
+        within report parameters, vacations or company days off within report dates are added, removed
+        or changed, and whenever any user or project is changed
+        """
+        query = self.db.session.query(func.count(TimeEntry.time_entry_id), func.max(TimeEntry.time_entry_id),
+                                      func.sum(TimeEntry.duration), func.max(TimeEntry.updated_at))
+        time_entries_version = self.apply_parameters(query, print_parameters).one()
+        vacations_version = self.db.session.query(func.count(Vacation.vacation_id), func.max(Vacation.vacation_id),
+                                                  func.max(Vacation.updated_at)) \
+            .one()
+        users_projects_version = self.db.session.query(select([func.max(User.updated_at)]).as_scalar(),
+                                                       select([func.max(Project.updated_at)]).as_scalar()) \
+            .one()
+        days_off_query = self.db.session.query(func.count(CompanyDayOff.company_day_off_id),
+                                               func.max(CompanyDayOff.company_day_off_id),
+                                               func.max(CompanyDayOff.updated_at))
+        if print_parameters.date_from is not None:
+            days_off_query = days_off_query.filter(CompanyDayOff.day >= print_parameters.date_from)
+        if print_parameters.date_to is not None:
+            days_off_query = days_off_query.filter(CompanyDayOff.day <= print_parameters.date_to)
+        days_off_version = days_off_query.one()
+        return tuple(time_entries_version) + tuple(vacations_version) + tuple(users_projects_version) + \
+            tuple(days_off_version)
+
+    def load_vacations(self, user_ids, print_parameters: PrintParametersDto):
+        vacations = defaultdict(list)
+        if not user_ids:
+            return vacations
+
+        query = self.db.session.query(Vacation).filter(Vacation.user_id.in_(user_ids))
+        if print_parameters.date_from is not None:
+            query = query.filter(Vacation.end_date >= print_parameters.date_from)
+        if print_parameters.date_to is not None:
+            query = query.filter(Vacation.start_date <= print_parameters.date_to)
+
+        for vacation in query.all():
+            vacations[vacation.user_id].append(vacation)
+        return vacations
 
     @staticmethod
     def apply_parameters(query, print_parameters):
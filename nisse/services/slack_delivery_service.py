@@ -0,0 +1,98 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+
+from nisse.services.im_channel_service import CHANNEL_NOT_FOUND_ERROR
+from nisse.services.slack_gateway import SlackGateway
+
+
+class DirectMessage(NamedTuple):
+    user_id: int
+    slack_user_id: str
+    text: str
+    attachments: list
+    im_channel_id: str = None
+
+
+class DeliveryResult(NamedTuple):
+    user_id: int
+    ok: bool
+    error: str = None
+    im_channel_id: str = None
+
+
+class DeliveryReport(object):
+
+    def __init__(self, results: List[DeliveryResult]):
+        self.results = results
+
+    @property
+    def succeeded(self) -> List[DeliveryResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[DeliveryResult]:
+        return [r for r in self.results if not r.ok]
+
+    def __repr__(self):
+        return "DeliveryReport(succeeded={},failed={})".format(len(self.succeeded), len(self.failed))
+
+
+class SlackDeliveryService(object):
+    """
+    Sends direct messages with bounded pool of workers, rate limits and retries are handled by the gateway
+    """
+    def __init__(self, slack_gateway: SlackGateway, logger: logging.Logger, workers: int = 4):
+        self.slack_gateway = slack_gateway
+        self.logger = logger
+        self.workers = workers
+
+    @staticmethod
+    def from_config(slack_gateway: SlackGateway, logger: logging.Logger, config):
+        return SlackDeliveryService(slack_gateway, logger, workers=config['SLACK_DELIVERY_WORKERS'])
+
+    def deliver(self, messages: List[DirectMessage]) -> DeliveryReport:
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.deliver_one, messages))
+        return DeliveryReport(results)
+
+    @staticmethod
+    def get_opened_im_channels(messages: List[DirectMessage], report: DeliveryReport) -> dict:
+        """ Returns user_id -> im channel id of channels which differ from the ones known before delivery
+        """
+        known = {m.user_id: m.im_channel_id for m in messages}
+        return {r.user_id: r.im_channel_id for r in report.results
+                if r.im_channel_id and r.im_channel_id != known.get(r.user_id)}
+
+    def deliver_one(self, message: DirectMessage) -> DeliveryResult:
+        try:
+            channel_id = message.im_channel_id
+            for attempt in range(2):
+                if not channel_id:
+                    im_channel = self.slack_gateway.api_call("im.open", user=message.slack_user_id)
+                    if not im_channel["ok"]:
+                        return self._failed(message, "Can't open im channel", im_channel.get("error"))
+                    channel_id = im_channel['channel']['id']
+
+                resp = self.slack_gateway.api_call(
+                    "chat.postMessage",
+                    channel=channel_id,
+                    text=message.text,
+                    attachments=message.attachments,
+                    mrkdwn=True,
+                    as_user=True
+                )
+                if resp["ok"]:
+                    return DeliveryResult(message.user_id, True, im_channel_id=channel_id)
+                if resp.get("error") != CHANNEL_NOT_FOUND_ERROR or attempt:
+                    break
+                # cached channel is not valid anymore, open new one
+                channel_id = None
+
+            return self._failed(message, "Can't send message", resp.get("error"))
+        except Exception as e:
+            return self._failed(message, "Delivery failed", str(e))
+
+    def _failed(self, message: DirectMessage, reason: str, error: str) -> DeliveryResult:
+        self.logger.error("{0} for user id: {1}. {2}".format(reason, message.user_id, error))
+        return DeliveryResult(message.user_id, False, error)
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nisse.utils.metrics import record_slack_call
+from nisse.utils.rate_limit import RateLimiter
+
+SLACK_API_URL = 'https://slack.com/api/'
+RATE_LIMITED_ERROR = 'ratelimited'
+
+# methods which take comma separated list instead of JSON encoded one
+LIST_FIELDS = {'channels', 'users', 'types'}
+
+
+class MethodMetrics(object):
+    """
+    Latency of calls of single Slack method, retries are counted as separate calls
+    """
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float, error: bool):
+        self.calls += 1
+        self.errors += 1 if error else 0
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_dict(self) -> dict:
+        return {'calls': self.calls,
+                'errors': self.errors,
+                'retries': self.retries,
+                'avg_seconds': self.total_seconds / self.calls if self.calls else 0.0,
+                'max_seconds': self.max_seconds}
+
+
+class SlackGateway(object):
+    """
+    Slack Web API client shared by the whole process. Keeps pool of keep-alive connections,
+    respects per method rate limits and retries calls which were rate limited or failed on connection.
+    Responses have the same shape as the ones of SlackClient.api_call
+    """
+    def __init__(self, token: str, logger: logging.Logger, base_url: str = SLACK_API_URL, pool_size: int = 10,
+                 timeout: float = 30, rates_per_minute: dict = None, default_rate_per_minute: float = 100,
+                 max_retries: int = 3, backoff_seconds: float = 1.0, sleep=time.sleep, clock=time.monotonic):
+        self.token = token
+        self.logger = logger
+        self.base_url = base_url
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rates_per_minute, default_rate_per_minute=default_rate_per_minute)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.sleep = sleep
+        self.clock = clock
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Authorization'] = 'Bearer ' + token
+
+    @staticmethod
+    def from_config(config, logger: logging.Logger, token: str = None):
+        return SlackGateway(token or config['SLACK_BOT_ACCESS_TOKEN'], logger,
+                            base_url=config['SLACK_API_URL'],
+                            pool_size=config['SLACK_POOL_SIZE'],
+                            timeout=config['SLACK_TIMEOUT_SECONDS'],
+                            rates_per_minute=config['SLACK_METHOD_RATE_LIMITS'],
+                            default_rate_per_minute=config['SLACK_DEFAULT_RATE_LIMIT'],
+                            max_retries=config['SLACK_MAX_RETRIES'])
+
+    def api_call(self, method: str, timeout: float = None, **kwargs) -> dict:
+        """ Calls Slack method, retries when rate limited or on connection failure
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(method)
+            try:
+                resp = self.post(method, timeout, dict(kwargs))
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                self.logger.warning("Slack call {0} failed: {1}, retrying".format(method, e))
+                delay = self.backoff_seconds * 2 ** attempt
+            else:
+                if resp.get("ok") or resp.get("error") != RATE_LIMITED_ERROR or attempt >= self.max_retries:
+                    return resp
+                delay = SlackGateway.get_retry_after(resp, self.backoff_seconds * 2 ** attempt)
+                self.logger.warning("Slack call {0} rate limited, retrying in {1}s".format(method, delay))
+                self.rate_limiter.pause(method, delay)
+
+            attempt += 1
+            with self.lock:
+                self.method_metrics(method).retries += 1
+            self.sleep(delay)
+
+    async def api_call_async(self, method: str, timeout: float = None, **kwargs) -> dict:
+        """ Awaitable version of api_call, the call is made on default executor of the loop
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, partial(self.api_call, method, timeout,
+                                                                            **kwargs))
+
+    def post(self, method: str, timeout, post_data: dict) -> dict:
+        files = None
+        if method == 'files.upload' and 'file' in post_data:
+            file = post_data.pop('file')
+            if hasattr(file, 'seek'):
+                # open file is read again when the upload is retried
+                file.seek(0)
+            files = {'file': file}
+
+        for field in LIST_FIELDS & set(post_data.keys()):
+            if isinstance(post_data[field], list):
+                post_data[field] = ",".join(post_data[field])
+        for name, value in post_data.items():
+            if isinstance(value, (list, dict)):
+                post_data[name] = json.dumps(value)
+
+        started = self.clock()
+        error = True
+        try:
+            response = self.session.post(self.base_url + method, data=post_data, files=files,
+                                         timeout=timeout or self.timeout)
+            if response.status_code == 429:
+                # body of rate limited response is not necessarily json, Retry-After header is what matters
+                return {"ok": False, "error": RATE_LIMITED_ERROR, "headers": dict(response.headers)}
+            if response.status_code >= 500:
+                response.raise_for_status()
+            result = response.json()
+            result["headers"] = dict(response.headers)
+            error = not result.get("ok")
+            return result
+        finally:
+            self.record(method, self.clock() - started, error)
+
+    def post_response(self, response_url: str, message: dict, timeout: float = None) -> dict:
+        """ Posts message to response_url of slash command or interactive message
+        """
+        started = self.clock()
+        error = True
+        try:
+            response = self.session.post(response_url, json=message, headers={'Authorization': None},
+                                         timeout=timeout or self.timeout)
+            error = response.status_code >= 400
+            return {"ok": not error, "error": response.text if error else None}
+        finally:
+            self.record('response_url', self.clock() - started, error)
+
+    def record(self, method: str, seconds: float, error: bool):
+        with self.lock:
+            self.method_metrics(method).add(seconds, error)
+        record_slack_call(method, seconds, error)
+
+    def method_metrics(self, method: str) -> MethodMetrics:
+        if method not in self.metrics:
+            self.metrics[method] = MethodMetrics()
+        return self.metrics[method]
+
+    def get_metrics(self) -> dict:
+        """ Returns method -> call statistics
+        """
+        with self.lock:
+            return {method: metrics.to_dict() for method, metrics in self.metrics.items()}
+
+    def close(self):
+        self.session.close()
+
+    @staticmethod
+    def get_retry_after(resp, default: float) -> float:
+        headers = resp.get("headers") or {}
+        for name, value in headers.items():
+            if name.lower() == 'retry-after':
+                try:
+                    return float(value)
+                except ValueError:
+                    break
+        return default
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Dict, NamedTuple
+
+from flask_injector import inject
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from nisse.models.database import TimeEntry, User, Vacation
+from nisse.services.business_calendar_service import BusinessCalendarService
+
+
+class BulkSubmitResult(NamedTuple):
+    added_days: List[date]
+    # days skipped because the entry would exceed daily limit
+    over_limit_days: List[date]
+
+
+class TimeEntryService(object):
+    """
+    Time entries reported by users, daily limit of reported hours is checked in the database
+    """
+    @inject
+    def __init__(self, session: Session, business_calendar_service: BusinessCalendarService):
+        self.db = session
+        self.business_calendar_service = business_calendar_service
+
+    def sum_duration(self, user_id: int, report_date: date) -> Decimal:
+        """ Returns hours reported by the user for the day
+        """
+        return Decimal(self.db.query(func.coalesce(func.sum(TimeEntry.duration), 0))
+                       .filter(TimeEntry.user_id == user_id, TimeEntry.report_date == report_date)
+                       .scalar())
+
+    def sum_durations(self, user_id: int, date_from: date, date_to: date) -> Dict[date, Decimal]:
+        """ Returns hours reported by the user per day of the range, days without entries are left out
+        """
+        return {report_date: Decimal(duration) for report_date, duration in
+                self.db.query(TimeEntry.report_date, func.sum(TimeEntry.duration))
+                    .filter(TimeEntry.user_id == user_id, TimeEntry.report_date >= date_from,
+                            TimeEntry.report_date <= date_to)
+                    .group_by(TimeEntry.report_date)}
+
+    def add_time_entry(self, user_id: int, project_id: int, duration: float, comment: str, report_date: date,
+                       daily_limit: float):
+        """
+        Adds time entry unless hours reported for the day would exceed daily limit. User row is locked before
+        the check, so concurrent submissions of the user are checked one after another. The lock is released
+        by commit on both paths, so changes pending in the session are kept
+        :return: added time entry or None when limit would be exceeded
+        """
+        self.lock_user(user_id)
+        if self.sum_duration(user_id, report_date) + Decimal(duration) > daily_limit:
+            self.db.commit()
+            return None
+
+        time_entry = TimeEntry(user_id=user_id, project_id=project_id, duration=duration, comment=comment,
+                               report_date=report_date)
+        self.db.add(time_entry)
+        self.db.commit()
+        return time_entry
+
+    def get_days_to_report(self, user_id: int, date_from: date, date_to: date) -> List[date]:
+        """ Returns working days within given range, both ends included, except days of user vacations
+        """
+        vacation_days = set()
+        for start_date, end_date in self.db.query(Vacation.start_date, Vacation.end_date) \
+                .filter(Vacation.user_id == user_id, Vacation.start_date <= date_to, Vacation.end_date >= date_from):
+            vacation_days.update(start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1))
+
+        return [day for day in self.business_calendar_service.working_days_between(date_from, date_to)
+                if day not in vacation_days]
+
+    def add_time_entries(self, user_id: int, project_id: int, duration: float, comment: str, days: List[date],
+                         daily_limit: float) -> BulkSubmitResult:
+        """
+        Adds the same time entry for every given day with single insert, limits of all days are checked
+        with single query. Days which would exceed daily limit are skipped
+        """
+        if not days:
+            return BulkSubmitResult([], [])
+
+        self.lock_user(user_id)
+        reported = self.sum_durations(user_id, min(days), max(days))
+        added_days = [day for day in days if reported.get(day, 0) + Decimal(duration) <= daily_limit]
+        over_limit_days = [day for day in days if reported.get(day, 0) + Decimal(duration) > daily_limit]
+
+        if added_days:
+            self.db.execute(TimeEntry.__table__.insert().values(
+                [dict(user_id=user_id, project_id=project_id, duration=duration, comment=comment, report_date=day)
+                 for day in added_days]))
+        self.db.commit()
+        return BulkSubmitResult(added_days, over_limit_days)
+
+    def lock_user(self, user_id: int):
+        self.db.query(User.user_id) \
+            .filter(User.user_id == user_id) \
+            .with_for_update() \
+            .scalar()
@@ -1,20 +1,51 @@
 import datetime
 import random
 import string
-from datetime import timedelta, datetime
-from typing import List
+import time
+from datetime import timedelta, datetime, date
+from typing import List, NamedTuple
 
 from flask_bcrypt import Bcrypt
 from flask_injector import inject
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, event, inspect
 from sqlalchemy import exists
-from sqlalchemy.orm import joinedload, Session
+from sqlalchemy.orm import joinedload, Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 
-from nisse.models.database import User, TimeEntry, UserRole, Project, UserProject
+from nisse.models.database import User, TimeEntry, UserRole, Project, UserProject, ReminderSchedule, \
+    ReminderDelivery
+from nisse.services.reminder_delivery_service import is_delivered_or_claimed
+from nisse.utils.cache import LruCache
 
 USER_ROLE_USER = 'user'
 USER_ROLE_ADMIN = 'admin'
 
+# remind time columns indexed by weekday, Monday is 0
+REMIND_TIME_COLUMNS = ['remind_time_monday', 'remind_time_tuesday', 'remind_time_wednesday', 'remind_time_thursday',
+                       'remind_time_friday', 'remind_time_saturday', 'remind_time_sunday']
+
+# users changed by other processes are picked up after this time
+IDENTITY_CACHE_TTL_SECONDS = 5 * 60
+
+# slack_user_id -> UserIdentity, shared by all requests of the process
+user_identity_cache = LruCache(maxsize=4096)
+
+
+class UserIdentity(NamedTuple):
+    user_id: int
+    username: str
+    slack_user_id: str
+    first_name: str
+    last_name: str
+    role_id: int
+    role: str
+    loaded_at: float
+
+    @staticmethod
+    def of(user: User, loaded_at: float):
+        return UserIdentity(user.user_id, user.username, user.slack_user_id, user.first_name, user.last_name,
+                            user.role_id, user.role.role if user.role else None, loaded_at)
+
 
 class UserService(object):
     """
@@ -24,6 +55,7 @@ class UserService(object):
     def __init__(self, session: Session, bcrypt: Bcrypt):
         self.db = session
         self.bcrypt = bcrypt
+        self.clock = time.monotonic
 
     def find_with_password(self, username, password):
         user = self.db.query(User) \
@@ -43,15 +75,79 @@ class UserService(object):
             .filter(user_id == User.user_id) \
             .first()
 
+    def get_users_by_ids(self, user_ids: List[int], not_reminded_on: date = None) -> List[User]:
+        if not user_ids:
+            return []
+        query = self.db.query(User) \
+            .filter(User.user_id.in_(user_ids))
+        if not_reminded_on:
+            query = query.filter(not_reminded(not_reminded_on))
+        return query.all()
+
     def get_user_by_email(self, email: str):
         return self.db.query(User) \
             .filter(email == User.username) \
             .first()
 
     def get_user_by_slack_id(self, slack_id: str):
-        return self.db.query(User) \
+        """
+        Resolves user once per session, users known to the process are attached to the session
+        without querying users table
+        """
+        users_by_slack_id = self.db.info.setdefault('users_by_slack_id', {})
+        user = users_by_slack_id.get(slack_id)
+        if user is not None and user in self.db:
+            return user
+
+        identity = user_identity_cache.get(slack_id)
+        if identity is not None and self.clock() - identity.loaded_at <= IDENTITY_CACHE_TTL_SECONDS:
+            user = self.attach_identity(identity)
+        else:
+            user = self.db.query(User) \
+                .options(joinedload(User.role)) \
+                .filter(slack_id == User.slack_user_id) \
+                .first()
+            if user is not None:
+                user_identity_cache.put(slack_id, UserIdentity.of(user, self.clock()))
+
+        if user is not None:
+            users_by_slack_id[slack_id] = user
+        return user
+
+    def attach_identity(self, identity: UserIdentity) -> User:
+        """ Puts user known from cache into the session as if it was loaded, other columns are loaded on access
+        """
+        user = self.db.identity_map.get(self.db.identity_key(User, identity.user_id))
+        if user is not None:
+            return user
+
+        user = User(user_id=identity.user_id, username=identity.username, slack_user_id=identity.slack_user_id,
+                    first_name=identity.first_name, last_name=identity.last_name, role_id=identity.role_id)
+        make_transient_to_detached(user)
+        user = self.db.merge(user, load=False)
+
+        if identity.role_id is not None:
+            role = UserRole(user_role_id=identity.role_id, role=identity.role)
+            make_transient_to_detached(role)
+            # role is set as loaded one, so the user is not marked as changed
+            set_committed_value(user, 'role', self.db.merge(role, load=False))
+        return user
+
+    def get_im_channel_id(self, slack_id: str):
+        return self.db.query(User.im_channel_id) \
             .filter(slack_id == User.slack_user_id) \
-            .first()
+            .scalar()
+
+    def set_im_channel_id(self, slack_id: str, im_channel_id):
+        self.db.query(User) \
+            .filter(slack_id == User.slack_user_id) \
+            .update({User.im_channel_id: im_channel_id}, synchronize_session=False)
+        self.db.commit()
+
+    def set_im_channel_ids(self, im_channel_id_by_user_id: dict):
+        self.db.bulk_update_mappings(User, [{'user_id': user_id, 'im_channel_id': im_channel_id}
+                                            for user_id, im_channel_id in im_channel_id_by_user_id.items()])
+        self.db.commit()
 
     def add_user(self, username: str, first_name: str, last_name: str, password: str, slack_user_id: str, role_name=USER_ROLE_USER):
         """ Create a new User record with the supplied params
@@ -67,6 +163,7 @@ class UserService(object):
         new_user = User(username=username, first_name=first_name, last_name=last_name, slack_user_id=slack_user_id, password=pass_hash, role_id=role_object.user_role_id)
         self.db.add(new_user)
         self.db.commit()
+        user_identity_cache.pop(slack_user_id)
         return new_user
 
     def get_default_password(self):
@@ -74,8 +171,8 @@ class UserService(object):
 
     def get_user_time_entries(self, user_id: int, start: datetime.date, end: datetime.date):
         return self.db.query(TimeEntry) \
-            .join(TimeEntry.user) \
-            .filter(User.user_id == user_id, TimeEntry.report_date >= start, TimeEntry.report_date <= end) \
+            .options(joinedload(TimeEntry.project)) \
+            .filter(TimeEntry.user_id == user_id, TimeEntry.report_date >= start, TimeEntry.report_date <= end) \
             .order_by(TimeEntry.report_date.desc()) \
             .all()
 
@@ -108,26 +205,21 @@ class UserService(object):
 
     def get_user_last_time_entry(self, user_id: int):
         return self.db.query(TimeEntry) \
-            .options(joinedload(TimeEntry.project)) \
-            .join(TimeEntry.user) \
-            .filter(User.user_id == user_id) \
+            .filter(TimeEntry.user_id == user_id) \
             .order_by(TimeEntry.report_date.desc()) \
             .first()
 
     def get_last_ten_time_entries(self, user_id: int, project_id: int) -> List[TimeEntry]:
         return self.db.query(TimeEntry) \
-            .join(TimeEntry.user) \
-            .join(TimeEntry.project) \
-            .filter(User.user_id == user_id) \
-            .filter(Project.project_id == project_id) \
+            .filter(TimeEntry.user_id == user_id) \
+            .filter(TimeEntry.project_id == project_id) \
             .order_by(TimeEntry.report_date.desc()) \
             .limit(10) \
             .all()
 
     def get_time_entry(self, user_id: int, time_entry_id: int) -> TimeEntry:
         return self.db.query(TimeEntry) \
-            .join(TimeEntry.user) \
-            .filter(User.user_id == user_id) \
+            .filter(TimeEntry.user_id == user_id) \
             .filter(TimeEntry.time_entry_id == time_entry_id) \
             .first()
 
@@ -143,36 +235,97 @@ class UserService(object):
         self.db.commit()
 
     def update_remind_times(self, user_times: User):
-        user = self.get_user_by_email(user_times.username)
-        user.remind_time_monday = user_times.remind_time_monday
-        user.remind_time_tuesday = user_times.remind_time_tuesday
-        user.remind_time_wednesday = user_times.remind_time_wednesday
-        user.remind_time_thursday = user_times.remind_time_thursday
-        user.remind_time_friday = user_times.remind_time_friday
-        user.remind_time_saturday = user_times.remind_time_saturday
-        user.remind_time_sunday = user_times.remind_time_sunday
+        remind_times = [get_time(getattr(user_times, column)) for column in REMIND_TIME_COLUMNS]
+        with self.db.no_autoflush:
+            user = self.get_user_by_email(user_times.username)
+        for column, remind_time in zip(REMIND_TIME_COLUMNS, remind_times):
+            setattr(user, column, remind_time)
+
+        # schedule table is what reminder job looks up, it mirrors remind time columns
+        self.db.query(ReminderSchedule) \
+            .filter(ReminderSchedule.user_id == user.user_id) \
+            .delete(synchronize_session=False)
+        self.db.add_all([ReminderSchedule(weekday=weekday, utc_minute=remind_time.hour * 60 + remind_time.minute,
+                                          user_id=user.user_id)
+                         for weekday, remind_time in enumerate(remind_times) if remind_time is not None])
         self.db.commit()
 
-    def get_users_to_notify_last_period(self, minutes):
-        end_date = datetime.utcnow()
+    def get_users_to_notify_last_period(self, minutes, end_date: datetime = None, not_reminded_on: date = None):
+        """ Returns users with reminder set within last minutes, both schedule and period are in UTC
+        :param not_reminded_on: skips users who already got reminder of that day
+        """
+        end_date = end_date or datetime.utcnow()
         start_date = end_date - timedelta(minutes=minutes)
+        start_minute = start_date.hour * 60 + start_date.minute
+        end_minute = end_date.hour * 60 + end_date.minute
 
-        user_remind_column_by_weekday = {
-            0: User.remind_time_monday,
-            1: User.remind_time_tuesday,
-            2: User.remind_time_wednesday,
-            3: User.remind_time_thursday,
-            4: User.remind_time_friday,
-            5: User.remind_time_saturday,
-            6: User.remind_time_sunday,
-        }
-        return self.db.query(User) \
-            .filter(user_remind_column_by_weekday[end_date.weekday()] > start_date.time(),
-                    user_remind_column_by_weekday[end_date.weekday()] <= end_date.time()) \
-            .all()
+        if start_date.weekday() == end_date.weekday():
+            in_period = and_(ReminderSchedule.weekday == end_date.weekday(),
+                             ReminderSchedule.utc_minute > start_minute,
+                             ReminderSchedule.utc_minute <= end_minute)
+        else:
+            # period goes past midnight
+            in_period = or_(and_(ReminderSchedule.weekday == start_date.weekday(),
+                                 ReminderSchedule.utc_minute > start_minute),
+                            and_(ReminderSchedule.weekday == end_date.weekday(),
+                                 ReminderSchedule.utc_minute <= end_minute))
+
+        query = self.db.query(User) \
+            .join(ReminderSchedule, ReminderSchedule.user_id == User.user_id) \
+            .filter(in_period)
+        if not_reminded_on:
+            query = query.filter(not_reminded(not_reminded_on))
+        return query.distinct().all()
 
     def get_time_entry_date_range(self, user_id, date_from, date_to):
         return self.db.query(TimeEntry) \
             .filter(and_(TimeEntry.user_id == user_id, TimeEntry.report_date >= date_from,
                          TimeEntry.report_date <= date_to)) \
             .all()
+
+    def get_reported_days(self, user_ids: List[int], date_from, date_to):
+        """ Returns distinct (user_id, report_date) pairs reported by given users within date range
+        """
+        return self.db.query(TimeEntry.user_id, TimeEntry.report_date) \
+            .filter(and_(TimeEntry.user_id.in_(user_ids), TimeEntry.report_date >= date_from,
+                         TimeEntry.report_date <= date_to)) \
+            .group_by(TimeEntry.user_id, TimeEntry.report_date) \
+            .all()
+
+
+@event.listens_for(User.role_id, 'set')
+@event.listens_for(User.role, 'set')
+@event.listens_for(User.username, 'set')
+@event.listens_for(User.first_name, 'set')
+@event.listens_for(User.last_name, 'set')
+def invalidate_user_identity(target: User, value, oldvalue, initiator):
+    if is_stored(target):
+        user_identity_cache.pop(target.__dict__.get('slack_user_id'))
+
+
+@event.listens_for(User.slack_user_id, 'set')
+def invalidate_slack_user_identity(target: User, value, oldvalue, initiator):
+    if is_stored(target):
+        user_identity_cache.pop(oldvalue)
+        user_identity_cache.pop(value)
+
+
+def is_stored(user: User) -> bool:
+    """ Users being built, e.g. from cached identity, or not flushed yet are not cached, so they are not invalidated
+    """
+    state = inspect(user)
+    return not (state.transient or state.pending)
+
+
+def not_reminded(remind_date: date):
+    """ Anti-join criterion matching users without reminder delivered on given day
+    """
+    return ~exists().where(and_(ReminderDelivery.user_id == User.user_id,
+                                ReminderDelivery.remind_date == remind_date,
+                                is_delivered_or_claimed()))
+
+
+def get_time(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%H:%M").time()
+    return value
@@ -37,6 +37,14 @@ class VacationService(object):
                         Vacation.end_date.between(date_from, date_to))) \
             .all()
 
+    def get_vacations_overlapping_dates(self, user_ids, date_from, date_to):
+        """ Returns (user_id, start_date, end_date) of all vacations of given users overlapping date range
+        """
+        return self.db.query(Vacation.user_id, Vacation.start_date, Vacation.end_date) \
+            .filter(Vacation.user_id.in_(user_ids)) \
+            .filter(Vacation.start_date <= date_to, Vacation.end_date >= date_from) \
+            .all()
+
     def get_vacation_by_id(self, user_id: int, vacation_id: int) -> Vacation:
         return self.db.query(Vacation)\
             .filter(vacation_id == Vacation.vacation_id) \
@@ -1,25 +1,19 @@
 from datetime import datetime, timedelta, date
+from collections import defaultdict
 from itertools import groupby
-from typing import List
+from typing import List, NamedTuple
 
-from flask_injector import inject
 from openpyxl import Workbook
-from openpyxl.cell import Cell
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Font, Border, Side, Alignment, colors
 
-from nisse.services.user_service import UserService
-from nisse.services.vacation_service import VacationService
+from nisse.models.DTO import ReportDataDto
 from nisse.utils.date_helper import *
 from nisse.utils.string_helper import *
 
 
 class XlsxDocumentService(object):
 
-    @inject
-    def __init__(self, user_service: UserService, vacation_service: VacationService):
-        self.vacation_service = vacation_service
-        self.user_service = user_service
-
     font_red = Font(color=colors.RED)
     font_orange = Font(color='00FF9900')
     font_red_bold = Font(color=colors.RED, bold=True)
@@ -28,121 +22,141 @@ class XlsxDocumentService(object):
     alignment_right = Alignment(horizontal='right')
     alignment_top = Alignment(vertical='top')
 
-    def save_report(self, file_path, date_from, date_to, time_entries):
+    def save_report(self, file_path, date_from, date_to, report_data: ReportDataDto, write_only=False):
         """
         Creates report and saves it into xlsx file
         :param file_path: file destination
         :param date_from: start date for report
         :param date_to: end date for report
-        :param time_entries: collection time entries
-        :param vacation_data: list of vacations
+        :param report_data: time entries ordered by user with users, vacations and optionally non working days
+        :param write_only: stream rows to the file instead of building whole workbook in memory,
+        memory usage stays flat but date cells of days with many entries are not merged
         :return:
         """
 
-        wb = Workbook()
+        wb = Workbook(write_only=write_only)
+
+        # calendar is the same for every user so days are classified only once per report
+        report_days = list(date_range(datetime.strptime(date_from, "%Y-%m-%d").date(),
+                                      datetime.strptime(date_to, "%Y-%m-%d").date() + timedelta(days=1)))
+        non_working_days = report_data.non_working_days
+        if non_working_days is None:
+            non_working_days = set(filter(is_weekend, report_days))
 
-        time_entries = sorted(time_entries, key=lambda te: get_user_name(te.user))
-        by_user = groupby(time_entries, key=lambda te: te.user_id)
+        # time entries come ordered by user so only entries of single user are in memory at once
+        by_user = groupby(report_data.time_entries, key=lambda te: te.user_id)
 
         first_sheet = True
         for user_id, group in by_user:
 
-            user: User = self.user_service.get_user_by_id(user_id)
+            user: User = report_data.users.get(user_id)
             if not user:
                 continue
 
             group_sorted = list(group)
-            vacation_data = self.vacation_service.get_vacations_by_dates(user.user_id, date_from, date_to)
+            vacation_data = report_data.vacations.get(user_id, [])
 
             first_name = get_user_name(user)
-            sheet = None
-            if first_sheet:
+            if first_sheet and not write_only:
                 sheet = wb.active
                 sheet.title = first_name
-                first_sheet = False
             else:
                 sheet = wb.create_sheet(first_name)
+            first_sheet = False
 
             sheet.column_dimensions['A'].width = 12
             sheet.column_dimensions['B'].width = 10
             sheet.column_dimensions['C'].width = 20
             sheet.column_dimensions['D'].width = 60
 
-            self.put_text(sheet['A1'], "Date", font=self.font_bold)
-            self.put_text(sheet['B1'], "Duration", font=self.font_bold)
-            self.put_text(sheet['C1'], "Project", font=self.font_bold)
-            self.put_text(sheet['D1'], "Comment", font=self.font_bold)
-
-            i = 1
-            i_start = i + 1
-            total_basic = 0
-            total_deficit = 0
-            total_overtime = 0
-            for day in date_range(datetime.strptime(date_from, "%Y-%m-%d").date(),
-                                   datetime.strptime(date_to, "%Y-%m-%d").date() + timedelta(days=1)):
-
-                tes = list(filter(lambda te: te.report_date == day, group_sorted))
-                time_reported = sum(te.duration for te in tes)
-
-                self.put_text(sheet['A' + str(i + 1)], format_date(day),
-                              font=self.get_date_color(day, vacation_data), alignment=self.alignment_top)
-
-                for te in tes:
-                    i += 1
-                    self.put_time(sheet['B' + str(i)], te.duration)
-                    self.put_time(sheet['C' + str(i)], te.project.name)
-                    self.put_text(sheet['D' + str(i)], te.comment)
-
-                if not len(tes):
-                    i += 1
-                    self.put_time(sheet['B' + str(i)], 0)
-
-                to_merge = len(tes) - 1 if len(tes) else 0
-                sheet.merge_cells("A" + str(i - to_merge) + ":A" + str(i))
-
-                basic = 0
-                deficit = 0
-                if not is_weekend(day) and not XlsxDocumentService.is_vacation_day(day, vacation_data):
-                    if not time_reported:
-                        time_reported = 0
-                    basic = time_reported if time_reported <= 8 else 8
-                    deficit = 8 - basic if time_reported <= 8 else 0
-                overtime = time_reported - basic
-                total_overtime += overtime
-                total_deficit += deficit
-                total_basic += basic
-
-            total_overtime_deficit = total_overtime - total_deficit if (total_overtime - total_deficit) > 0 else 0
-            total_basic_deficit = total_basic + total_deficit if total_overtime_deficit > 0 else total_basic + total_overtime
-            total_deficit = total_deficit - total_overtime if (total_deficit - total_overtime) > 0 else 0
-
-            i += 1
-            XlsxDocumentService.put_time(sheet['B' + str(i)], str("=SUM(B" + str(i_start) + ":B" + str(i - 1) + ")"),
-                          font=self.font_bold)
-            XlsxDocumentService.put_text(sheet['A' + str(i + 2)], "Overtime:", font=self.font_bold, alignment=self.alignment_right)
-            XlsxDocumentService.put_time(sheet['B' + str(i + 2)], total_overtime_deficit, self.font_bold)
-            XlsxDocumentService.put_text(sheet['A' + str(i + 3)], "Basic hours:", font=self.font_bold, alignment=self.alignment_right)
-            XlsxDocumentService.put_time(sheet['B' + str(i + 3)], total_basic_deficit, self.font_bold)
-            XlsxDocumentService.put_text(sheet['A' + str(i + 4)], "Deficit:", font=self.font_bold,
-                                         alignment=self.alignment_right)
-            XlsxDocumentService.put_time(sheet['B' + str(i + 4)], total_deficit, self.font_bold)
+            writer = WriteOnlySheetWriter(sheet) if write_only else SheetWriter(sheet)
+            vacation_days = XlsxDocumentService.get_vacation_days(vacation_data)
+            for row, merge_rows in self.get_user_rows(report_days, non_working_days, vacation_days, group_sorted):
+                writer.append(row)
+                if merge_rows:
+                    writer.merge_date_cells(merge_rows)
 
         wb.save(file_path)
 
-    def get_date_color(self, day: date, vacation_list):
-        if is_weekend(day):
+    def get_user_rows(self, report_days, non_working_days, vacation_days, group_sorted):
+        """
+        Yields rows of user sheet one by one
+        :param report_days: all days of the report
+        :param non_working_days: weekends and holidays within report days
+        :param vacation_days: user vacation days
+        :param group_sorted: user time entries
+        :return: tuples (row, number of last rows to merge in date column)
+        """
+        entries_by_day = defaultdict(list)
+        for te in group_sorted:
+            entries_by_day[te.report_date].append(te)
+
+        yield [ReportCell("Date", font=self.font_bold), ReportCell("Duration", font=self.font_bold),
+               ReportCell("Project", font=self.font_bold), ReportCell("Comment", font=self.font_bold)], 0
+
+        i = 1
+        i_start = i + 1
+        total_basic = 0
+        total_deficit = 0
+        total_overtime = 0
+        for day in report_days:
+
+            tes = entries_by_day.get(day, [])
+            time_reported = sum(te.duration for te in tes)
+
+            date_cell = ReportCell(format_date(day), font=self.get_date_color(day, non_working_days, vacation_days),
+                                   alignment=self.alignment_top)
+
+            for index, te in enumerate(tes):
+                i += 1
+                yield [date_cell if index == 0 else None, ReportCell.time(te.duration),
+                       ReportCell.time(te.project), ReportCell(te.comment)], \
+                    len(tes) if index == len(tes) - 1 else 0
+
+            if not len(tes):
+                i += 1
+                yield [date_cell, ReportCell.time(0)], 1
+
+            basic = 0
+            deficit = 0
+            if day not in non_working_days and day not in vacation_days:
+                if not time_reported:
+                    time_reported = 0
+                basic = time_reported if time_reported <= 8 else 8
+                deficit = 8 - basic if time_reported <= 8 else 0
+            overtime = time_reported - basic
+            total_overtime += overtime
+            total_deficit += deficit
+            total_basic += basic
+
+        total_overtime_deficit = total_overtime - total_deficit if (total_overtime - total_deficit) > 0 else 0
+        total_basic_deficit = total_basic + total_deficit if total_overtime_deficit > 0 else total_basic + total_overtime
+        total_deficit = total_deficit - total_overtime if (total_deficit - total_overtime) > 0 else 0
+
+        i += 1
+        yield [None, ReportCell.time(str("=SUM(B" + str(i_start) + ":B" + str(i - 1) + ")"), font=self.font_bold)], 0
+        yield [], 0
+        yield [ReportCell("Overtime:", font=self.font_bold, alignment=self.alignment_right),
+               ReportCell.time(total_overtime_deficit, font=self.font_bold)], 0
+        yield [ReportCell("Basic hours:", font=self.font_bold, alignment=self.alignment_right),
+               ReportCell.time(total_basic_deficit, font=self.font_bold)], 0
+        yield [ReportCell("Deficit:", font=self.font_bold, alignment=self.alignment_right),
+               ReportCell.time(total_deficit, font=self.font_bold)], 0
+
+    def get_date_color(self, day: date, non_working_days, vacation_days):
+        if day in non_working_days:
             return self.font_red
-        elif XlsxDocumentService.is_vacation_day(day, vacation_list):
+        elif day in vacation_days:
             return self.font_orange
         else:
             return None
 
     @staticmethod
-    def is_vacation_day(day: date, vacation_list: List[Vacation]):
+    def get_vacation_days(vacation_list: List[Vacation]):
+        vacation_days = set()
         for vacation in vacation_list:
-            if vacation.start_date <= day <= vacation.end_date:
-                return True
-        return False
+            vacation_days.update(date_range(vacation.start_date, vacation.end_date + timedelta(days=1)))
+        return vacation_days
 
     @staticmethod
     def put_time(cell: Cell, duration, font=None, border=None, alignment=None):
@@ -160,3 +174,60 @@ class XlsxDocumentService(object):
         if alignment:
             cell.alignment = alignment
         return cell
+
+
+class ReportCell(NamedTuple):
+    value: object
+    font: Font = None
+    alignment: Alignment = None
+    number_format: str = None
+
+    @staticmethod
+    def time(duration, font=None):
+        return ReportCell(duration, font=font, number_format='0.00')
+
+
+class SheetWriter(object):
+    """
+    Writes rows into regular worksheet kept in memory
+    """
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.row = 0
+
+    def append(self, row: List[ReportCell]):
+        self.row += 1
+        for column, report_cell in enumerate(row, 1):
+            if report_cell is None:
+                continue
+            cell = XlsxDocumentService.put_text(self.sheet.cell(row=self.row, column=column), report_cell.value,
+                                                font=report_cell.font, alignment=report_cell.alignment)
+            if report_cell.number_format:
+                cell.number_format = report_cell.number_format
+
+    def merge_date_cells(self, rows: int):
+        self.sheet.merge_cells("A" + str(self.row - rows + 1) + ":A" + str(self.row))
+
+
+class WriteOnlySheetWriter(object):
+    """
+    Streams rows into write-only worksheet, rows are flushed to disk and not kept in memory
+    """
+    def __init__(self, sheet):
+        self.sheet = sheet
+
+    def append(self, row: List[ReportCell]):
+        self.sheet.append([self.to_cell(report_cell) for report_cell in row])
+
+    def to_cell(self, report_cell: ReportCell):
+        if report_cell is None:
+            return None
+        cell = XlsxDocumentService.put_text(WriteOnlyCell(self.sheet), report_cell.value,
+                                            font=report_cell.font, alignment=report_cell.alignment)
+        if report_cell.number_format:
+            cell.number_format = report_cell.number_format
+        return cell
+
+    def merge_date_cells(self, rows: int):
+        # write-only worksheets do not support merged cells, date is put only into the first row of the day
+        pass
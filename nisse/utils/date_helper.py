@@ -3,6 +3,8 @@ from datetime import datetime, date
 from datetime import datetime as dt
 from datetime import timedelta
 from enum import Enum
+from functools import lru_cache
+from typing import FrozenSet, List
 
 from dateutil.easter import easter
 
@@ -65,20 +67,38 @@ def is_weekend(day):
 
 
 def is_holiday_poland(day: date):
-    est = easter(day.year)
-    return day in [
-        parse_formatted_date('{0}-01-01'.format(day.year)),
-        parse_formatted_date('{0}-01-06'.format(day.year)),
-        parse_formatted_date('{0}-05-01'.format(day.year)),
-        parse_formatted_date('{0}-05-03'.format(day.year)),
-        parse_formatted_date('{0}-08-15'.format(day.year)),
-        parse_formatted_date('{0}-11-01'.format(day.year)),
-        parse_formatted_date('{0}-11-11'.format(day.year)),
-        parse_formatted_date('{0}-12-25'.format(day.year)),
-        parse_formatted_date('{0}-12-26'.format(day.year)),
+    return day in get_holidays_poland(day.year)
+
+
+@lru_cache(maxsize=32)
+def get_holidays_poland(year: int) -> FrozenSet[date]:
+    est = easter(year)
+    return frozenset([
+        date(year, 1, 1),
+        date(year, 1, 6),
+        date(year, 5, 1),
+        date(year, 5, 3),
+        date(year, 8, 15),
+        date(year, 11, 1),
+        date(year, 11, 11),
+        date(year, 12, 25),
+        date(year, 12, 26),
         est + timedelta(days=1),
         est + timedelta(days=60)
-    ]
+    ])
+
+
+def working_days_between(date_from: date, date_to: date) -> List[date]:
+    """
+    Returns working days within given range, both ends included
+    """
+    holidays = set()
+    for year in range(date_from.year, date_to.year + 1):
+        holidays.update(day.toordinal() for day in get_holidays_poland(year))
+
+    # ordinal 1 is Monday, 0001-01-01
+    return [date.fromordinal(ordinal) for ordinal in range(date_from.toordinal(), date_to.toordinal() + 1)
+            if (ordinal - 1) % 7 < 5 and ordinal not in holidays]
 
 
 def parse_formatted_date(date):
@@ -1,7 +1,68 @@
+import atexit
+import json
 import os
 import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue, Full
+
 from cmreslogging.handlers import CMRESHandler
 
+from nisse.utils.metrics import metrics_registry
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records over to listener thread through bounded queue and never waits for it. Records which do
+    not fit into the queue are appended to spill file when it is configured, otherwise they are dropped
+    """
+    def __init__(self, queue: Queue, spill_path: str = None):
+        super().__init__(queue)
+        self.spill_path = spill_path
+        self.spill_lock = threading.Lock()
+        self.dropped = 0
+        self.spilled = 0
+        self.listener = None
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.overflow(record)
+
+    def overflow(self, record):
+        if self.spill_path:
+            try:
+                line = json.dumps(record.__dict__, default=str)
+                with self.spill_lock, open(self.spill_path, 'a') as spill_file:
+                    spill_file.write(line + '\n')
+                self.spilled += 1
+                metrics_registry.inc('nisse_log_records_spilled_total', 'Log records written to spill file')
+                return
+            except (OSError, ValueError):
+                pass
+        self.dropped += 1
+        metrics_registry.inc('nisse_log_records_dropped_total', 'Log records dropped because log queue was full')
+
+    def stop(self):
+        """ Ships records left in the queue and releases target handlers
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+
+
+def start_log_shipping(target: logging.Handler, queue_size: int, spill_path: str = None) -> BoundedQueueHandler:
+    """ Returns handler passing records to target handler run on separate thread
+    """
+    handler = BoundedQueueHandler(Queue(maxsize=queue_size), spill_path)
+    handler.listener = QueueListener(handler.queue, target, respect_handler_level=True)
+    handler.listener.start()
+    return handler
+
+
 def init_logging(application):
 
     if application.config['ELASTIC_HOST']:
@@ -9,10 +70,20 @@ def init_logging(application):
         if 'APP_CONFIG_FILE' in os.environ:
             env_name = os.environ['APP_CONFIG_FILE']
 
+        # records are indexed in bulk by listener thread so requests never wait for Elasticsearch
         handler = CMRESHandler(hosts=[{'host': application.config["ELASTIC_HOST"], 'port': 9200}],
                            auth_type=CMRESHandler.AuthType.NO_AUTH,
                            es_index_name="logs-nisse",
-                           es_additional_fields={'environment': env_name})
-        application.logger.addHandler(handler)
+                           es_additional_fields={'environment': env_name},
+                           buffer_size=application.config['LOG_BATCH_SIZE'],
+                           flush_frequency_in_sec=application.config['LOG_FLUSH_SECONDS'])
+
+        spill_path = None
+        if application.config['LOG_SPILL_FILE']:
+            spill_path = os.path.join(application.instance_path, application.config['LOG_SPILL_FILE'])
+
+        queue_handler = start_log_shipping(handler, application.config['LOG_QUEUE_SIZE'], spill_path)
+        atexit.register(queue_handler.stop)
+        application.logger.addHandler(queue_handler)
 
-#    application.logger.setLevel(logging.DEBUG)
\ No newline at end of file
+#    application.logger.setLevel(logging.DEBUG)
@@ -0,0 +1,205 @@
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Flask, g, has_app_context, request, Response
+from sqlalchemy import event
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricFamily(object):
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        # (suffix, labels) -> value
+        self.samples = {}
+
+    def add(self, suffix: str, labels: tuple, value: float):
+        self.samples[(suffix, labels)] = self.samples.get((suffix, labels), 0) + value
+
+    def render(self, lines: list):
+        lines.append('# HELP {0} {1}'.format(self.name, self.help_text))
+        lines.append('# TYPE {0} {1}'.format(self.name, self.metric_type))
+        for (suffix, labels), value in sorted(self.samples.items(), key=lambda sample: (sample[0][1], sample[0][0])):
+            lines.append('{0}{1}{2} {3}'.format(self.name, suffix, format_labels(labels), repr(float(value))))
+
+
+class MetricsRegistry(object):
+    """
+    Thread safe counters and summaries of the process, rendered in Prometheus text format
+    """
+    def __init__(self):
+        self.families = OrderedDict()
+        self.lock = threading.Lock()
+
+    def inc(self, name: str, help_text: str, value: float = 1, **labels):
+        with self.lock:
+            self.family(name, 'counter', help_text).add('', tuple(sorted(labels.items())), value)
+
+    def observe(self, name: str, help_text: str, seconds: float, **labels):
+        """ Adds observation to summary kept as name_count and name_sum
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            family = self.family(name, 'summary', help_text)
+            family.add('_count', key, 1)
+            family.add('_sum', key, seconds)
+
+    def family(self, name: str, metric_type: str, help_text: str) -> MetricFamily:
+        if name not in self.families:
+            self.families[name] = MetricFamily(name, metric_type, help_text)
+        return self.families[name]
+
+    def get(self, name: str, suffix: str = '', **labels) -> float:
+        with self.lock:
+            if name not in self.families:
+                return 0
+            return self.families[name].samples.get((suffix, tuple(sorted(labels.items()))), 0)
+
+    def clear(self):
+        with self.lock:
+            self.families.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for family in self.families.values():
+                family.render(lines)
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+                                             .replace('\n', '\\n'))
+                          for name, value in labels) + '}'
+
+
+# counters of the whole process
+metrics_registry = MetricsRegistry()
+
+
+class RequestMetrics(object):
+    """
+    Time spent by single request, in total, in SQL queries and in Slack API calls
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.action = None
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.slack_count = 0
+        self.slack_seconds = 0.0
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started
+
+    def to_log_fields(self) -> dict:
+        return {'action': self.action,
+                'duration_ms': round(self.elapsed() * 1000, 1),
+                'sql_count': self.sql_count,
+                'sql_ms': round(self.sql_seconds * 1000, 1),
+                'slack_count': self.slack_count,
+                'slack_ms': round(self.slack_seconds * 1000, 1)}
+
+
+def current_request_metrics() -> RequestMetrics:
+    return g.get('request_metrics') if has_app_context() else None
+
+
+def set_action(action: str):
+    """ Labels metrics of current request with handled Slack command or payload type
+    """
+    request_metrics = current_request_metrics()
+    if request_metrics is not None:
+        request_metrics.action = action
+
+
+def record_sql_query(seconds: float):
+    request_metrics = current_request_metrics()
+    if request_metrics is not None:
+        request_metrics.sql_count += 1
+        request_metrics.sql_seconds += seconds
+
+
+def record_slack_call(method: str, seconds: float, error: bool):
+    metrics_registry.observe('nisse_slack_api_call_seconds', 'Slack Web API call latency', seconds, method=method)
+    if error:
+        metrics_registry.inc('nisse_slack_api_errors_total', 'Slack Web API calls which failed', method=method)
+
+    request_metrics = current_request_metrics()
+    if request_metrics is not None:
+        request_metrics.slack_count += 1
+        request_metrics.slack_seconds += seconds
+
+
+def instrument_engine(engine):
+    """ Counts and times SQL statements executed by the engine within requests
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.monotonic())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        record_sql_query(time.monotonic() - started)
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_started'):
+            conn.info['query_started'].pop()
+
+
+def init_request_metrics(app: Flask):
+    """ Measures every request, the result is logged with structured fields and added to the registry
+    """
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = RequestMetrics()
+
+    @app.after_request
+    def finish_request_metrics(response):
+        request_metrics = current_request_metrics()
+        if request_metrics is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        action = request_metrics.action or ''
+        labels = dict(endpoint=endpoint, action=action)
+        metrics_registry.observe('nisse_request_seconds', 'Request wall time', request_metrics.elapsed(), **labels)
+        metrics_registry.inc('nisse_request_sql_queries_total', 'SQL queries run by requests',
+                             request_metrics.sql_count, **labels)
+        metrics_registry.inc('nisse_request_sql_seconds_total', 'Time of SQL queries run by requests',
+                             request_metrics.sql_seconds, **labels)
+        metrics_registry.inc('nisse_request_slack_calls_total', 'Slack Web API calls made by requests',
+                             request_metrics.slack_count, **labels)
+        metrics_registry.inc('nisse_request_slack_seconds_total', 'Time of Slack Web API calls made by requests',
+                             request_metrics.slack_seconds, **labels)
+
+        fields = request_metrics.to_log_fields()
+        fields.update(endpoint=endpoint, status=response.status_code)
+        app.logger.info('Request {0} {1} finished in {2}ms, {3} queries'.format(
+            endpoint, action, fields['duration_ms'], fields['sql_count']), extra=fields)
+        return response
+
+
+def metrics_endpoint(app: Flask):
+    """ Serves the registry in Prometheus text format to scrapers presenting configured bearer token,
+    remote address is not checked as behind a reverse proxy every request comes from the same host
+    """
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            return Response('Not Found', status=404)
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), 'Bearer ' + token):
+            return Response('Forbidden', status=403)
+        return Response(metrics_registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+    return metrics
@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Thread safe token bucket, allows bursts up to capacity and refills with constant rate
+    """
+    def __init__(self, rate_per_minute: float, capacity: int = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1, int(rate_per_minute / 60.0))
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated_at = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """ Takes one token, blocks until the token is available
+        """
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def pause(self, seconds: float):
+        """ Drains the bucket so that next token is available not earlier than after given time
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter(object):
+    """
+    Keeps separate token bucket for every Slack Web API method
+    """
+    def __init__(self, rates_per_minute: dict, default_rate_per_minute: float):
+        self.rates_per_minute = rates_per_minute or {}
+        self.default_rate_per_minute = default_rate_per_minute
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, method: str) -> TokenBucket:
+        with self.lock:
+            if method not in self.buckets:
+                self.buckets[method] = TokenBucket(self.rates_per_minute.get(method, self.default_rate_per_minute))
+            return self.buckets[method]
+
+    def acquire(self, method: str):
+        self.bucket(method).acquire()
+
+    def pause(self, method: str, seconds: float):
+        self.bucket(method).pause(seconds)
@@ -36,13 +36,13 @@ def format_duration_decimal(duration_float):
     return str(int(ts/3600)) + ":" + str(int(ts % 3600 / 60)).zfill(2)
 
 
-def generate_xlsx_file_name(user: User, project_name, date_from, date_to):
+def generate_report_file_name(user: User, project_name, date_from, date_to, extension="xlsx"):
     return str(str(get_user_name(user) + "-" + project_name + "-").lower().replace(" ", "-")
                     + format_date_str(date_from) + "-"
-                    + format_date_str(date_to) + ".xlsx")
+                    + format_date_str(date_to) + "." + extension)
 
 
-def generate_xlsx_title(user: User, project_name, date_from, date_to):
+def generate_report_title(user: User, project_name, date_from, date_to):
     return str("Report for " + get_user_name(user)  + " (" + project_name + ") within "
                       + format_date_str(date_from) + " - "
                       + format_date_str(date_to))
@@ -0,0 +1,13 @@
+from flask import Flask
+
+from nisse.services.reminder_job import create_session_maker
+from nisse.services.reminder_scheduler import ReminderScheduler
+from nisse.services.slack_gateway import SlackGateway
+from nisse.utils.configs import load_config
+
+application = Flask(__name__, instance_relative_config=True)
+
+load_config(application)
+
+ReminderScheduler(application.config, application.logger, create_session_maker(application.config),
+                  SlackGateway.from_config(application.config, application.logger)).start()
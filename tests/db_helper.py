@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from nisse.models.database import Base, UserRole
+
+
+def create_test_session():
+    """ Creates session bound to fresh in-memory sqlite database with whole schema created
+    """
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([UserRole(role='admin'), UserRole(role='user')])
+    session.commit()
+    return session
+
+
+class QueryCounter(object):
+    """ Counts SQL statements executed on the engine within the context
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def explain(self, index: int = -1):
+        """ Returns details of sqlite query plan of executed statement
+        """
+        return [row[3] for row in self.engine.execute('EXPLAIN QUERY PLAN ' + self.statements[index],
+                                                      self.parameters[index])]
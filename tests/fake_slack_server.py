@@ -0,0 +1,79 @@
+import json
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeSlackServer(object):
+    """
+    Local HTTP server imitating Slack Web API, every method answers ok unless response is queued
+    """
+    def __init__(self):
+        self.calls = []
+        self.connections = 0
+        self.queued = defaultdict(deque)
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                method = self.path.rsplit('/', 1)[-1]
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                if self.headers.get('Content-Type') == 'application/json':
+                    params = json.loads(body)
+                elif self.headers.get('Content-Type', '').startswith('multipart/form-data'):
+                    params = {'body': body}
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body).items()}
+                params['Authorization'] = self.headers.get('Authorization')
+                status, headers, payload = server.respond(method, params)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}/api/'.format(self.httpd.server_port)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def queue(self, method, payload, status=200, headers=None):
+        self.queued[method].append((status, headers or {}, payload))
+
+    def rate_limit(self, method, retry_after):
+        self.queue(method, {'ok': False, 'error': 'ratelimited'}, 429, {'Retry-After': str(retry_after)})
+
+    def calls_of(self, method):
+        return [params for m, params in self.calls if m == method]
+
+    def respond(self, method, params):
+        with self.lock:
+            self.calls.append((method, params))
+            if self.queued[method]:
+                return self.queued[method].popleft()
+        if method == 'im.open':
+            return 200, {}, {'ok': True, 'channel': {'id': 'D' + params['user']}}
+        return 200, {}, {'ok': True}
+
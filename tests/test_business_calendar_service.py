@@ -0,0 +1,75 @@
+import unittest
+from datetime import date
+
+from nisse.models.database import CompanyDayOff
+from nisse.services.business_calendar_service import BusinessCalendarService, business_calendar_cache, \
+    DAY_OFF_SOURCE_CALENDAR, DAY_OFF_SOURCE_MANUAL
+from nisse.utils.date_helper import working_days_between
+from tests.db_helper import create_test_session, QueryCounter
+
+
+class BusinessCalendarServiceTests(unittest.TestCase):
+
+    def setUp(self):
+        business_calendar_cache.clear()
+        self.session = create_test_session()
+        self.service = BusinessCalendarService(self.session)
+
+    def tearDown(self):
+        business_calendar_cache.clear()
+        self.session.close()
+
+    def test_working_days_between_should_match_public_holidays_without_days_off(self):
+        self.assertEqual(working_days_between(date(2017, 12, 1), date(2020, 2, 1)),
+                         self.service.working_days_between(date(2017, 12, 1), date(2020, 2, 1)))
+
+    def test_working_days_between_should_skip_company_days_off(self):
+        self.service.add_day_off(date(2018, 5, 2), 'Long weekend')
+
+        self.assertEqual([date(2018, 4, 30), date(2018, 5, 4)],
+                         self.service.working_days_between(date(2018, 4, 28), date(2018, 5, 6)))
+        self.assertEqual({date(2018, 4, 28), date(2018, 4, 29), date(2018, 5, 1), date(2018, 5, 2),
+                          date(2018, 5, 3), date(2018, 5, 5), date(2018, 5, 6)},
+                         self.service.get_non_working_days(date(2018, 4, 28), date(2018, 5, 6)))
+
+    def test_is_day_off_should_not_treat_weekend_as_day_off(self):
+        self.service.add_day_off(date(2018, 6, 4), 'Company trip')
+
+        self.assertTrue(self.service.is_day_off(date(2018, 6, 4)))
+        self.assertTrue(self.service.is_day_off(date(2018, 5, 3)))
+        self.assertFalse(self.service.is_day_off(date(2018, 6, 2)))
+        self.assertFalse(self.service.is_working_day(date(2018, 6, 2)))
+        self.assertTrue(self.service.is_working_day(date(2018, 6, 5)))
+
+    def test_get_year_should_load_year_once(self):
+        with QueryCounter(self.session.get_bind()) as counter:
+            for day in range(1, 31):
+                self.service.is_working_day(date(2018, 6, day))
+
+        self.assertEqual(1, counter.count)
+
+    def test_remove_day_off_should_invalidate_year(self):
+        self.service.add_day_off(date(2018, 6, 4), 'Company trip')
+        self.assertFalse(self.service.is_working_day(date(2018, 6, 4)))
+
+        self.service.remove_day_off(date(2018, 6, 4))
+
+        self.assertTrue(self.service.is_working_day(date(2018, 6, 4)))
+
+    def test_get_workday_n_days_ago_should_skip_non_working_days(self):
+        self.service.add_day_off(date(2018, 6, 8), 'Company trip')
+
+        self.assertEqual(date(2018, 6, 6), self.service.get_workday_n_days_ago(2, date(2018, 6, 11)))
+
+    def test_sync_days_off_should_replace_imported_days_and_keep_manual_ones(self):
+        self.service.add_day_off(date(2018, 6, 4), 'Company trip')
+        self.service.sync_days_off(2018, [(date(2018, 6, 5), 'Old'), (date(2018, 6, 6), 'Old')])
+
+        imported = self.service.sync_days_off(2018, [(date(2018, 6, 4), 'Duplicate'), (date(2018, 6, 7), 'New'),
+                                                     (date(2019, 1, 2), 'Other year')])
+
+        self.assertEqual(1, imported)
+        self.assertEqual([(date(2018, 6, 4), DAY_OFF_SOURCE_MANUAL), (date(2018, 6, 7), DAY_OFF_SOURCE_CALENDAR)],
+                         [(d.day, d.source) for d in self.session.query(CompanyDayOff).order_by(CompanyDayOff.day)])
+        self.assertTrue(self.service.is_working_day(date(2018, 6, 5)))
+        self.assertFalse(self.service.is_working_day(date(2018, 6, 7)))
@@ -0,0 +1,84 @@
+import time
+import unittest
+from datetime import date, timedelta
+
+from dateutil.easter import easter
+
+from nisse.utils.date_helper import date_range, is_holiday_poland, is_weekend, get_holidays_poland, \
+    working_days_between, parse_formatted_date
+
+
+def is_holiday_poland_uncached(day: date):
+    """ Implementation the calendar used to have, kept as reference for results and timing
+    """
+    est = easter(day.year)
+    return day in [
+        parse_formatted_date('{0}-01-01'.format(day.year)),
+        parse_formatted_date('{0}-01-06'.format(day.year)),
+        parse_formatted_date('{0}-05-01'.format(day.year)),
+        parse_formatted_date('{0}-05-03'.format(day.year)),
+        parse_formatted_date('{0}-08-15'.format(day.year)),
+        parse_formatted_date('{0}-11-01'.format(day.year)),
+        parse_formatted_date('{0}-11-11'.format(day.year)),
+        parse_formatted_date('{0}-12-25'.format(day.year)),
+        parse_formatted_date('{0}-12-26'.format(day.year)),
+        est + timedelta(days=1),
+        est + timedelta(days=60)
+    ]
+
+
+def working_days_uncached(date_from: date, date_to: date):
+    return [day for day in date_range(date_from, date_to + timedelta(days=1))
+            if day.weekday() < 5 and not is_holiday_poland_uncached(day)]
+
+
+class DateHelperTests(unittest.TestCase):
+
+    def test_is_holiday_poland_should_include_movable_holidays(self):
+        self.assertTrue(is_holiday_poland(date(2018, 4, 2)))
+        self.assertTrue(is_holiday_poland(date(2018, 5, 31)))
+        self.assertTrue(is_holiday_poland(date(2019, 11, 11)))
+        self.assertFalse(is_holiday_poland(date(2018, 4, 3)))
+        self.assertTrue(is_weekend(date(2018, 5, 5)))
+        self.assertEqual(11, len(get_holidays_poland(2020)))
+
+    def test_working_days_between_should_skip_weekends_and_holidays(self):
+        self.assertEqual([date(2018, 4, 30), date(2018, 5, 2), date(2018, 5, 4)],
+                         working_days_between(date(2018, 4, 28), date(2018, 5, 6)))
+        self.assertEqual([], working_days_between(date(2018, 5, 6), date(2018, 5, 5)))
+
+    def test_working_days_between_should_match_reference_implementation(self):
+        self.assertEqual(working_days_uncached(date(2015, 12, 20), date(2021, 1, 10)),
+                         working_days_between(date(2015, 12, 20), date(2021, 1, 10)))
+
+
+class DateHelperBenchmark(unittest.TestCase):
+
+    def test_working_days_between_should_compute_holidays_once_per_year(self):
+        date_from, date_to = date(2010, 1, 1), date(2019, 12, 31)
+        get_holidays_poland.cache_clear()
+
+        actual = working_days_between(date_from, date_to)
+        days = list(date_range(date_from, date_to + timedelta(days=1)))
+        holidays = [day for day in days if is_holiday_poland(day)]
+
+        cache_info = get_holidays_poland.cache_info()
+        self.assertEqual(10, cache_info.misses)
+        self.assertEqual(len(days), cache_info.hits)
+        self.assertEqual(working_days_uncached(date_from, date_to), actual)
+        self.assertEqual(110, len(holidays))
+
+    def test_working_days_between_should_not_be_slower_than_reference(self):
+        date_from, date_to = date(2010, 1, 1), date(2019, 12, 31)
+
+        started = time.perf_counter()
+        working_days_uncached(date_from, date_to)
+        reference_time = time.perf_counter() - started
+
+        get_holidays_poland.cache_clear()
+        started = time.perf_counter()
+        working_days_between(date_from, date_to)
+        elapsed = time.perf_counter() - started
+
+        # loose bound only, cache hits above are what the optimisation is about
+        self.assertLess(elapsed, reference_time)
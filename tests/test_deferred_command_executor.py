@@ -0,0 +1,93 @@
+import logging
+import threading
+import unittest
+
+import mock
+from flask import Flask, request
+
+from nisse.services.deferred_command_executor import DeferredCommandExecutor
+from nisse.services.exception import SlackUserException
+from nisse.services.slack_gateway import SlackGateway
+from tests.fake_slack_server import FakeSlackServer
+
+
+class DeferredCommandExecutorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSlackServer().start()
+        self.logger = mock.create_autospec(logging.Logger)
+        self.gateway = SlackGateway('xoxb-token', self.logger, base_url=self.server.url)
+        self.executor = DeferredCommandExecutor(mock.MagicMock(), self.gateway, self.logger, commands=['food'],
+                                                workers=1, max_pending=2, ack_text='Working on it')
+        self.app = Flask(__name__)
+        self.command_body = {'user_id': 'U1', 'response_url': self.server.url + 'response'}
+
+    def tearDown(self):
+        self.executor.executor.shutdown()
+        self.gateway.close()
+        self.server.stop()
+
+    def submit(self, callback):
+        with self.app.test_request_context('/slack/command', method='POST'):
+            return self.executor.submit('food', callback, self.command_body, [])
+
+    def test_submit_should_ack_before_command_finishes(self):
+        # arrange
+        release = threading.Event()
+
+        def command(command_body, arguments, action):
+            release.wait(5)
+            return "Order started by " + command_body['user_id'] + " for " + request.path
+
+        # act
+        ack = self.submit(command)
+        responses_before_finish = list(self.server.calls_of('response'))
+        release.set()
+        self.executor.executor.shutdown()
+
+        # assert
+        self.assertEqual(('Working on it', 'ephemeral'), (ack['text'], ack['response_type']))
+        self.assertEqual([], responses_before_finish)
+        self.assertEqual(['Order started by U1 for /slack/command'],
+                         [r['text'] for r in self.server.calls_of('response')])
+        self.assertEqual(1, self.executor.get_metrics()['food']['calls'])
+        self.assertEqual(1, self.executor.get_metrics()['food.wait']['calls'])
+
+    def test_submit_should_post_error_message_when_command_fails(self):
+        # arrange
+        def command(command_body, arguments, action):
+            raise SlackUserException('Unknown user')
+
+        # act
+        self.submit(command)
+        self.executor.executor.shutdown()
+
+        # assert
+        self.assertEqual('Unknown user', self.server.calls_of('response')[0]['text'])
+        self.assertEqual(1, self.executor.get_metrics()['food']['errors'])
+
+    def test_submit_should_refuse_when_too_many_commands_pending(self):
+        # arrange
+        release = threading.Event()
+
+        def command(command_body, arguments, action):
+            release.wait(5)
+
+        # act
+        acks = [self.submit(command) for _ in range(3)]
+        release.set()
+
+        # assert
+        self.assertIsNotNone(acks[0])
+        self.assertIsNotNone(acks[1])
+        self.assertIsNone(acks[2])
+
+    def test_run_should_measure_command_in_request_thread(self):
+        # act
+        result = self.executor.run('list', lambda command_body, arguments, action: action, self.command_body, [])
+
+        # assert
+        self.assertEqual('list', result)
+        self.assertTrue(self.executor.is_deferred('food'))
+        self.assertFalse(self.executor.is_deferred('list'))
+        self.assertEqual(1, self.executor.get_metrics()['list']['calls'])
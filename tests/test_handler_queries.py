@@ -0,0 +1,249 @@
+import logging
+import unittest
+from datetime import date
+from decimal import Decimal
+
+import mock
+from flask_bcrypt import Bcrypt
+from sqlalchemy.orm import Session
+
+from nisse.models.DTO import TimeRecordDto
+from nisse.models.database import User, Project, TimeEntry, UserProject, Vacation
+from nisse.routes.slack.command_handlers.delete_time_command_handler import DeleteTimeCommandHandler
+from nisse.routes.slack.command_handlers.food_command_handler import FoodCommandHandler
+from nisse.routes.slack.command_handlers.list_command_handler import ListCommandHandler
+from nisse.routes.slack.command_handlers.project_command_handler import ProjectCommandHandler
+from nisse.routes.slack.command_handlers.reminder_command_handler import ReminderCommandHandler
+from nisse.routes.slack.command_handlers.report_command_handler import ReportCommandHandler
+from nisse.routes.slack.command_handlers.show_help_command_handler import ShowHelpCommandHandler
+from nisse.routes.slack.command_handlers.submit_time_command_handler import SubmitTimeCommandHandler
+from nisse.routes.slack.command_handlers.vacation_command_handler import VacationCommandHandler
+from nisse.services.business_calendar_service import BusinessCalendarService
+from nisse.services.food_order_service import FoodOrderService
+from nisse.services.im_channel_service import im_channel_cache
+from nisse.services.project_service import ProjectService, project_catalogue_cache
+from nisse.services.reminder_service import ReminderService
+from nisse.services.slack_gateway import SlackGateway
+from nisse.services.time_entry_service import TimeEntryService
+from nisse.services.user_service import UserService, user_identity_cache
+from nisse.services.vacation_service import VacationService
+from nisse.utils.date_helper import TimeRanges
+from tests.db_helper import create_test_session, QueryCounter
+
+
+class HandlerQueryTests(unittest.TestCase):
+    """ Number of queries run by handlers must not depend on number of time entries
+    """
+
+    def setUp(self):
+        for cache in (user_identity_cache, project_catalogue_cache, im_channel_cache):
+            cache.clear()
+
+        seed_session = create_test_session()
+        self.engine = seed_session.get_bind()
+        seed_session.add_all([User(user_id=1, username='john@mail.com', first_name='John', slack_user_id='U1',
+                                   role_id=1, im_channel_id='D1'),
+                              Project(project_id=1, name='Nisse'), Project(project_id=2, name='Other'),
+                              UserProject(user_id=1, project_id=1), UserProject(user_id=1, project_id=2)])
+        seed_session.add_all([TimeEntry(user_id=1, project_id=1 + day % 2, duration=Decimal(1), comment='Work',
+                                        report_date=date.today()) for day in range(12)])
+        seed_session.commit()
+        seed_session.close()
+
+        self.session = Session(bind=self.engine)
+        self.user_service = UserService(self.session, Bcrypt())
+        self.project_service = ProjectService(mock.Mock(session=self.session))
+        self.slack_gateway = mock.create_autospec(SlackGateway)
+        self.slack_gateway.api_call.return_value = {'ok': True}
+        self.handler_args = ({'MESSAGE_SUBMIT_TIME_TIP': 'Tip', 'MESSAGE_LIST_TIME_TIP': 'Tip',
+                              'MESSAGE_REMINDER_SET_TIP': 'Tip {0}'},
+                             mock.create_autospec(logging.Logger),
+                             self.user_service, self.slack_gateway, self.project_service,
+                             mock.create_autospec(ReminderService))
+
+    def tearDown(self):
+        self.session.close()
+        for cache in (user_identity_cache, project_catalogue_cache, im_channel_cache):
+            cache.clear()
+
+    def seed(self, *entities):
+        seed_session = Session(bind=self.engine)
+        seed_session.add_all(entities)
+        seed_session.commit()
+        seed_session.close()
+
+    def run_counted(self, handle):
+        with QueryCounter(self.engine) as counter:
+            result = handle()
+        self.assertFalse([s for s in counter.statements if 'JOIN users' in s and 'FROM time_entries' in s])
+        return counter.statements, result
+
+    def test_list_should_load_entries_with_projects_in_single_query(self):
+        # arrange
+        handler = ListCommandHandler(*self.handler_args)
+
+        # act
+        statements, message = self.run_counted(
+            lambda: handler._get_by_user_and_time_range({'user_id': 'U1'}, None, TimeRanges.today.value))
+
+        # assert
+        self.assertEqual({'Nisse', 'Other', 'Total'}, {a.title for a in message.attachments if a.title})
+        # user, time entries joined with projects
+        self.assertEqual(2, len(statements))
+
+    def test_delete_time_should_not_load_relationships(self):
+        # arrange
+        handler = DeleteTimeCommandHandler(*self.handler_args)
+
+        # act
+        select_statements, _ = self.run_counted(lambda: handler.select_project({'user_id': 'U1'}, [], None))
+        list_statements, _ = self.run_counted(lambda: handler.handle(mock.Mock(
+            user=mock.Mock(id='U1'), actions={'projects_list': mock.Mock(selected_options=[mock.Mock(value='1')])})))
+        delete_statements, _ = self.run_counted(lambda: handler.handle(mock.Mock(
+            user=mock.Mock(id='U1'), actions={'time_entries_list': mock.Mock(selected_options=[mock.Mock(value=1)])})))
+
+        # assert
+        # user, projects, user projects, last time entry
+        self.assertEqual(4, len(select_statements))
+        # last ten time entries
+        self.assertEqual(1, len(list_statements))
+        # time entry, delete
+        self.assertEqual(2, len(delete_statements))
+
+    def test_submit_time_should_not_query_projects(self):
+        # arrange
+        handler = SubmitTimeCommandHandler(*self.handler_args,
+                                           TimeEntryService(self.session, BusinessCalendarService(self.session)))
+        self.project_service.get_catalogue()
+        time_record = TimeRecordDto(day=date.today().isoformat(), hours=1, minutes=30, comment='Review', project='2',
+                                    user_id='U1')
+
+        # act
+        dialog_statements, _ = self.run_counted(lambda: handler.create_dialog({'user_id': 'U1'}, None, None))
+        submit_statements, _ = self.run_counted(lambda: handler.save_submitted_time_task(time_record))
+
+        # assert
+        # user, last time entry
+        self.assertEqual(2, len(dialog_statements))
+        # user lock, daily sum, insert, im channel
+        self.assertEqual(4, len(submit_statements))
+        self.assertFalse([s for s in dialog_statements + submit_statements if 'FROM projects' in s])
+
+    def test_submit_time_range_should_insert_all_days_at_once(self):
+        # arrange
+        handler = SubmitTimeCommandHandler(*self.handler_args,
+                                           TimeEntryService(self.session, BusinessCalendarService(self.session)))
+        self.project_service.get_catalogue()
+        time_record = TimeRecordDto(day='2018-04-23', day_to='2018-05-06', hours=8, minutes=0, comment='Migration',
+                                    project='1', user_id='U1')
+
+        # act
+        statements, _ = self.run_counted(lambda: handler.save_submitted_time_task(time_record))
+
+        # assert
+        # user, vacations, days off of the year, user lock, daily sums, insert, im channel
+        self.assertEqual(7, len(statements))
+        self.assertEqual(1, len([s for s in statements if s.startswith('INSERT')]))
+        self.assertEqual(8, self.session.query(TimeEntry).filter(TimeEntry.comment == 'Migration').count())
+        attachment = self.slack_gateway.api_call.call_args[1]['attachments'][0]
+        self.assertEqual('Submitted 8:00 hour(s) for 8 day(s) from 2018-04-23 to 2018-05-04 in Nisse :clap:',
+                         attachment['title'])
+
+    def test_report_dialog_should_not_query_projects(self):
+        # arrange
+        handler = ReportCommandHandler(*self.handler_args, mock.Mock(), mock.Mock())
+        self.project_service.get_catalogue()
+        action = mock.Mock(selected_options=[])
+        action.name = 'U1'
+
+        # act
+        statements, dialog = self.run_counted(lambda: handler.create_dialog({}, None, action))
+
+        # assert
+        self.assertEqual(['Nisse', 'Other'], [o.label for o in dialog.elements[2].options])
+        # user, all users for admin
+        self.assertEqual(2, len(statements))
+
+    def test_vacation_delete_should_load_vacations_in_single_query(self):
+        # arrange
+        handler = VacationCommandHandler(*self.handler_args, VacationService(self.session), mock.Mock())
+        self.seed(*[Vacation(user_id=1, start_date=date(2018, 1, day), end_date=date(2018, 1, day))
+                    for day in range(1, 13)])
+
+        # act
+        statements, message = self.run_counted(
+            lambda: handler.select_vacation_to_remove({'user_id': 'U1'}, ['delete'], None))
+
+        # assert
+        self.assertEqual(10, len(message['attachments'][0]['actions'][0]['options']))
+        # user, ten newest vacations
+        self.assertEqual(2, len(statements))
+
+    def test_reminder_show_should_not_query_time_entries(self):
+        # arrange
+        handler = ReminderCommandHandler(*self.handler_args[:5],
+                                         ReminderService(self.user_service, mock.Mock(), 'Europe/Warsaw'))
+
+        # act
+        statements, message = self.run_counted(
+            lambda: handler.reminder_show({'user_id': 'U1', 'command': '/ni'}, [], None))
+
+        # assert
+        self.assertEqual(8, len(message['attachments']))
+        # user
+        self.assertEqual(1, len(statements))
+
+    def test_reminder_set_should_not_query_time_entries(self):
+        # arrange
+        handler = ReminderCommandHandler(*self.handler_args[:5],
+                                         ReminderService(self.user_service, mock.Mock(), 'Europe/Warsaw'))
+
+        # act
+        statements, _ = self.run_counted(
+            lambda: handler.reminder_set({'user_id': 'U1', 'text': 'reminder set mon:10:00'}, ['set'], None))
+
+        # assert
+        # user, user by email, update, schedules delete and insert
+        self.assertEqual(5, len(statements))
+        self.assertFalse([s for s in statements if 'time_entries' in s])
+
+    def test_project_assign_should_not_query_time_entries(self):
+        # arrange
+        handler = ProjectCommandHandler(*self.handler_args)
+        self.project_service.get_catalogue()
+
+        # act
+        statements, message = self.run_counted(
+            lambda: handler.dispatch_project_command({'user_id': 'U1'}, ['assign'], None))
+
+        # assert
+        self.assertEqual(['Nisse', 'Other'], [o['text'] for o in message['attachments'][0]['actions'][0]['options']])
+        # user with role, last time entry
+        self.assertEqual(2, len(statements))
+
+    def test_help_should_query_only_user_with_role(self):
+        # arrange
+        handler = ShowHelpCommandHandler(*self.handler_args)
+
+        # act
+        statements, message = self.run_counted(
+            lambda: handler.create_help_command_message({'user_id': 'U1', 'command': '/ni'}, [], None))
+
+        # assert
+        self.assertIn('*/ni project*: Create new project', [a['text'] for a in message['attachments']])
+        # user with role
+        self.assertEqual(1, len(statements))
+
+    def test_food_debt_should_not_query_time_entries(self):
+        # arrange
+        handler = FoodCommandHandler(*self.handler_args, FoodOrderService(mock.Mock(session=self.session)))
+
+        # act
+        statements, _ = self.run_counted(
+            lambda: handler.show_debt({'user_id': 'U1', 'channel_name': 'food'}, [], None))
+
+        # assert
+        attachments = self.slack_gateway.api_call.call_args[1]['attachments']
+        self.assertEqual(['You have no debts. Good for you :raised_hands:'], [a['text'] for a in attachments])
+        # user, debts owed, debts owing
+        self.assertEqual(3, len(statements))
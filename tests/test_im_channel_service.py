@@ -0,0 +1,59 @@
+import logging
+import unittest
+
+import mock
+
+from nisse.services.im_channel_service import ImChannelService, im_channel_cache
+
+
+class ImChannelServiceTests(unittest.TestCase):
+
+    @mock.patch('nisse.services.UserService')
+    @mock.patch('nisse.services.SlackGateway')
+    def setUp(self, mock_user_service, mock_slack_client):
+        self.mock_user_service = mock_user_service
+        self.mock_slack_client = mock_slack_client
+        self.mock_user_service.get_im_channel_id.return_value = None
+        im_channel_cache.clear()
+        self.service = ImChannelService(mock_user_service, mock_slack_client, mock.create_autospec(logging.Logger))
+
+    def test_api_call_should_open_channel_once(self):
+        # arrange
+        self.mock_slack_client.api_call.side_effect = lambda method, **kwargs: \
+            {"ok": True, "channel": {"id": "D1"}} if method == "im.open" else {"ok": True}
+
+        # act
+        self.service.api_call("chat.postMessage", "U1", text="first")
+        self.service.api_call("chat.postMessage", "U1", text="second")
+
+        # assert
+        methods = [c[0][0] for c in self.mock_slack_client.api_call.call_args_list]
+        self.assertEqual(methods, ["im.open", "chat.postMessage", "chat.postMessage"])
+        self.mock_user_service.set_im_channel_id.assert_called_once_with("U1", "D1")
+
+    def test_api_call_should_use_stored_channel_without_opening(self):
+        # arrange
+        self.mock_user_service.get_im_channel_id.return_value = "D2"
+        self.mock_slack_client.api_call.return_value = {"ok": True}
+
+        # act
+        self.service.api_call("files.upload", "U1", channel_arg="channels", file=b"")
+
+        # assert
+        self.mock_slack_client.api_call.assert_called_once_with("files.upload", channels="D2", file=b"")
+
+    def test_api_call_should_reopen_channel_when_not_found(self):
+        # arrange
+        im_channel_cache.put("U1", "D_OLD")
+        responses = iter([{"ok": False, "error": "channel_not_found"},
+                          {"ok": True, "channel": {"id": "D_NEW"}},
+                          {"ok": True}])
+        self.mock_slack_client.api_call.side_effect = lambda method, **kwargs: next(responses)
+
+        # act
+        resp = self.service.api_call("chat.postMessage", "U1", text="text")
+
+        # assert
+        self.assertTrue(resp["ok"])
+        self.assertEqual(im_channel_cache.get("U1"), "D_NEW")
+        self.mock_user_service.set_im_channel_id.assert_has_calls([mock.call("U1", None), mock.call("U1", "D_NEW")])
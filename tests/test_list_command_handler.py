@@ -34,7 +34,7 @@ class TestVacationCommanHandler(TestCase):
 
     @mock.patch('nisse.services.ProjectService')
     @mock.patch('nisse.services.UserService')
-    @mock.patch('slackclient.SlackClient')
+    @mock.patch('nisse.services.SlackGateway')
     @mock.patch('flask.config.Config')
     def setUp(self, mock_project_service, mock_user_service, mock_slack_client, config_mock):
         self.mock_user_service = mock_user_service
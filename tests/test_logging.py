@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+
+from cmreslogging.handlers import CMRESHandler
+
+from nisse.utils.logging import BoundedQueueHandler, start_log_shipping
+from nisse.utils.metrics import metrics_registry
+
+
+class SlowElasticsearchServer(object):
+    """ Local HTTP server accepting bulk requests like Elasticsearch, answers after delay
+    """
+    def __init__(self, delay: float):
+        self.documents = []
+        self.bulk_requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                time.sleep(delay)
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                lines = [json.loads(line) for line in body.splitlines() if line]
+                sources = lines[1::2]
+                server.bulk_requests += 1
+                server.documents.extend(sources)
+                data = json.dumps({'took': 1, 'errors': False,
+                                   'items': [{'index': {'status': 201}} for _ in sources]}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_port
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LogShippingTests(unittest.TestCase):
+
+    def setUp(self):
+        metrics_registry.clear()
+        self.logger = logging.Logger('log-shipping-test')
+
+    def tearDown(self):
+        metrics_registry.clear()
+
+    def test_logging_should_not_wait_for_slow_elasticsearch(self):
+        # arrange
+        server = SlowElasticsearchServer(delay=0.5)
+        target = CMRESHandler(hosts=[{'host': '127.0.0.1', 'port': server.port}],
+                              auth_type=CMRESHandler.AuthType.NO_AUTH, es_index_name='logs-test',
+                              buffer_size=50, flush_frequency_in_sec=0.1)
+        handler = start_log_shipping(target, queue_size=1000)
+        self.logger.addHandler(handler)
+
+        # act
+        started = time.monotonic()
+        for i in range(200):
+            self.logger.info('record %d', i, extra={'sql_count': i})
+        logging_seconds = time.monotonic() - started
+        handler.stop()
+        server.stop()
+
+        # assert
+        self.assertLess(logging_seconds, 0.25)
+        self.assertEqual(200, len(server.documents))
+        self.assertLessEqual(server.bulk_requests, 5)
+        self.assertEqual('record 7', server.documents[7]['msg'])
+        self.assertEqual(7, server.documents[7]['sql_count'])
+        self.assertEqual(0, handler.dropped)
+
+    def test_enqueue_should_drop_records_when_queue_is_full(self):
+        # arrange
+        handler = BoundedQueueHandler(Queue(maxsize=5))
+        self.logger.addHandler(handler)
+
+        # act
+        for i in range(8):
+            self.logger.warning('record %d', i)
+
+        # assert
+        self.assertEqual(5, handler.queue.qsize())
+        self.assertEqual(3, handler.dropped)
+        self.assertEqual(3, metrics_registry.get('nisse_log_records_dropped_total'))
+
+    def test_enqueue_should_spill_records_to_file_when_queue_is_full(self):
+        # arrange
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        spill_path = os.path.join(directory.name, 'spill.jsonl')
+        handler = BoundedQueueHandler(Queue(maxsize=5), spill_path)
+        self.logger.addHandler(handler)
+
+        # act
+        for i in range(8):
+            self.logger.warning('record %d', i, extra={'action': 'list'})
+
+        # assert
+        with open(spill_path) as spill_file:
+            spilled = [json.loads(line) for line in spill_file]
+        self.assertEqual(['record 5', 'record 6', 'record 7'], [r['msg'] for r in spilled])
+        self.assertEqual('list', spilled[0]['action'])
+        self.assertEqual(3, handler.spilled)
+        self.assertEqual(0, handler.dropped)
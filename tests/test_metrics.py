@@ -0,0 +1,99 @@
+import unittest
+
+from flask import Flask
+from sqlalchemy import create_engine
+
+from nisse.utils.metrics import MetricsRegistry, metrics_registry, init_request_metrics, instrument_engine, \
+    metrics_endpoint, set_action, record_slack_call
+
+
+class MetricsRegistryTests(unittest.TestCase):
+
+    def test_render_should_return_prometheus_text_format(self):
+        # arrange
+        registry = MetricsRegistry()
+        registry.inc('nisse_queries_total', 'Queries', 2, action='list')
+        registry.inc('nisse_queries_total', 'Queries', 3, action='list')
+        registry.observe('nisse_request_seconds', 'Request time', 0.5, action='say "hi"')
+
+        # act
+        text = registry.render()
+
+        # assert
+        self.assertEqual('# HELP nisse_queries_total Queries\n'
+                         '# TYPE nisse_queries_total counter\n'
+                         'nisse_queries_total{action="list"} 5.0\n'
+                         '# HELP nisse_request_seconds Request time\n'
+                         '# TYPE nisse_request_seconds summary\n'
+                         'nisse_request_seconds_count{action="say \\"hi\\""} 1.0\n'
+                         'nisse_request_seconds_sum{action="say \\"hi\\""} 0.5\n', text)
+
+
+class RequestMetricsTests(unittest.TestCase):
+
+    def setUp(self):
+        metrics_registry.clear()
+        self.engine = create_engine('sqlite://')
+        instrument_engine(self.engine)
+
+        self.app = Flask(__name__)
+        self.app.config['METRICS_TOKEN'] = 'secret'
+        init_request_metrics(self.app)
+        self.app.add_url_rule('/metrics', 'metrics', metrics_endpoint(self.app))
+
+        @self.app.route('/slack/command', methods=['POST'])
+        def command():
+            set_action('list')
+            for _ in range(3):
+                self.engine.execute('SELECT 1')
+            record_slack_call('users.info', 0.25, False)
+            return 'ok'
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        metrics_registry.clear()
+
+    def test_request_should_count_queries_and_slack_calls_per_action(self):
+        # act
+        with self.assertLogs(self.app.logger, 'INFO') as logs:
+            self.client.post('/slack/command')
+        self.engine.execute('SELECT 1')
+
+        # assert
+        labels = dict(endpoint='command', action='list')
+        self.assertEqual(1, metrics_registry.get('nisse_request_seconds', '_count', **labels))
+        self.assertEqual(3, metrics_registry.get('nisse_request_sql_queries_total', **labels))
+        self.assertEqual(1, metrics_registry.get('nisse_request_slack_calls_total', **labels))
+        self.assertEqual(0.25, metrics_registry.get('nisse_request_slack_seconds_total', **labels))
+        self.assertEqual(1, metrics_registry.get('nisse_slack_api_call_seconds', '_count', method='users.info'))
+
+        record = logs.records[0]
+        self.assertEqual(('list', 3, 1, 200), (record.action, record.sql_count, record.slack_count, record.status))
+
+    def test_metrics_should_serve_registry_only_with_token(self):
+        # arrange
+        self.client.post('/slack/command')
+
+        # act
+        allowed = self.client.get('/metrics', headers={'Authorization': 'Bearer secret'},
+                                  environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        forbidden = self.client.get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+
+        # assert
+        self.assertEqual(200, allowed.status_code)
+        self.assertTrue(allowed.content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('nisse_request_sql_queries_total{action="list",endpoint="command"} 3.0',
+                      allowed.get_data(as_text=True))
+        self.assertEqual(403, forbidden.status_code)
+        self.assertEqual(403, self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code)
+
+    def test_metrics_should_be_disabled_without_token(self):
+        # arrange
+        self.app.config['METRICS_TOKEN'] = ''
+
+        # act
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer '})
+
+        # assert
+        self.assertEqual(404, response.status_code)
@@ -2,6 +2,7 @@ from nisse.services import ProjectApiService, _get_workday_date_n_days_ago
 from werkzeug.exceptions import BadRequest
 from nisse.models.database import Project, User, UserProject
 from datetime import datetime
+from decimal import Decimal
 import unittest
 import mock
 
@@ -17,8 +18,12 @@ class ProjectApiServiceTests(unittest.TestCase):
         self.mock_project_service.get_project_by_id.return_value = None
         self.mock_user_service.get_user_by_id.return_value = None
 
+        self.mock_business_calendar_service = mock.MagicMock()
+        self.mock_time_entry_service = mock.MagicMock()
+
         self.api_service = ProjectApiService(
-            mock_project_service, mock_user_service)
+            mock_project_service, mock_user_service, self.mock_business_calendar_service,
+            self.mock_time_entry_service)
 
     def test_get_project_by_id_should_raise_badrequest_due_to_no_project(self):
         # Arrange
@@ -161,22 +166,23 @@ class ProjectApiServiceTests(unittest.TestCase):
         self.assertEqual(prev_week_friday, result)
 
         
-    @mock.patch('nisse.models.database.Project')
-    @mock.patch('nisse.models.database.User')
-    @mock.patch('nisse.models.database.UserProject')
-    def test_report_user_time_should_raise_badrequest_dueto_too_much_time_reported(self, mock_project, mock_user, mock_user_project):
+    def test_report_user_time_should_raise_badrequest_dueto_too_much_time_reported(self):
         # Arrange
-        mock_user.user_time_entries.filter().sum.return_value = 8*60
-        mock_user_project.user = mock_user
-        mock_project.project_users.filter().first.return_value = mock_user_project
-        self.mock_project_service.get_project_by_id.return_value = mock_project
+        self.mock_project_service.get_project_by_id.return_value = Project(project_id=1)
+        self.mock_user_service.get_user_by_id.return_value = User(user_id=1)
+        self.mock_business_calendar_service.get_workday_n_days_ago.return_value = datetime(2018, 6, 1).date()
+        self.mock_time_entry_service.add_time_entry.return_value = None
+        self.mock_time_entry_service.sum_duration.return_value = Decimal(8)
         seconds_reported = 60*30
 
-        expectedMsg = 'Could not perfom time report due to exceeded maximum limit of reported time amount. Reported time: 0:30:00. ' +\
+        expectedMsg = 'Could not perfom time report due to exceeded maximum limit of reported time. Reported time: 0:30:00. ' +\
                       'Currently reported total time: 8:00:00. '+\
-                      'Maximum time amount to report: 8:00:00, limit exceeded by: 00:30:00.'
+                      'Maximum time amount to report: 8:00:00, limit exceeded by: 0:30:00.'
 
         # Act & Assert
-        with self.assertRaises(BadRequest, msg = expectedMsg):
+        with self.assertRaises(BadRequest) as context:
             self.api_service.report_user_time(1, 1, seconds_reported, datetime.now(), 'comment')
+        self.assertEqual(expectedMsg, context.exception.description)
+        self.mock_time_entry_service.add_time_entry.assert_called_once_with(1, 1, 0.5, 'comment',
+                                                                            datetime.now().date(), 8)
 
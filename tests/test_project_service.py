@@ -0,0 +1,129 @@
+import unittest
+
+import mock
+
+from nisse.models.database import Project, User, UserProject
+from nisse.services.project_service import ProjectService, project_catalogue_cache
+from tests.db_helper import create_test_session, QueryCounter
+
+
+class ProjectServiceCatalogueTests(unittest.TestCase):
+
+    def setUp(self):
+        project_catalogue_cache.clear()
+        self.session = create_test_session()
+        self.service = ProjectService(mock.Mock(session=self.session))
+
+        self.user = User(username='john@example.com', slack_user_id='U1', role_id=2)
+        self.nisse = Project(name='Nisse')
+        self.other = Project(name='Other')
+        self.session.add_all([self.user, self.nisse, self.other])
+        self.session.commit()
+        self.service.assign_user_to_project(self.nisse, self.user)
+
+    def tearDown(self):
+        project_catalogue_cache.clear()
+        self.session.close()
+
+    def test_catalogue_should_be_loaded_once(self):
+        user_id, nisse_id, other_id = self.user.user_id, self.nisse.project_id, self.other.project_id
+
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            for _ in range(10):
+                projects = self.service.get_cached_projects()
+                user_projects = self.service.get_cached_projects_by_user(user_id)
+                selected_project = self.service.get_cached_project(str(other_id))
+                assigned = self.service.is_user_assigned(user_id, nisse_id)
+
+        # assert
+        self.assertEqual(2, counter.count)
+        self.assertEqual(['Nisse', 'Other'], [p.name for p in projects])
+        self.assertEqual(['Nisse'], [p.name for p in user_projects])
+        self.assertEqual('Other', selected_project.name)
+        self.assertTrue(assigned)
+        self.assertIsNone(self.service.get_cached_project('unknown'))
+
+    def test_catalogue_should_be_invalidated_when_projects_change(self):
+        # arrange
+        self.service.get_cached_projects()
+
+        # act
+        self.service.assign_user_to_project(self.other, self.user)
+        assigned = self.service.get_cached_projects_by_user(self.user.user_id)
+        self.other.name = 'Renamed'
+        self.service.update_project(self.other)
+        renamed = self.service.get_cached_project(self.other.project_id)
+        created = self.service.create_project('New')
+        created_entry = self.service.get_cached_project(created.project_id)
+        self.service.unassign_user_from_project(self.nisse, self.user)
+        unassigned = self.service.get_cached_projects_by_user(self.user.user_id)
+
+        # assert
+        self.assertEqual(['Nisse', 'Other'], [p.name for p in assigned])
+        self.assertEqual('Renamed', renamed.name)
+        self.assertEqual('New', created_entry.name)
+        self.assertEqual(['Renamed'], [p.name for p in unassigned])
+
+    def test_catalogue_should_be_reloaded_after_ttl(self):
+        # arrange
+        now = [0.0]
+        self.service.clock = lambda: now[0]
+        self.service.get_cached_projects()
+        self.session.add(Project(name='Added elsewhere'))
+        self.session.commit()
+
+        # act
+        cached = self.service.get_cached_projects()
+        now[0] = 10 * 60
+        reloaded = self.service.get_cached_projects()
+
+        # assert
+        self.assertEqual(2, len(cached))
+        self.assertEqual(3, len(reloaded))
+
+    def test_user_assigned_by_other_process_should_be_read_from_db(self):
+        # arrange
+        self.service.get_cached_projects()
+        other_user = User(username='jane@example.com', slack_user_id='U2', role_id=2)
+        self.session.add(other_user)
+        self.session.commit()
+        self.session.add(UserProject(user_id=other_user.user_id, project_id=self.other.project_id))
+        self.session.commit()
+
+        # act
+        assigned = self.service.is_user_assigned(other_user.user_id, self.other.project_id)
+        not_assigned = self.service.is_user_assigned(other_user.user_id, self.nisse.project_id)
+        user_projects = self.service.get_cached_projects_by_user(other_user.user_id)
+
+        # assert
+        self.assertTrue(assigned)
+        self.assertFalse(not_assigned)
+        self.assertEqual(['Other'], [p.name for p in user_projects])
+
+    def test_assigning_user_twice_should_be_no_op(self):
+        # act
+        self.service.assign_user_to_project(self.nisse, self.user)
+
+        # assert
+        self.assertEqual(1, self.session.query(UserProject).count())
+        self.assertEqual(['Nisse'], [p.name for p in self.service.get_cached_projects_by_user(self.user.user_id)])
+
+    def test_user_without_projects_should_be_cached(self):
+        # arrange
+        other_user = User(username='jane@example.com', slack_user_id='U2', role_id=2)
+        self.session.add(other_user)
+        self.session.commit()
+        other_user_id, nisse_id = other_user.user_id, self.nisse.project_id
+        self.service.get_cached_projects()
+
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            for _ in range(5):
+                user_projects = self.service.get_cached_projects_by_user(other_user_id)
+                assigned = self.service.is_user_assigned(other_user_id, nisse_id)
+
+        # assert
+        self.assertEqual([], user_projects)
+        self.assertFalse(assigned)
+        self.assertEqual(1, counter.count)
@@ -0,0 +1,196 @@
+import logging
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask_bcrypt import Bcrypt
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.orm import sessionmaker
+
+from nisse.models.database import User, TimeEntry, Vacation, Project, ReminderSchedule, ReminderDelivery
+from nisse.services.business_calendar_service import BusinessCalendarService, business_calendar_cache
+from nisse.services.reminder_delivery_service import ReminderDeliveryService
+from nisse.services.reminder_job import get_dates_to_remind, get_users_to_notify
+from nisse.services.user_service import UserService
+from nisse.services.vacation_service import VacationService
+from tests.db_helper import create_test_session, QueryCounter
+
+# Monday - Friday, 2018-06-04 is Monday
+WEEK_START = date(2018, 6, 4)
+WEEK_END = date(2018, 6, 8)
+
+
+class ReminderJobTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.session.add(Project(project_id=1, name='Project'))
+        self.user_service = UserService(self.session, Bcrypt())
+        self.vacation_service = VacationService(self.session)
+
+    def tearDown(self):
+        self.session.close()
+
+    def add_users(self, count):
+        users = [User(user_id=i, username='user{0}@mail.com'.format(i), slack_user_id='U{0}'.format(i))
+                 for i in range(1, count + 1)]
+        self.session.add_all(users)
+        for user in users:
+            # every user reported Monday and has vacation on Tuesday
+            self.session.add(TimeEntry(user_id=user.user_id, project_id=1, duration=Decimal(8), comment='',
+                                       report_date=WEEK_START))
+            self.session.add(Vacation(user_id=user.user_id, start_date=date(2018, 6, 5), end_date=date(2018, 6, 5)))
+        self.session.commit()
+        return self.session.query(User).order_by(User.user_id).all()
+
+    def count_queries(self, users):
+        with QueryCounter(self.session.get_bind()) as counter:
+            get_dates_to_remind(self.user_service, self.vacation_service, users, WEEK_START, WEEK_END)
+        return counter.count
+
+    def test_get_dates_to_remind_should_skip_reported_days_and_vacations(self):
+        # arrange
+        users = self.add_users(2)
+        self.session.add(TimeEntry(user_id=2, project_id=1, duration=Decimal(8), comment='',
+                                   report_date=date(2018, 6, 6)))
+        self.session.add(Vacation(user_id=2, start_date=date(2018, 6, 1), end_date=date(2018, 6, 30)))
+        self.session.commit()
+
+        # act
+        result = get_dates_to_remind(self.user_service, self.vacation_service, users, WEEK_START, WEEK_END)
+
+        # assert
+        self.assertEqual(result, [[users[0], [date(2018, 6, 6), date(2018, 6, 7), date(2018, 6, 8)]]])
+
+    def test_get_dates_to_remind_should_skip_company_days_off(self):
+        # arrange
+        users = self.add_users(1)
+        business_calendar_cache.clear()
+        business_calendar = BusinessCalendarService(self.session)
+        business_calendar.add_day_off(date(2018, 6, 8), 'Company trip')
+
+        # act
+        result = get_dates_to_remind(self.user_service, self.vacation_service, users, WEEK_START, WEEK_END,
+                                     business_calendar)
+
+        # assert
+        self.assertEqual(result, [[users[0], [date(2018, 6, 6), date(2018, 6, 7)]]])
+        business_calendar_cache.clear()
+
+    def test_get_dates_to_remind_should_run_constant_number_of_queries(self):
+        # arrange
+        all_users = self.add_users(200)
+
+        # act
+        few_users_queries = self.count_queries(all_users[:5])
+        many_users_queries = self.count_queries(all_users)
+
+        # assert
+        self.assertEqual(few_users_queries, 2)
+        self.assertEqual(few_users_queries, many_users_queries)
+
+    def test_get_dates_to_remind_should_not_query_without_users(self):
+        self.assertEqual(self.count_queries([]), 0)
+
+    def get_users_to_notify(self, find_users):
+        session_maker = sessionmaker(bind=self.session.get_bind())
+        return get_users_to_notify(logging.getLogger(), session_maker, WEEK_END, WEEK_END, find_users)
+
+    def test_get_users_to_notify_should_return_user_once_a_day(self):
+        # arrange
+        self.add_users(2)
+        find_users = lambda user_service: user_service.get_users_by_ids([1, 2])
+
+        # act
+        first_run = self.get_users_to_notify(find_users)
+        overlapping_run = self.get_users_to_notify(find_users)
+
+        # assert
+        self.assertEqual([1, 2], [user.user_id for (user, dates) in first_run])
+        self.assertEqual([], overlapping_run)
+        self.assertEqual(2, self.session.query(ReminderDelivery).filter(ReminderDelivery.remind_date == WEEK_END)
+                         .count())
+
+    def test_claim_should_skip_users_claimed_by_other_run(self):
+        # arrange
+        self.add_users(3)
+        delivery_service = ReminderDeliveryService(self.session)
+        delivery_service.claim([1, 2], WEEK_END)
+
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            claimed = delivery_service.claim([1, 2, 3], WEEK_END)
+
+        # assert
+        self.assertEqual({3}, claimed)
+        self.assertEqual({1, 2}, delivery_service.claim([1, 2], date(2018, 6, 11)))
+        # one batched insert and one select, besides transaction handling
+        self.assertEqual(2, len([s for s in counter.statements if s.startswith(('INSERT', 'SELECT'))]))
+
+    def test_create_insert_should_skip_claimed_rows_on_each_database(self):
+        # act
+        postgresql_insert = str(ReminderDeliveryService.create_insert('postgresql').compile(
+            dialect=postgresql.dialect()))
+        mysql_insert = str(ReminderDeliveryService.create_insert('mysql').compile(dialect=mysql.dialect()))
+
+        # assert
+        self.assertTrue(postgresql_insert.endswith('ON CONFLICT DO NOTHING'))
+        self.assertTrue(mysql_insert.startswith('INSERT IGNORE INTO reminder_deliveries'))
+
+    def test_claim_should_take_over_expired_claims_not_sent(self):
+        # arrange
+        self.add_users(2)
+        delivery_service = ReminderDeliveryService(self.session)
+        delivery_service.claim([1, 2], WEEK_END)
+        delivery_service.mark_sent([1], WEEK_END)
+        self.session.query(ReminderDelivery) \
+            .update({ReminderDelivery.created_at: datetime.utcnow() - timedelta(hours=1)}, synchronize_session=False)
+        self.session.commit()
+
+        # act
+        claimed = delivery_service.claim([1, 2], WEEK_END)
+
+        # assert
+        self.assertEqual({2}, claimed)
+
+    def test_get_users_to_notify_should_remind_working_days_before_friday_day_off(self):
+        # arrange
+        self.add_users(1)
+        business_calendar_cache.clear()
+        BusinessCalendarService(self.session).add_day_off(WEEK_END, 'Company trip')
+        session_maker = sessionmaker(bind=self.session.get_bind())
+
+        # act
+        users = get_users_to_notify(logging.getLogger(), session_maker, WEEK_START, WEEK_END,
+                                    lambda user_service: user_service.get_users_by_ids([1]))
+
+        # assert
+        self.assertEqual([[1, [date(2018, 6, 6), date(2018, 6, 7)]]], [[user.user_id, dates] for user, dates in users])
+        business_calendar_cache.clear()
+
+    def test_release_should_let_next_run_remind_again(self):
+        # arrange
+        self.add_users(2)
+        delivery_service = ReminderDeliveryService(self.session)
+        delivery_service.claim([1, 2], WEEK_END)
+
+        # act
+        delivery_service.release([2], WEEK_END)
+
+        # assert
+        self.assertEqual({2}, delivery_service.claim([1, 2], WEEK_END))
+
+    def test_get_users_to_notify_last_period_should_skip_reminded_users(self):
+        # arrange
+        self.add_users(3)
+        for user_id in range(1, 4):
+            self.session.add(ReminderSchedule(weekday=WEEK_END.weekday(), utc_minute=600, user_id=user_id))
+        self.session.commit()
+        ReminderDeliveryService(self.session).claim([2], WEEK_END)
+
+        # act
+        users = self.user_service.get_users_to_notify_last_period(
+            15, datetime.combine(WEEK_END, datetime.min.time()).replace(hour=10, minute=10), not_reminded_on=WEEK_END)
+
+        # assert
+        self.assertEqual([1, 3], sorted(user.user_id for user in users))
@@ -0,0 +1,84 @@
+import logging
+import unittest
+from datetime import datetime
+
+import mock
+from flask_bcrypt import Bcrypt
+from sqlalchemy.orm import sessionmaker
+
+from nisse.models.database import User, ReminderSchedule
+from nisse.services.reminder_scheduler import ReminderScheduler, get_next_due
+from nisse.services.user_service import UserService
+from tests.db_helper import create_test_session
+
+# 2018-06-04 is Monday
+MONDAY = datetime(2018, 6, 4)
+
+
+class ReminderSchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.now = MONDAY.replace(hour=10)
+        self.scheduler = ReminderScheduler({'REMINDER_CATCH_UP_MINUTES': 30}, logging.getLogger(),
+                                           sessionmaker(bind=self.session.get_bind()), mock.MagicMock(),
+                                           clock=lambda: self.now)
+        self.sent = []
+        patcher = mock.patch('nisse.services.reminder_scheduler.send_reminders', side_effect=self.send_reminders)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.session.close()
+
+    def send_reminders(self, logger, config, slack_client, session_maker, remind_date, find_users):
+        users = find_users(UserService(self.session, Bcrypt()))
+        self.sent.append((remind_date, sorted(user.user_id for user in users)))
+
+    def add_schedule(self, user_id, weekday, hour, minute):
+        if not self.session.query(User).get(user_id):
+            self.session.add(User(user_id=user_id, username='user{0}@mail.com'.format(user_id)))
+        self.session.add(ReminderSchedule(weekday=weekday, utc_minute=hour * 60 + minute, user_id=user_id))
+        self.session.commit()
+
+    def tick(self, hour, minute, second=0):
+        self.now = MONDAY.replace(hour=hour, minute=minute, second=second)
+        return self.scheduler.tick()
+
+    def test_get_next_due_should_return_next_matching_minute(self):
+        self.assertEqual(datetime(2018, 6, 4, 10, 1), get_next_due(MONDAY.replace(hour=10), 0, 601))
+        self.assertEqual(datetime(2018, 6, 11, 10, 0), get_next_due(MONDAY.replace(hour=10), 0, 600))
+        self.assertEqual(datetime(2018, 6, 10, 0, 5), get_next_due(MONDAY.replace(hour=10), 6, 5))
+
+    def test_tick_should_send_reminders_in_due_minute_once(self):
+        self.add_schedule(1, 0, 10, 2)
+        self.add_schedule(2, 0, 10, 2)
+        self.add_schedule(3, 0, 10, 3)
+        self.add_schedule(4, 1, 10, 2)
+        self.scheduler.load_schedules(self.now)
+
+        self.assertEqual([], self.tick(10, 1, 59))
+        self.assertEqual([1, 2], self.tick(10, 2, 1))
+        self.assertEqual([], self.tick(10, 2, 30))
+        self.assertEqual([3], self.tick(10, 3))
+        self.assertEqual([(MONDAY.date(), [1, 2]), (MONDAY.date(), [3])], self.sent)
+
+    def test_tick_should_catch_up_missed_reminders(self):
+        self.add_schedule(1, 0, 9, 45)
+        self.add_schedule(2, 0, 9, 0)
+        self.scheduler.load_schedules(self.now.replace(hour=9, minute=30))
+
+        self.assertEqual([1], self.tick(10, 0))
+        self.assertEqual([], self.tick(10, 1))
+
+    def test_reload_should_pick_up_new_schedules_without_sending_twice(self):
+        self.add_schedule(1, 0, 10, 1)
+        self.scheduler.load_schedules(self.now)
+        self.assertEqual([1], self.tick(10, 1))
+
+        self.add_schedule(2, 0, 10, 2)
+        self.tick(10, 3)
+        self.scheduler.reload()
+
+        self.assertEqual([2], self.tick(10, 4))
+        self.assertEqual([], self.tick(10, 5))
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+
+from nisse.models.DTO import PrintParametersDto
+from nisse.services.report_file_cache import ReportFileCache
+
+
+class ReportFileCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.now = time.time()
+        self.cache = ReportFileCache(os.path.join(self.directory.name, 'cache'), max_bytes=25, max_age_seconds=60,
+                                     clock=lambda: self.now)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def put(self, key, content: bytes, modified_at=None):
+        path = os.path.join(self.directory.name, key + '.tmp')
+        with open(path, 'wb') as report_file:
+            report_file.write(content)
+        if modified_at is not None:
+            os.utime(path, (modified_at, modified_at))
+        self.cache.put(key, path)
+        self.assertFalse(os.path.exists(path))
+
+    def read(self, key):
+        report_file = self.cache.open(key)
+        if report_file is None:
+            return None
+        with report_file:
+            return report_file.read()
+
+    @staticmethod
+    def print_parameters(date_from, project_id=None):
+        print_param = PrintParametersDto()
+        print_param.date_from = date_from
+        print_param.date_to = '2018-05-31'
+        print_param.project_id = project_id
+        return print_param
+
+    def test_open_should_return_stored_report(self):
+        self.put('a', b'report')
+
+        self.assertEqual(b'report', self.read('a'))
+        self.assertIsNone(self.read('b'))
+
+    def test_key_should_depend_on_parameters_and_data_version(self):
+        key = ReportFileCache.key(self.print_parameters('2018-05-01'), (10, 99))
+
+        self.assertEqual(key, ReportFileCache.key(self.print_parameters('2018-05-01'), (10, 99)))
+        self.assertNotEqual(key, ReportFileCache.key(self.print_parameters('2018-05-02'), (10, 99)))
+        self.assertNotEqual(key, ReportFileCache.key(self.print_parameters('2018-05-01', 1), (10, 99)))
+        self.assertNotEqual(key, ReportFileCache.key(self.print_parameters('2018-05-01'), (11, 100)))
+
+    def test_open_should_remove_expired_report(self):
+        self.put('a', b'report', modified_at=self.now - 61)
+
+        self.assertIsNone(self.read('a'))
+        self.assertFalse(os.path.exists(self.cache.path('a')))
+
+    def test_put_should_evict_least_recently_used_reports_over_size_limit(self):
+        self.put('a', b'0123456789', modified_at=self.now - 30)
+        self.put('b', b'0123456789', modified_at=self.now - 20)
+        os.utime(self.cache.path('a'), (self.now - 10, self.now - 10))
+
+        self.put('c', b'0123456789')
+
+        self.assertEqual(b'0123456789', self.read('a'))
+        self.assertIsNone(self.read('b'))
+        self.assertEqual(b'0123456789', self.read('c'))
@@ -0,0 +1,197 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from nisse.models.database import Project, ReportJob, TimeEntry, User
+from nisse.services.report_file_cache import ReportFileCache
+from nisse.services.report_job_queue import ReportJobQueue
+from nisse.services.report_job_service import ReportJobService, REPORT_JOB_QUEUED, REPORT_JOB_RUNNING, \
+    REPORT_JOB_DONE, REPORT_JOB_FAILED
+from tests.db_helper import create_test_session
+
+
+def expire_lease(session, report_job_id: int):
+    session.query(ReportJob).filter(ReportJob.report_job_id == report_job_id) \
+        .update({ReportJob.heartbeat_at: datetime.utcnow() - timedelta(minutes=10)}, synchronize_session=False)
+    session.commit()
+
+
+class ReportJobServiceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.service = ReportJobService(SimpleNamespace(session=self.session))
+
+    def tearDown(self):
+        self.session.close()
+
+    def create_job(self):
+        return self.service.create_job('U1', None, None, date(2018, 5, 1), date(2018, 5, 31))
+
+    def test_start_job_should_claim_job_only_once(self):
+        job = self.create_job()
+
+        started = self.service.start_job(job.report_job_id)
+
+        self.assertEqual(REPORT_JOB_RUNNING, started.status)
+        self.assertEqual(1, started.attempts)
+        self.assertIsNone(self.service.start_job(job.report_job_id))
+
+    def test_requeue_interrupted_jobs_should_queue_running_jobs_with_expired_lease(self):
+        interrupted = self.create_job()
+        self.service.start_job(interrupted.report_job_id, 'host:1')
+        expire_lease(self.session, interrupted.report_job_id)
+        running = self.create_job()
+        self.service.start_job(running.report_job_id, 'host:2')
+        queued = self.create_job()
+
+        job_ids = self.service.requeue_interrupted_jobs(max_attempts=3, lease_seconds=60)
+
+        self.assertEqual([interrupted.report_job_id], job_ids)
+        self.assertEqual(REPORT_JOB_QUEUED, self.service.get_job(interrupted.report_job_id).status)
+        self.assertEqual(REPORT_JOB_RUNNING, self.service.get_job(running.report_job_id).status)
+        self.assertEqual([interrupted.report_job_id, queued.report_job_id], self.service.get_queued_job_ids())
+
+    def test_requeue_interrupted_jobs_should_keep_jobs_with_renewed_lease(self):
+        job = self.create_job()
+        self.service.start_job(job.report_job_id, 'host:1')
+        expire_lease(self.session, job.report_job_id)
+
+        self.service.renew_leases('host:1')
+
+        self.assertEqual([], self.service.requeue_interrupted_jobs(max_attempts=3, lease_seconds=60))
+        self.assertEqual(REPORT_JOB_RUNNING, self.service.get_job(job.report_job_id).status)
+
+    def test_requeue_interrupted_jobs_should_fail_jobs_exceeding_attempts(self):
+        job = self.create_job()
+        for attempt in range(3):
+            self.service.start_job(job.report_job_id, 'host:1')
+            expire_lease(self.session, job.report_job_id)
+            self.service.requeue_interrupted_jobs(max_attempts=3, lease_seconds=60)
+
+        self.assertEqual(REPORT_JOB_FAILED, self.service.get_job(job.report_job_id).status)
+        self.assertEqual([], self.service.get_queued_job_ids())
+
+    def test_get_print_parameters_should_format_dates(self):
+        job = self.service.create_job('U1', 2, 3, date(2018, 5, 1), date(2018, 5, 31))
+
+        print_param = ReportJobService.get_print_parameters(job)
+
+        self.assertEqual((2, 3, '2018-05-01', '2018-05-31'),
+                         (print_param.user_id, print_param.project_id, print_param.date_from, print_param.date_to))
+
+
+class ReportJobQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.db = SimpleNamespace(session=self.session)
+        self.slack_client = mock.MagicMock()
+        self.slack_client.api_call.return_value = {'ok': True, 'channel': {'id': 'D1'}}
+        self.directory = tempfile.TemporaryDirectory()
+        app = mock.MagicMock(instance_path=self.directory.name,
+                             config={'REPORT_PATH': '', 'REPORT_XLSX_WRITE_ONLY_MIN_ENTRIES': 5000})
+        self.queue = ReportJobQueue(app, self.db, self.slack_client, mock.MagicMock(), 1, 3,
+                                    ReportFileCache(os.path.join(self.directory.name, 'cache'), 1024 * 1024, 60))
+        self.job = ReportJobService(self.db).create_job('U1', None, None, date(2018, 5, 1), date(2018, 5, 31))
+
+    def tearDown(self):
+        self.queue.stop()
+        self.session.close()
+        self.directory.cleanup()
+
+    def test_start_should_recover_jobs_once_when_queue_is_created(self):
+        with mock.patch.object(self.queue, 'executor') as executor, \
+                mock.patch.object(self.queue, 'heartbeat') as heartbeat:
+            self.queue.start()
+            self.queue.submit(self.job.report_job_id)
+            self.queue.submit(self.job.report_job_id)
+
+        recoveries = [c for c in executor.submit.call_args_list if c[0][1] == self.queue.recover]
+        self.assertEqual(1, len(recoveries))
+        heartbeat.start.assert_called_once()
+
+    def test_recover_should_resume_only_jobs_without_live_owner(self):
+        job_service = ReportJobService(self.db)
+        job_service.start_job(self.job.report_job_id, 'other-host:1')
+        interrupted = job_service.create_job('U1', None, None, date(2018, 5, 1), date(2018, 5, 31))
+        job_service.start_job(interrupted.report_job_id, 'crashed-host:1')
+        expire_lease(self.session, interrupted.report_job_id)
+
+        with mock.patch.object(self.queue, 'executor') as executor:
+            self.queue.recover()
+
+        self.assertEqual([(self.queue.run, self.queue.process, interrupted.report_job_id)],
+                         [c[0] for c in executor.submit.call_args_list])
+        self.assertEqual(REPORT_JOB_RUNNING, self.job.status)
+
+    def test_renew_leases_should_poll_jobs_left_queued(self):
+        waiting = ReportJobService(self.db).create_job('U1', None, None, date(2018, 5, 1), date(2018, 5, 31))
+
+        with mock.patch.object(self.queue, 'executor') as executor:
+            self.queue.submit(waiting.report_job_id)
+            self.queue.renew_leases()
+            self.queue.renew_leases()
+
+        self.assertEqual([(self.queue.run, self.queue.process, waiting.report_job_id),
+                          (self.queue.run, self.queue.process, self.job.report_job_id)],
+                         [c[0] for c in executor.submit.call_args_list])
+
+    def test_renew_leases_should_keep_own_jobs_running(self):
+        job_service = ReportJobService(self.db)
+        job_service.start_job(self.job.report_job_id, self.queue.owner)
+        expire_lease(self.session, self.job.report_job_id)
+
+        with mock.patch.object(self.queue, 'executor') as executor:
+            self.queue.renew_leases()
+
+        executor.submit.assert_not_called()
+        self.assertEqual(REPORT_JOB_RUNNING, job_service.get_job(self.job.report_job_id).status)
+
+    def test_process_should_finish_job(self):
+        with mock.patch.object(ReportJobQueue, 'generate_report') as generate_report:
+            self.queue.process(self.job.report_job_id)
+
+        generate_report.assert_called_once()
+        self.assertEqual(REPORT_JOB_DONE, self.job.status)
+
+    def test_process_should_fail_job_and_notify_user(self):
+        with mock.patch.object(ReportJobQueue, 'generate_report', side_effect=RuntimeError('upload failed')):
+            self.queue.process(self.job.report_job_id)
+
+        self.assertEqual(REPORT_JOB_FAILED, self.job.status)
+        self.assertEqual('upload failed', self.job.error)
+        self.assertEqual('chat.postMessage', self.slack_client.api_call.call_args[0][0])
+
+    def test_process_should_skip_job_already_taken(self):
+        ReportJobService(self.db).start_job(self.job.report_job_id)
+
+        with mock.patch.object(ReportJobQueue, 'generate_report') as generate_report:
+            self.queue.process(self.job.report_job_id)
+
+        generate_report.assert_not_called()
+
+    def test_generate_report_should_reuse_report_while_data_is_unchanged(self):
+        self.session.add(Project(project_id=1, name='Project'))
+        self.session.add(User(user_id=1, username='user@mail.com', first_name='User', last_name='One'))
+        self.session.add(TimeEntry(user_id=1, project_id=1, duration=1, comment='', report_date=date(2018, 5, 2)))
+        self.session.commit()
+        uploads = []
+        im_channel_service = mock.MagicMock()
+        im_channel_service.api_call.side_effect = lambda *args, **kwargs: uploads.append(kwargs['file'].read()) or \
+            {'ok': True}
+
+        with mock.patch.object(ReportJobQueue, 'save_report', wraps=self.queue.save_report) as save_report:
+            self.queue.generate_report(self.job, im_channel_service)
+            self.queue.generate_report(self.job, im_channel_service)
+            self.session.add(TimeEntry(user_id=1, project_id=1, duration=2, comment='', report_date=date(2018, 5, 3)))
+            self.session.commit()
+            self.queue.generate_report(self.job, im_channel_service)
+
+        self.assertEqual(2, save_report.call_count)
+        self.assertEqual(uploads[0], uploads[1])
+        self.assertTrue(uploads[0].startswith(b'PK'))
+        self.assertEqual(['cache'], os.listdir(self.directory.name))
@@ -0,0 +1,107 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from nisse.models.DTO import PrintParametersDto
+from nisse.models.database import User, Project, TimeEntry
+from nisse.services.report_renderer import CsvReportRenderer, JsonLinesReportRenderer, XlsxReportRenderer, \
+    REPORT_COLUMNS
+from nisse.services.report_service import ReportService
+from tests.db_helper import create_test_session
+
+
+def seed(session, users_count, days, date_from=date(2018, 1, 1)):
+    session.add(Project(project_id=1, name='Project'))
+    session.add_all([User(user_id=u, username='user{0}@mail.com'.format(u), first_name='User', last_name=str(u))
+                     for u in range(1, users_count + 1)])
+    session.bulk_insert_mappings(TimeEntry, [
+        dict(user_id=u, project_id=1, duration=Decimal('1.5'), comment='Entry {0}'.format(d),
+             report_date=date_from + timedelta(days=d))
+        for u in range(1, users_count + 1) for d in range(days)])
+    session.commit()
+
+
+def print_parameters(date_from='2018-01-01', date_to='2018-12-31'):
+    print_param = PrintParametersDto()
+    print_param.date_from = date_from
+    print_param.date_to = date_to
+    return print_param
+
+
+class ReportRendererTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.report_service = ReportService(SimpleNamespace(session=self.session))
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'report')
+        seed(self.session, users_count=2, days=3)
+
+    def tearDown(self):
+        self.session.close()
+        self.directory.cleanup()
+
+    def test_csv_renderer_should_write_entries_ordered_by_user_and_date(self):
+        CsvReportRenderer().render(self.report_service, print_parameters('2018-01-02', '2018-01-03'), self.file_path)
+
+        with open(self.file_path, newline='', encoding='utf-8') as report_file:
+            rows = list(csv.reader(report_file))
+
+        self.assertEqual(REPORT_COLUMNS, rows[0])
+        self.assertEqual([['2018-01-02', 'User 1', 'user1@mail.com', 'Project', '1.5', 'Entry 1'],
+                          ['2018-01-03', 'User 1', 'user1@mail.com', 'Project', '1.5', 'Entry 2'],
+                          ['2018-01-02', 'User 2', 'user2@mail.com', 'Project', '1.5', 'Entry 1'],
+                          ['2018-01-03', 'User 2', 'user2@mail.com', 'Project', '1.5', 'Entry 2']], rows[1:])
+
+    def test_json_lines_renderer_should_write_object_per_entry(self):
+        print_param = print_parameters('2018-01-01', '2018-01-01')
+        print_param.user_id = 2
+
+        JsonLinesReportRenderer().render(self.report_service, print_param, self.file_path)
+
+        with open(self.file_path, encoding='utf-8') as report_file:
+            rows = [json.loads(line) for line in report_file]
+        self.assertEqual([{'date': '2018-01-01', 'user': 'User 2', 'email': 'user2@mail.com', 'project': 'Project',
+                           'duration': 1.5, 'comment': 'Entry 0'}], rows)
+
+
+class ReportRendererBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def render(self, renderer, users_count, trace_memory=False):
+        session = create_test_session()
+        seed(session, users_count, days=365)
+        file_path = os.path.join(self.directory.name, 'report')
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        renderer.render(ReportService(SimpleNamespace(session=session)), print_parameters(), file_path)
+        elapsed = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        session.close()
+        return elapsed, peak
+
+    def test_csv_renderer_should_be_faster_than_xlsx_and_use_constant_memory(self):
+        xlsx_time, _ = self.render(XlsxReportRenderer(write_only_min_entries=5000), users_count=20)
+        csv_time, _ = self.render(CsvReportRenderer(), users_count=20)
+        _, csv_peak = self.render(CsvReportRenderer(), users_count=20, trace_memory=True)
+        _, csv_large_peak = self.render(CsvReportRenderer(), users_count=80, trace_memory=True)
+
+        self.assertLess(csv_time * 10, xlsx_time)
+        self.assertLess(csv_large_peak, csv_peak * 1.5)
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from nisse.models.DTO import PrintParametersDto
+from nisse.models.database import User, Project, TimeEntry, Vacation, CompanyDayOff
+from nisse.services.business_calendar_service import business_calendar_cache
+from nisse.services.report_service import ReportService
+from nisse.services.xlsx_document_service import XlsxDocumentService
+from tests.db_helper import create_test_session, QueryCounter
+
+
+class ReportServiceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.service = ReportService(SimpleNamespace(session=self.session))
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.session.close()
+        self.directory.cleanup()
+
+    def seed(self, users_count, projects_count):
+        projects = [Project(project_id=p, name='Project {0}'.format(p)) for p in range(1, projects_count + 1)]
+        users = [User(user_id=u, username='user{0}@mail.com'.format(u), first_name='User', last_name=str(u))
+                 for u in range(1, users_count + 1)]
+        self.session.add_all(projects + users)
+        for user in users:
+            self.session.add(Vacation(user_id=user.user_id, start_date=date(2018, 5, 10), end_date=date(2018, 5, 11)))
+            for n, project in enumerate(projects):
+                self.session.add(TimeEntry(user_id=user.user_id, project_id=project.project_id, comment='',
+                                           duration=Decimal(1), report_date=date(2018, 5, 1) + timedelta(days=n)))
+        self.session.commit()
+        self.session.expunge_all()
+
+    def generate_report(self):
+        print_parameters = PrintParametersDto()
+        print_parameters.date_from = '2018-05-01'
+        print_parameters.date_to = '2018-05-31'
+
+        business_calendar_cache.clear()
+        with QueryCounter(self.session.get_bind()) as counter:
+            report_data = self.service.load_report_data(print_parameters)
+            XlsxDocumentService().save_report(os.path.join(self.directory.name, 'report.xlsx'),
+                                              print_parameters.date_from, print_parameters.date_to, report_data)
+        return report_data, counter.count
+
+    def test_load_report_data_should_load_users_and_vacations(self):
+        # arrange
+        self.seed(2, 3)
+        print_parameters = PrintParametersDto()
+        print_parameters.date_from = '2018-05-01'
+
+        # act
+        report_data = self.service.load_report_data(print_parameters)
+
+        # assert
+        self.assertEqual(sorted(report_data.users.keys()), [1, 2])
+        self.assertEqual([v.start_date for v in report_data.vacations[2]], [date(2018, 5, 10)])
+        self.assertEqual([(te.user_id, te.report_date, te.project) for te in report_data.time_entries],
+                         [(1, date(2018, 5, 1), 'Project 1'), (1, date(2018, 5, 2), 'Project 2'),
+                          (1, date(2018, 5, 3), 'Project 3'), (2, date(2018, 5, 1), 'Project 1'),
+                          (2, date(2018, 5, 2), 'Project 2'), (2, date(2018, 5, 3), 'Project 3')])
+
+    def test_data_version_should_change_with_company_days_off_within_report_dates(self):
+        # arrange
+        self.seed(1, 1)
+        print_parameters = PrintParametersDto()
+        print_parameters.date_from = '2018-05-01'
+        print_parameters.date_to = '2018-05-31'
+        version = self.service.get_data_version(print_parameters)
+
+        # act
+        self.session.add(CompanyDayOff(day=date(2018, 6, 1), source='manual'))
+        self.session.commit()
+        outside_version = self.service.get_data_version(print_parameters)
+        self.session.add(CompanyDayOff(day=date(2018, 5, 2), source='manual'))
+        self.session.commit()
+        added_version = self.service.get_data_version(print_parameters)
+
+        # assert
+        self.assertEqual(version, outside_version)
+        self.assertNotEqual(version, added_version)
+
+    def test_data_version_should_change_with_names_and_comments_shown_in_report(self):
+        # arrange
+        self.seed(1, 1)
+        print_parameters = PrintParametersDto()
+        print_parameters.date_from = '2018-05-01'
+        print_parameters.date_to = '2018-05-31'
+        versions = [self.service.get_data_version(print_parameters)]
+
+        # act
+        for change in [lambda: self.session.query(Project).update({Project.name: 'Renamed'}),
+                       lambda: self.session.query(User).update({User.last_name: 'Renamed'}),
+                       lambda: self.session.query(User).update({User.username: 'renamed@mail.com'}),
+                       lambda: self.session.query(TimeEntry).update({TimeEntry.comment: 'Edited'})]:
+            change()
+            self.session.commit()
+            versions.append(self.service.get_data_version(print_parameters))
+
+        # assert
+        self.assertEqual(len(versions), len(set(versions)))
+
+    def test_load_report_data_should_order_time_entries_by_user_name(self):
+        # arrange
+        self.session.add_all([Project(project_id=1, name='Project'),
+                              User(user_id=1, username='zoe@mail.com', first_name='Zoe', last_name='Adams'),
+                              User(user_id=2, username='adam@mail.com', first_name='Adam', last_name='Smith')])
+        self.session.add_all([TimeEntry(user_id=user_id, project_id=1, comment='', duration=Decimal(1),
+                                        report_date=date(2018, 5, day)) for day in (2, 1) for user_id in (1, 2)])
+        self.session.commit()
+
+        # act
+        report_data = self.service.load_report_data(PrintParametersDto())
+
+        # assert
+        self.assertEqual([(te.user_id, te.report_date.day) for te in report_data.time_entries],
+                         [(2, 1), (2, 2), (1, 1), (1, 2)])
+
+    def test_report_generation_should_run_constant_number_of_queries(self):
+        # arrange
+        self.seed(2, 2)
+        _, small_report_queries = self.generate_report()
+        self.session.query(TimeEntry).delete()
+        self.session.query(Vacation).delete()
+        self.session.query(User).delete()
+        self.session.query(Project).delete()
+        self.seed(25, 10)
+
+        # act
+        _, large_report_queries = self.generate_report()
+
+        # assert
+        self.assertEqual(small_report_queries, 4)
+        self.assertEqual(small_report_queries, large_report_queries)
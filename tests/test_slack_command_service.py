@@ -6,11 +6,15 @@ from decimal import Decimal
 
 import mock
 from flask.config import Config
+from marshmallow import ValidationError
 
 from nisse.models.DTO import TimeRecordDto
 from nisse.models.database import Project, User, TimeEntry
 from nisse.routes.slack.command_handlers.submit_time_command_handler import SubmitTimeCommandHandler
+from nisse.services.im_channel_service import im_channel_cache
+from nisse.services.project_service import ProjectEntry
 from nisse.services.reminder_service import ReminderService
+from nisse.services.time_entry_service import TimeEntryService
 from nisse.utils.date_helper import TimeRanges, get_start_end_date
 
 
@@ -29,6 +33,7 @@ def get_mocked_time_entry():
     mock_time_entry.comment = "comment"
     mock_time_entry.duration = Decimal('8.0')
     mock_time_entry.project = Project(name='TestPr', project_id=1)
+    mock_time_entry.project_id = 1
     return mock_time_entry
 
 
@@ -36,7 +41,7 @@ class SlackCommandServiceTests(unittest.TestCase):
 
     @mock.patch('nisse.services.ProjectService')
     @mock.patch('nisse.services.UserService')
-    @mock.patch('slackclient.SlackClient')
+    @mock.patch('nisse.services.SlackGateway')
     @mock.patch('flask.config.Config')
     def setUp(self, mock_project_service, mock_user_service, mock_slack_client, config_mock):
         self.mock_user_service = mock_user_service
@@ -44,17 +49,23 @@ class SlackCommandServiceTests(unittest.TestCase):
         self.mock_slack_client = mock_slack_client
         self.config_mock = config_mock
 
-        self.mock_project_service.get_projects.return_value = [Project(name='TestPr', project_id=1),
-                                                               Project(name='TestPr2', project_id=2)]
+        projects = {1: ProjectEntry(1, 'TestPr'), 2: ProjectEntry(2, 'TestPr2')}
+        self.mock_project_service.get_cached_projects.return_value = list(projects.values())
+        self.mock_project_service.get_cached_project.side_effect = lambda project_id: projects.get(int(project_id))
+        self.mock_project_service.is_user_assigned.return_value = True
         self.mock_project_service.get_project_by_id.return_value = None
         self.mock_user_service.get_user_by_id.return_value = None
+        self.mock_user_service.get_im_channel_id.return_value = None
+        self.mock_time_entry_service = mock.create_autospec(TimeEntryService)
+        im_channel_cache.clear()
 
         self.handler = SubmitTimeCommandHandler(mock.create_autospec(Config),
                                                 mock.create_autospec(logging.Logger),
                                                 mock_user_service,
                                                 mock_slack_client,
                                                 mock_project_service,
-                                                mock.create_autospec(ReminderService))
+                                                mock.create_autospec(ReminderService),
+                                                self.mock_time_entry_service)
 
     def test_submit_time_dialog_for_new_user_should_call_slack_api_and_return(self):
         # arrange
@@ -82,8 +93,8 @@ class SlackCommandServiceTests(unittest.TestCase):
         action = mock.MagicMock()
         action.value.return_value = '2019-01-16'
 
-        self.mock_project_service.get_projects.return_value = [Project(), Project()]
-        self.mock_project_service.get_projects_by_user.return_value = [Project(), Project()]
+        self.mock_project_service.get_cached_projects.return_value = [Project(), Project()]
+        self.mock_project_service.get_cached_projects_by_user.return_value = [Project(), Project()]
 
         # act
         self.handler.show_dialog(command_body, None, action)
@@ -122,8 +133,8 @@ class SlackCommandServiceTests(unittest.TestCase):
         action = mock.MagicMock()
         action.value.return_value = '2019-01-16'
 
-        self.mock_project_service.get_projects.return_value = [Project(), Project()]
-        self.mock_project_service.get_projects_by_user.return_value = [Project(), Project()]
+        self.mock_project_service.get_cached_projects.return_value = [Project(), Project()]
+        self.mock_project_service.get_cached_projects_by_user.return_value = [Project(), Project()]
 
         # act
         self.handler.show_dialog(command_body, None, action)
@@ -131,7 +142,7 @@ class SlackCommandServiceTests(unittest.TestCase):
         # assert
         self.assertEqual(self.mock_slack_client.api_call.call_count, 1)        
         # check selected project for dialog
-        self.assertEqual(int(self.dialog["elements"][0]["value"]), users_last_time_entry.project.project_id)
+        self.assertEqual(int(self.dialog["elements"][0]["value"]), users_last_time_entry.project_id)
 
     def test_save_submitted_time_should_add_user_if_not_exist(self):
         # arrange
@@ -160,6 +171,7 @@ class SlackCommandServiceTests(unittest.TestCase):
         self.mock_slack_client.api_call.side_effect = slack_client_api_call_side_effect
         self.mock_user_service.get_user_by_email.return_value = None
         self.mock_project_service.assign_user_to_project.return_value = None
+        self.mock_project_service.is_user_assigned.return_value = False
         mock_user = get_mocked_user()
         mock_user.projects = []
         self.mock_user_service.add_user.return_value = mock_user
@@ -210,7 +222,7 @@ class SlackCommandServiceTests(unittest.TestCase):
 
         self.mock_slack_client.api_call.side_effect = slack_client_api_call_side_effect
         self.mock_user_service.get_user_by_email.return_value = get_mocked_user()
-        self.mock_user_service.get_user_time_entries.return_value = [get_mocked_time_entry(), get_mocked_time_entry()]
+        self.mock_time_entry_service.add_time_entry.return_value = None
 
         time_record = TimeRecordDto(
             day="2018-05-15",
@@ -229,6 +241,17 @@ class SlackCommandServiceTests(unittest.TestCase):
         self.assertEqual(len(sent_chat_msgs), 1)
         self.assertEqual(sent_chat_msgs[0], "Sorry, but You can't submit more than 24 hours for one day.")
     
+    def test_validate_date_range_should_refuse_reversed_and_too_long_range(self):
+        # act & assert
+        with self.assertRaises(ValidationError) as reversed_range:
+            self.handler.validate_date_range(datetime(2018, 5, 14).date(), datetime(2018, 5, 11).date())
+        with self.assertRaises(ValidationError) as too_long_range:
+            self.handler.validate_date_range(datetime(2018, 5, 1).date(), datetime(2018, 6, 1).date())
+        self.handler.validate_date_range(datetime(2018, 5, 1).date(), datetime(2018, 5, 31).date())
+
+        self.assertEqual(['day_to'], reversed_range.exception.field_names)
+        self.assertEqual(['day_to'], too_long_range.exception.field_names)
+
     def test_get_start_end_date_should_return_correct_start_end_date(self):
         # arrange
         date = datetime(2018, 5, 14).date()
@@ -0,0 +1,61 @@
+import logging
+import unittest
+
+import mock
+
+from nisse.services.slack_delivery_service import SlackDeliveryService, DirectMessage
+from nisse.services.slack_gateway import SlackGateway
+from tests.fake_slack_server import FakeSlackServer
+
+
+def get_messages(count):
+    return [DirectMessage(i, 'U{0}'.format(i), 'text', []) for i in range(count)]
+
+
+class SlackDeliveryServiceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSlackServer().start()
+        logger = mock.create_autospec(logging.Logger)
+        self.gateway = SlackGateway('xoxb-token', logger, base_url=self.server.url,
+                                    rates_per_minute={'im.open': 6000, 'chat.postMessage': 6000},
+                                    max_retries=2, backoff_seconds=0.01)
+        self.service = SlackDeliveryService(self.gateway, logger, workers=4)
+
+    def tearDown(self):
+        self.gateway.close()
+        self.server.stop()
+
+    def test_deliver_should_send_message_to_every_user(self):
+        # act
+        report = self.service.deliver(get_messages(20))
+
+        # assert
+        self.assertEqual(len(report.succeeded), 20)
+        self.assertEqual(len(self.server.calls_of('chat.postMessage')), 20)
+        self.assertEqual(sorted(c['channel'] for c in self.server.calls_of('chat.postMessage')),
+                         sorted('DU{0}'.format(i) for i in range(20)))
+
+    def test_deliver_should_retry_after_rate_limit(self):
+        # arrange
+        self.server.rate_limit('chat.postMessage', 0.1)
+
+        # act
+        report = self.service.deliver(get_messages(1))
+
+        # assert
+        self.assertEqual(len(report.succeeded), 1)
+        self.assertEqual(len(self.server.calls_of('chat.postMessage')), 2)
+
+    def test_deliver_should_report_failure_when_retries_exhausted(self):
+        # arrange
+        for _ in range(3):
+            self.server.rate_limit('chat.postMessage', 0)
+        self.server.queue('im.open', {'ok': False, 'error': 'user_not_found'})
+
+        # act
+        report = self.service.deliver(get_messages(2))
+
+        # assert
+        self.assertEqual(sorted(r.error for r in report.failed), ['ratelimited', 'user_not_found'])
+        self.assertEqual(len(report.succeeded), 0)
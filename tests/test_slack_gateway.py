@@ -0,0 +1,152 @@
+import asyncio
+import io
+import logging
+import unittest
+
+import mock
+
+from nisse.services.slack_gateway import SlackGateway
+from tests.fake_slack_server import FakeSlackServer
+
+
+class SlackGatewayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSlackServer().start()
+        self.gateway = SlackGateway('xoxb-token', mock.create_autospec(logging.Logger), base_url=self.server.url,
+                                    rates_per_minute={'chat.postMessage': 6000}, default_rate_per_minute=6000,
+                                    max_retries=2, backoff_seconds=0.01)
+
+    def tearDown(self):
+        self.gateway.close()
+        self.server.stop()
+
+    def test_api_call_should_return_response_with_headers(self):
+        # act
+        resp = self.gateway.api_call('im.open', user='U1')
+
+        # assert
+        self.assertTrue(resp['ok'])
+        self.assertEqual('DU1', resp['channel']['id'])
+        self.assertEqual('application/json', resp['headers']['Content-Type'])
+        self.assertEqual('Bearer xoxb-token', self.server.calls_of('im.open')[0]['Authorization'])
+
+    def test_api_call_should_encode_arguments_like_slack_client(self):
+        # act
+        self.gateway.api_call('chat.postMessage', channel='D1', attachments=[{'text': 'a'}], as_user=True)
+        self.gateway.api_call('conversations.open', users=['U1', 'U2'])
+
+        # assert
+        self.assertEqual('[{"text": "a"}]', self.server.calls_of('chat.postMessage')[0]['attachments'])
+        self.assertEqual('True', self.server.calls_of('chat.postMessage')[0]['as_user'])
+        self.assertEqual('U1,U2', self.server.calls_of('conversations.open')[0]['users'])
+
+    def test_api_call_should_reuse_connections(self):
+        # act
+        for _ in range(10):
+            self.gateway.api_call('chat.postMessage', channel='D1', text='text')
+
+        # assert
+        self.assertEqual(10, len(self.server.calls_of('chat.postMessage')))
+        self.assertEqual(1, self.server.connections)
+
+    def test_api_call_should_retry_after_rate_limit(self):
+        # arrange
+        self.server.rate_limit('chat.postMessage', 0.1)
+
+        # act
+        resp = self.gateway.api_call('chat.postMessage', channel='D1', text='text')
+
+        # assert
+        self.assertTrue(resp['ok'])
+        self.assertEqual(2, len(self.server.calls_of('chat.postMessage')))
+
+    def test_api_call_should_wait_retry_after_when_rate_limited_without_json_body(self):
+        # arrange
+        sleep = mock.Mock()
+        self.gateway.sleep = sleep
+        self.server.queue('chat.postMessage', 'Too Many Requests', 429, {'Retry-After': '0.2'})
+
+        # act
+        resp = self.gateway.api_call('chat.postMessage', channel='D1', text='text')
+
+        # assert
+        self.assertTrue(resp['ok'])
+        sleep.assert_called_once_with(0.2)
+
+    def test_api_call_should_retry_server_errors(self):
+        # arrange
+        self.server.queue('chat.postMessage', {}, status=503)
+
+        # act
+        resp = self.gateway.api_call('chat.postMessage', channel='D1', text='text')
+
+        # assert
+        self.assertTrue(resp['ok'])
+        self.assertEqual(2, len(self.server.calls_of('chat.postMessage')))
+
+    def test_api_call_should_upload_whole_file_again_when_retried(self):
+        # arrange
+        self.server.queue('files.upload', {}, status=503)
+
+        # act
+        resp = self.gateway.api_call('files.upload', channels='D1', file=io.BytesIO(b'report content'))
+
+        # assert
+        self.assertTrue(resp['ok'])
+        self.assertEqual([True, True], ['report content' in c['body'] for c in self.server.calls_of('files.upload')])
+
+    def test_api_call_should_return_error_when_retries_exhausted(self):
+        # arrange
+        for _ in range(3):
+            self.server.rate_limit('chat.postMessage', 0)
+
+        # act
+        resp = self.gateway.api_call('chat.postMessage', channel='D1', text='text')
+
+        # assert
+        self.assertEqual('ratelimited', resp['error'])
+        self.assertEqual(3, len(self.server.calls_of('chat.postMessage')))
+
+    def test_api_call_should_not_retry_other_errors(self):
+        # arrange
+        self.server.queue('users.info', {'ok': False, 'error': 'user_not_found'})
+
+        # act
+        resp = self.gateway.api_call('users.info', user='U1')
+
+        # assert
+        self.assertEqual('user_not_found', resp['error'])
+        self.assertEqual(1, len(self.server.calls_of('users.info')))
+
+    def test_get_metrics_should_count_calls_per_method(self):
+        # arrange
+        self.server.rate_limit('chat.postMessage', 0)
+
+        # act
+        self.gateway.api_call('chat.postMessage', channel='D1', text='text')
+        self.gateway.api_call('im.open', user='U1')
+        metrics = self.gateway.get_metrics()
+
+        # assert
+        self.assertEqual(2, metrics['chat.postMessage']['calls'])
+        self.assertEqual(1, metrics['chat.postMessage']['errors'])
+        self.assertEqual(1, metrics['chat.postMessage']['retries'])
+        self.assertEqual(1, metrics['im.open']['calls'])
+        self.assertGreater(metrics['im.open']['max_seconds'], 0)
+
+    def test_api_call_async_should_run_calls_concurrently(self):
+        # arrange
+        async def post_all():
+            return await asyncio.gather(*[self.gateway.api_call_async('im.open', user='U{0}'.format(i))
+                                          for i in range(5)])
+
+        # act
+        responses = asyncio.get_event_loop().run_until_complete(post_all())
+
+        # assert
+        self.assertEqual(['DU{0}'.format(i) for i in range(5)], [r['channel']['id'] for r in responses])
+
+    def test_get_retry_after_should_read_header_case_insensitive(self):
+        self.assertEqual(SlackGateway.get_retry_after({'headers': {'retry-after': '3'}}, 1), 3)
+        self.assertEqual(SlackGateway.get_retry_after({'ok': False}, 1), 1)
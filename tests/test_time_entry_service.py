@@ -0,0 +1,97 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from nisse.models.database import User, Project, TimeEntry, Vacation
+from nisse.services.business_calendar_service import BusinessCalendarService
+from nisse.services.time_entry_service import TimeEntryService
+from tests.db_helper import create_test_session, QueryCounter
+
+
+class TimeEntryServiceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.service = TimeEntryService(self.session, BusinessCalendarService(self.session))
+        self.session.add_all([User(user_id=1, username='john@mail.com'), User(user_id=2, username='jane@mail.com'),
+                              Project(project_id=1, name='Nisse')])
+        self.session.add_all([TimeEntry(user_id=1, project_id=1, duration=Decimal(6), report_date=date(2018, 6, 4)),
+                              TimeEntry(user_id=1, project_id=1, duration=Decimal('1.5'), report_date=date(2018, 6, 4)),
+                              TimeEntry(user_id=1, project_id=1, duration=Decimal(8), report_date=date(2018, 6, 5)),
+                              TimeEntry(user_id=2, project_id=1, duration=Decimal(8), report_date=date(2018, 6, 4))])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_sum_duration_should_sum_hours_of_user_day_in_single_query(self):
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            reported = self.service.sum_duration(1, date(2018, 6, 4))
+            not_reported = self.service.sum_duration(1, date(2018, 6, 6))
+
+        # assert
+        self.assertEqual(Decimal('7.5'), reported)
+        self.assertEqual(Decimal(0), not_reported)
+        self.assertEqual(2, counter.count)
+        self.assertIn('sum(time_entries.duration)', counter.statements[0])
+
+    def test_add_time_entry_should_add_entry_within_limit(self):
+        # act
+        time_entry = self.service.add_time_entry(1, 1, 0.5, 'Review', date(2018, 6, 4), 8)
+
+        # assert
+        self.assertEqual(('Review', Decimal(8)), (time_entry.comment, self.service.sum_duration(1, date(2018, 6, 4))))
+
+    def test_add_time_entry_should_refuse_entry_exceeding_limit(self):
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            time_entry = self.service.add_time_entry(1, 1, 0.75, 'Review', date(2018, 6, 4), 8)
+
+        # assert
+        self.assertIsNone(time_entry)
+        self.assertEqual(Decimal('7.5'), self.service.sum_duration(1, date(2018, 6, 4)))
+        self.assertEqual(2, counter.count)
+        self.assertIn('FROM users', counter.statements[0])
+
+    def test_add_time_entry_exceeding_limit_should_keep_pending_changes(self):
+        # arrange
+        self.session.add(Vacation(user_id=1, start_date=date(2018, 6, 11), end_date=date(2018, 6, 12)))
+
+        # act
+        time_entry = self.service.add_time_entry(1, 1, 0.75, 'Review', date(2018, 6, 4), 8)
+        self.session.rollback()
+
+        # assert
+        self.assertIsNone(time_entry)
+        self.assertEqual(1, self.session.query(Vacation).count())
+
+    def test_get_days_to_report_should_skip_weekends_holidays_and_vacations(self):
+        # arrange
+        self.session.add(Vacation(user_id=1, start_date=date(2018, 4, 26), end_date=date(2018, 4, 27)))
+        self.session.commit()
+
+        # act
+        days = self.service.get_days_to_report(1, date(2018, 4, 23), date(2018, 5, 6))
+
+        # assert
+        self.assertEqual([date(2018, 4, 23), date(2018, 4, 24), date(2018, 4, 25), date(2018, 4, 30),
+                          date(2018, 5, 2), date(2018, 5, 4)], days)
+
+    def test_add_time_entries_should_insert_days_within_limit_in_single_statement(self):
+        # arrange
+        days = [date(2018, 6, 4), date(2018, 6, 5), date(2018, 6, 6), date(2018, 6, 7)]
+
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            result = self.service.add_time_entries(1, 1, 0.75, 'Workshop', days, 8)
+
+        # assert
+        self.assertEqual([date(2018, 6, 6), date(2018, 6, 7)], result.added_days)
+        self.assertEqual([date(2018, 6, 4), date(2018, 6, 5)], result.over_limit_days)
+        self.assertEqual({date(2018, 6, 4): Decimal('7.5'), date(2018, 6, 5): Decimal(8),
+                          date(2018, 6, 6): Decimal('0.75'), date(2018, 6, 7): Decimal('0.75')},
+                         self.service.sum_durations(1, date(2018, 6, 4), date(2018, 6, 7)))
+        # user lock, sums of all days, insert
+        self.assertEqual(3, counter.count)
+        self.assertTrue(counter.statements[2].startswith('INSERT INTO time_entries'))
@@ -0,0 +1,239 @@
+import unittest
+from datetime import datetime, time, date, timedelta
+from decimal import Decimal
+from time import monotonic
+
+from flask_bcrypt import Bcrypt
+from sqlalchemy.orm import sessionmaker
+
+from nisse.models.database import User, ReminderSchedule, UserRole, Project, TimeEntry
+from nisse.services.user_service import UserService, user_identity_cache, IDENTITY_CACHE_TTL_SECONDS
+from tests.db_helper import create_test_session, QueryCounter
+
+# 2018-06-04 is Monday
+MONDAY = datetime(2018, 6, 4)
+
+
+class UserServiceReminderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.service = UserService(self.session, Bcrypt())
+
+    def tearDown(self):
+        self.session.close()
+
+    def add_user(self, user_id, **remind_times):
+        user = User(user_id=user_id, username='user{0}@mail.com'.format(user_id))
+        self.session.add(user)
+        self.session.commit()
+        for column, remind_time in remind_times.items():
+            setattr(user, column, remind_time)
+        self.service.update_remind_times(user)
+        return user
+
+    def notified_user_ids(self, end_date, minutes=5):
+        return sorted(u.user_id for u in self.service.get_users_to_notify_last_period(minutes, end_date))
+
+    def test_update_remind_times_should_replace_user_schedule(self):
+        user = self.add_user(1, remind_time_monday='07:00', remind_time_friday=time(14, 30))
+
+        user.remind_time_monday = None
+        user.remind_time_tuesday = '08:15'
+        self.service.update_remind_times(user)
+
+        self.assertEqual([(1, 495), (4, 870)],
+                         [(s.weekday, s.utc_minute) for s in self.session.query(ReminderSchedule)
+                          .order_by(ReminderSchedule.weekday)])
+        self.assertEqual(time(8, 15), user.remind_time_tuesday)
+
+    def test_get_users_to_notify_last_period_should_match_weekday_and_period(self):
+        self.add_user(1, remind_time_monday='07:00')
+        self.add_user(2, remind_time_monday='07:05', remind_time_tuesday='07:00')
+        self.add_user(3, remind_time_tuesday='07:00')
+
+        self.assertEqual([1], self.notified_user_ids(MONDAY.replace(hour=7, minute=2, second=30)))
+        self.assertEqual([2], self.notified_user_ids(MONDAY.replace(hour=7, minute=5)))
+        self.assertEqual([], self.notified_user_ids(MONDAY.replace(hour=7, minute=10)))
+
+    def test_get_users_to_notify_last_period_should_handle_period_past_midnight(self):
+        self.add_user(1, remind_time_sunday='23:58')
+        self.add_user(2, remind_time_monday='00:01')
+        self.add_user(3, remind_time_monday='23:58')
+
+        self.assertEqual([1, 2], self.notified_user_ids(MONDAY.replace(hour=0, minute=2)))
+
+
+class UserServiceIdentityTests(unittest.TestCase):
+
+    def setUp(self):
+        user_identity_cache.clear()
+        self.session = create_test_session()
+        self.session_maker = sessionmaker(bind=self.session.get_bind())
+        self.user_role, self.admin_role = [self.session.query(UserRole).filter(UserRole.role == role).one()
+                                           for role in ('user', 'admin')]
+        self.session.add(User(user_id=1, username='john@mail.com', slack_user_id='U1', first_name='John',
+                              last_name='Doe', phone='123', role_id=self.user_role.user_role_id))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        user_identity_cache.clear()
+
+    def get_in_new_session(self, slack_id, clock=None):
+        """ Resolves user like next request does, returns the user and SQL statements run """
+        service = UserService(self.session_maker(), Bcrypt())
+        if clock:
+            service.clock = clock
+        with QueryCounter(self.session.get_bind()) as counter:
+            user = service.get_user_by_slack_id(slack_id)
+            role = user.role.role if user else None
+            names = (user.first_name, user.last_name) if user else None
+        return user, role, names, counter.statements
+
+    def test_get_user_by_slack_id_should_query_once_per_session(self):
+        # arrange
+        service = UserService(self.session_maker(), Bcrypt())
+
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            first = service.get_user_by_slack_id('U1')
+            second = service.get_user_by_slack_id('U1')
+
+        # assert
+        self.assertIs(first, second)
+        self.assertEqual(1, counter.count)
+
+    def test_attached_user_should_not_be_written_back(self):
+        # arrange
+        self.get_in_new_session('U1')
+        session = self.session_maker()
+        user = UserService(session, Bcrypt()).get_user_by_slack_id('U1')
+
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            self.assertEqual('user', user.role.role)
+            session.commit()
+
+        # assert
+        self.assertEqual(0, len([s for s in counter.statements if s.startswith('UPDATE')]))
+        self.assertNotIn(user, session.dirty)
+
+    def test_get_user_by_slack_id_should_not_query_users_for_known_user(self):
+        # arrange
+        self.get_in_new_session('U1')
+
+        # act
+        user, role, names, statements = self.get_in_new_session('U1')
+
+        # assert
+        self.assertEqual([], statements)
+        self.assertEqual((1, 'user', ('John', 'Doe')), (user.user_id, role, names))
+        # columns not kept in cache are loaded on access
+        self.assertEqual('123', user.phone)
+
+    def test_get_user_by_slack_id_should_serve_consecutive_sessions_from_cache(self):
+        # act
+        statements = [self.get_in_new_session('U1')[3] for _ in range(4)]
+
+        # assert
+        self.assertEqual([1, 0, 0, 0], [len(s) for s in statements])
+
+    def test_get_user_by_slack_id_should_reload_user_after_role_change(self):
+        # arrange
+        self.get_in_new_session('U1')
+        session = self.session_maker()
+        user = UserService(session, Bcrypt()).get_user_by_slack_id('U1')
+
+        # act
+        user.role_id = self.admin_role.user_role_id
+        session.commit()
+        user, role, names, statements = self.get_in_new_session('U1')
+
+        # assert
+        self.assertEqual('admin', role)
+        self.assertEqual(1, len(statements))
+
+    def test_get_user_by_slack_id_should_reload_user_after_ttl(self):
+        # arrange
+        self.get_in_new_session('U1')
+        self.session.query(User).filter(User.user_id == 1).update({User.first_name: 'Johnny'})
+        self.session.commit()
+
+        # act
+        cached = self.get_in_new_session('U1')
+        expired = self.get_in_new_session('U1', clock=lambda: monotonic() + IDENTITY_CACHE_TTL_SECONDS + 1)
+
+        # assert
+        self.assertEqual(('John', 'Doe'), cached[2])
+        self.assertEqual(('Johnny', 'Doe'), expired[2])
+
+    def test_add_user_should_invalidate_identity(self):
+        # arrange
+        self.assertIsNone(self.get_in_new_session('U2')[0])
+        service = UserService(self.session_maker(), Bcrypt())
+
+        # act
+        service.add_user('jane@mail.com', 'Jane', 'Roe', 'secret', 'U2')
+        user, role, names, statements = self.get_in_new_session('U2')
+
+        # assert
+        self.assertEqual(('user', ('Jane', 'Roe')), (role, names))
+
+
+class UserServiceTimeEntryQueryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_test_session()
+        self.service = UserService(self.session, Bcrypt())
+
+        self.session.add_all([User(user_id=user_id, username='user{0}@mail.com'.format(user_id))
+                              for user_id in range(1, 21)])
+        self.session.add_all([Project(project_id=project_id, name='Project {0}'.format(project_id))
+                              for project_id in range(1, 6)])
+        self.session.commit()
+        self.session.bulk_insert_mappings(TimeEntry, [
+            dict(user_id=user_id, project_id=user_id % 5 + 1, duration=Decimal(8), comment='',
+                 report_date=date(2018, 1, 1) + timedelta(days=day))
+            for user_id in range(1, 21) for day in range(365)])
+        self.session.commit()
+        self.session.execute('ANALYZE')
+
+    def tearDown(self):
+        self.session.close()
+
+    def explain(self, query):
+        with QueryCounter(self.session.get_bind()) as counter:
+            query()
+        return counter.explain()
+
+    def test_user_date_range_queries_should_use_composite_index(self):
+        # act
+        plans = [
+            self.explain(lambda: self.service.get_user_time_entries(3, date(2018, 6, 1), date(2018, 6, 30))),
+            self.explain(lambda: self.service.get_time_entry_date_range(3, date(2018, 6, 1), date(2018, 6, 30))),
+            self.explain(lambda: self.service.get_user_last_time_entry(3))
+        ]
+
+        # assert
+        for plan in plans:
+            self.assertIn('USING INDEX ix_time_entries_user_id_report_date', plan[0])
+            self.assertFalse([step for step in plan if 'TEMP B-TREE' in step])
+        self.assertIn('(user_id=? AND report_date>? AND report_date<?)', plans[0][0])
+
+    def test_get_reported_days_should_scan_index_only(self):
+        # act
+        plan = self.explain(lambda: self.service.get_reported_days([3, 4], date(2018, 6, 1), date(2018, 6, 30)))
+
+        # assert
+        self.assertIn('USING COVERING INDEX ix_time_entries_user_id_report_date', plan[0])
+
+    def test_get_last_ten_time_entries_should_not_join_project(self):
+        # act
+        with QueryCounter(self.session.get_bind()) as counter:
+            time_entries = self.service.get_last_ten_time_entries(3, 4)
+
+        # assert
+        self.assertEqual(10, len(time_entries))
+        self.assertEqual(date(2018, 12, 31), time_entries[0].report_date)
+        self.assertNotIn('projects', counter.statements[0])
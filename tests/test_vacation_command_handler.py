@@ -17,7 +17,7 @@ class TestVacationCommanHandler(TestCase):
 
     @mock.patch('nisse.services.ProjectService')
     @mock.patch('nisse.services.UserService')
-    @mock.patch('slackclient.SlackClient')
+    @mock.patch('nisse.services.SlackGateway')
     @mock.patch('nisse.services.VacationService')
     @mock.patch('nisse.services.GoogleCalendarService')
     def setUp(self, mock_project_service, mock_user_service, mock_slack_client, mock_vacation_service, mock_calendar_service):
@@ -1,9 +1,39 @@
+import os
+import tempfile
+import time
+import tracemalloc
 import unittest
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+import mock
+from openpyxl import load_workbook
+
 from nisse.models import TimeEntry, User
+from nisse.models.DTO import ReportDataDto, ReportEntryDto
 from nisse.services.xlsx_document_service import XlsxDocumentService
-import os
+from nisse.utils.date_helper import date_range, is_weekend
+
+
+def get_time_entries(users_count, date_from: date, date_to: date, entries_per_day=2):
+    users = [User(user_id=i, first_name="user", last_name=str(i)) for i in range(users_count)]
+    entries = []
+    for user in users:
+        for day in date_range(date_from, date_to + timedelta(days=1)):
+            for n in range(entries_per_day):
+                entries.append(ReportEntryDto(user.user_id, day, Decimal('4.5') + n, "Project",
+                                              "work on {0}".format(day)))
+    return users, entries
+
+
+def get_report_data(users, entries):
+    return ReportDataDto(iter(entries), {u.user_id: u for u in users}, {})
+
+
+def read_values(file_path):
+    wb = load_workbook(file_path)
+    return {sheet.title: [[cell.value for cell in row] for row in sheet.iter_rows()] for sheet in wb.worksheets}
 
 
 class XlsxDocumentServiceTests(unittest.TestCase):
@@ -20,3 +50,61 @@ class XlsxDocumentServiceTests(unittest.TestCase):
         my_file = Path(file_path_name)
         self.assertTrue(my_file.is_file(), " report should be generated")
         # os.remove(file_path_name)  # comment out if you want to check the file
+
+    def test_save_report_should_skip_entries_of_unknown_users(self):
+        # arrange
+        users, entries = get_time_entries(2, date(2018, 1, 1), date(2018, 1, 31))
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "report.xlsx")
+
+            # act
+            XlsxDocumentService().save_report(file_path, "2018-01-01", "2018-01-31", get_report_data(users[1:], entries))
+
+            # assert
+            self.assertEqual(['user 1'], list(read_values(file_path).keys()))
+
+
+class XlsxDocumentServiceBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.users, self.entries = get_time_entries(10, date(2018, 1, 1), date(2018, 2, 28))
+        self.service = XlsxDocumentService()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def save_report(self, write_only):
+        file_path = os.path.join(self.directory.name, "write_only.xlsx" if write_only else "in_memory.xlsx")
+        tracemalloc.start()
+        self.service.save_report(file_path, "2018-01-01", "2018-02-28", get_report_data(self.users, self.entries),
+                                 write_only)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return file_path, peak
+
+    def test_write_only_report_should_match_in_memory_report_using_less_memory(self):
+        # act
+        in_memory_path, in_memory_peak = self.save_report(write_only=False)
+        write_only_path, write_only_peak = self.save_report(write_only=True)
+
+        # assert
+        self.assertEqual(read_values(in_memory_path), read_values(write_only_path))
+        self.assertLess(write_only_peak, in_memory_peak / 2)
+
+    def test_year_long_report_should_classify_every_day_once(self):
+        # arrange
+        self.users, self.entries = get_time_entries(30, date(2018, 1, 1), date(2018, 12, 31), entries_per_day=1)
+        report_data = get_report_data(self.users, self.entries)
+        file_path = os.path.join(self.directory.name, "year.xlsx")
+
+        # act
+        started = time.perf_counter()
+        with mock.patch('nisse.services.xlsx_document_service.is_weekend', wraps=is_weekend) as weekend_check:
+            self.service.save_report(file_path, "2018-01-01", "2018-12-31", report_data, write_only=True)
+        elapsed = time.perf_counter() - started
+
+        # assert
+        # days are classified once per report, not once per user, so the report takes a few seconds at most
+        self.assertLess(elapsed, 30)
+        self.assertEqual(weekend_check.call_count, 365)
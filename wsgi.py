@@ -1,4 +1,8 @@
-from nisse.__init__ import application
+from nisse.__init__ import application, flask_injector
+from nisse.services.report_job_queue import ReportJobQueue
+
+# report workers run only in the web process, not in cli commands and tests importing the application
+flask_injector.injector.get(ReportJobQueue).start()
 
 if __name__ == "__main__":
-    application.run()
\ No newline at end of file
+    application.run()